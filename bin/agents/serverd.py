@@ -1,14 +1,12 @@
 #!/usr/bin/env python3
-"""infoset Linux agent.
+"""infoset web server agent.
 
 Description:
 
-    Uses Python2 to be compatible with most Linux systems
-
     This script:
-        1) Retrieves a variety of system information
-        2) Posts the data using HTTP to a server listed
-           in the configuration file
+        1) Serves the infoset web pages and API
+        2) Uses a pre-forked gunicorn server unless the "web_debug"
+           option is set for the agent in the configuration file
 
 """
 # Standard libraries
@@ -24,6 +22,7 @@ except:
 from infoset.utils import jm_configuration
 from infoset.utils import log
 from www import infoset
+from www import wsgi
 
 
 class PollingAgent(object):
@@ -88,11 +87,25 @@ class PollingAgent(object):
         log_file = self.config.log_file()
         logging.basicConfig(filename=log_file, level=logging.DEBUG)
 
-        # Post data to the remote server
-        log.log2warn(101010101010101010101010101010101, 'boo')
-        infoset.run(
-            debug=True, host='0.0.0.0',
-            threaded=True, port=port)
+        # Use the development server if debugging
+        if self.config.web_debug() is True:
+            log_message = (
+                'Agent "%s": Starting development web server on port %s'
+                '') % (self.agent_name, port)
+            log.log2quiet(1110, log_message)
+            infoset.run(
+                debug=True, host='0.0.0.0',
+                threaded=True, port=port)
+            return
+
+        # Otherwise start the production server
+        log_message = (
+            'Agent "%s": Starting web server on port %s with %s workers '
+            'of %s threads each') % (
+                self.agent_name, port, self.config.web_workers(),
+                self.config.web_threads())
+        log.log2quiet(1111, log_message)
+        wsgi.run(self.config, port)
 
 
 def main():
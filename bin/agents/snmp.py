@@ -6,9 +6,12 @@ Extracts agent data from cache directory files.
 """
 
 # Standard libraries
+import asyncio
 import sys
+import time
 from collections import defaultdict
-from time import sleep
+from functools import partial, reduce
+from math import gcd
 
 # infoset libraries
 try:
@@ -19,10 +22,9 @@ except:
 from infoset.utils import jm_configuration
 from infoset.utils import jm_general
 from infoset.utils import log
-from infoset.utils import hidden
-from infoset.db import db_oid
-from infoset.db import db_host
+from infoset.agents import scheduler
 from infoset.db import db_hostoid
+from infoset.snmp import snmp_engine
 from infoset.snmp import snmp_manager
 
 
@@ -57,6 +59,9 @@ class PollingAgent(object):
         # Get configuration
         self.config = jm_configuration.ConfigAgent(self.agent_name)
 
+        # OIDs to poll on each host. Shared by all pollers
+        self.plan = db_hostoid.PollingPlan()
+
     def name(self):
         """Return agent name.
 
@@ -74,6 +79,9 @@ class PollingAgent(object):
     def query(self):
         """Query all remote hosts for data.
 
+        Each host is polled on its own grid aligned interval by a
+        scheduler running on the asyncio SNMP engine. This doesn't return.
+
         Args:
             None
 
@@ -81,51 +89,81 @@ class PollingAgent(object):
             None
 
         """
-        # Post data to the remote server
-        while True:
-            self._poll()
+        # Poll forever
+        schedule = self._schedule()
+        snmp_engine.engine().run(schedule.run())
 
-            # Sleep
-            sleep(300)
+    def _schedule(self):
+        """Create the polling schedule for all hosts.
 
-            # Update the PID file timestamp (important)
-            update = hidden.Touch()
-            update.pid(self.name())
-
-    def _poll(self):
-        """Query all remote hosts for data.
+        Each host has a single job. Hosts with agent labels polled at
+        different intervals run at the greatest common divisor of the
+        intervals, and each run polls the agent labels that are due.
+        Labels due at the same time are polled and posted together, as
+        the server only keeps one post per host for each timestamp.
 
         Args:
             None
 
         Returns:
-            None
+            schedule: scheduler.Scheduler object
 
         """
         # Initialize key variables
-        pollers = []
+        snmp_config = jm_configuration.ConfigSNMP()
+        schedule = scheduler.Scheduler(
+            self.agent_name, spread=self.config.agent_spread())
+
+        # Create a job for each host
+        for hostname in self.config.agent_hostnames():
+            (host_interval, label_intervals) = _intervals(
+                self.config, hostname)
+            intervals = set(label_intervals.values())
+            intervals.add(host_interval)
+            intervals = sorted(intervals)
+            schedule.add(
+                hostname, reduce(gcd, intervals), self._poll, hostname,
+                intervals, snmp_config)
+
+        # Return
+        return schedule
 
-        # Create a list of polling objects
-        hostnames = self.config.agent_hostnames()
+    async def _poll(self, hostname, intervals, snmp_config):
+        """Query a remote host for data.
 
-        for hostname in hostnames:
-            # Only poll hosts that exist in the database
-            if db_host.hostname_exists(hostname) is False:
-                log_message = (
-                    'Agent "%s": Hostname %s in the configuration file '
-                    'does not exist in the database. '
-                    'Run the snmp_evaluate_hosts.py script.'
-                    '') % (self.agent_name, hostname)
-                log.log2warn(1095, log_message)
-                continue
+        Args:
+            hostname: Hostname
+            intervals: Sorted list of the polling intervals of the host's
+                agent labels
+            snmp_config: ConfigSNMP configuration object
 
-            # Add poller
-            poller = Poller(hostname, self.agent_name)
-            pollers.append(poller)
+        Returns:
+            None
 
-        # Start threaded polling
-        if bool(pollers) is True:
-            Agent.threads(self.agent_name, pollers)
+        """
+        # Initialize key variables
+        loop = asyncio.get_event_loop()
+        due = _due(intervals, time.time())
+
+        # Only poll hosts that exist in the database
+        exists = await loop.run_in_executor(
+            None, self.plan.exists, hostname)
+        if exists is False:
+            log_message = (
+                'Agent "%s": Hostname %s in the configuration file '
+                'does not exist in the database. '
+                'Run the snmp_evaluate_hosts.py script.'
+                '') % (self.agent_name, hostname)
+            log.log2warn(1095, log_message)
+            return
+
+        # Poll. Creating the agent creates its cache directory and reads
+        # language files, so it is done in a worker thread
+        poller = await loop.run_in_executor(
+            None, partial(
+                Poller, hostname, self.config, snmp_config, intervals=due,
+                plan=self.plan))
+        await poller.query()
 
 
 class Poller(object):
@@ -139,38 +177,49 @@ class Poller(object):
 
     Functions:
         __init__:
-        populate:
-        post:
+        query:
     """
 
-    def __init__(self, hostname, agent_name):
+    def __init__(
+            self, hostname, config, snmp_config, intervals=None, plan=None):
         """Method initializing the class.
 
         Args:
             hostname: Hostname to poll
-            agent_name: Name of agent
+            config: ConfigAgent configuration object
+            snmp_config: ConfigSNMP configuration object
+            intervals: Only poll agent labels with these polling
+                intervals. Poll all agent labels if None
+            plan: db_hostoid.PollingPlan object to get the host's OIDs
+                from. A new one is used if None
 
         Returns:
             None
 
         """
         # Initialize key variables
-        self.agent_name = agent_name
+        self.agent_name = config.agent_name()
         self.hostname = hostname
-
-        # Get configuration
-        config = jm_configuration.ConfigAgent(self.agent_name)
+        self.snmp_config = snmp_config
+        self.snmp_params = None
+        self.master = None
+        self.intervals = intervals
+        self.plan = plan
+        if plan is None:
+            self.plan = db_hostoid.PollingPlan()
+        (self.host_interval, self.label_intervals) = _intervals(
+            config, hostname)
 
         # Initialize key variables
         self.agent = Agent.Agent(config, hostname)
 
-        # Get snmp configuration information from infoset
-        snmp_config = jm_configuration.ConfigSNMP()
-        validate = snmp_manager.Validate(hostname, snmp_config.snmp_auth())
-        self.snmp_params = validate.credentials()
+    async def query(self):
+        """Query the host for data.
 
-    def query(self):
-        """Query all remote hosts for data.
+        This is a coroutine run by the asyncio SNMP engine. Blocking work
+        such as database queries and posting data is done in the engine's
+        worker threads. Credentials are discovered by probing all SNMP
+        groups at once.
 
         Args:
             None
@@ -179,12 +228,25 @@ class Poller(object):
             None
 
         """
+        # Initialize key variables
+        loop = asyncio.get_event_loop()
+
+        # Get the OIDs to poll. Don't contact the host if there are none
+        self.master = await loop.run_in_executor(None, self._master)
+        if bool(self.master) is False:
+            return
+
+        # Get snmp configuration information from infoset
+        validate = snmp_manager.Validate(
+            self.hostname, self.snmp_config.snmp_auth())
+        self.snmp_params = await validate.credentials_async()
+
         # Check SNMP supported
         if bool(self.snmp_params) is True:
             # Get datapoints
-            self._datapoints()
+            await self._datapoints()
 
-    def _datapoints(self):
+    async def _datapoints(self):
         """Create the master dictionary for the host.
 
         Args:
@@ -194,14 +256,33 @@ class Poller(object):
 
         """
         # Initialize key variables
+        loop = asyncio.get_event_loop()
         snmp_params = self.snmp_params
-        master = self._master()
+        master = self.master
+        walk_results = {}
 
-        # Get sources
+        # Walk the labels OID and its values OIDs together in a single
+        # pass over the table. Tables are walked concurrently. The SNMP
+        # engine limits the number of requests outstanding to the host
         snmp_object = snmp_manager.Interact(snmp_params)
+        tables = []
         for labels_oid in master.keys():
-            sources = {}
-            oid_results = snmp_object.swalk(labels_oid)
+            oids = [labels_oid]
+            for agent_label in master[labels_oid].keys():
+                values_oid = master[labels_oid][agent_label]['values_oid']
+                if values_oid not in oids:
+                    oids.append(values_oid)
+            tables.append(oids)
+        results = await asyncio.gather(
+            *[snmp_object.swalk_columns_async(oids) for oids in tables])
+        for table_results in results:
+            walk_results.update(table_results)
+
+        # Get sources
+        sources = defaultdict(dict)
+        for labels_oid in master.keys():
+            oid_results = walk_results[labels_oid]
+            prefix_length = _prefix_length(labels_oid)
 
             # Return if there is an error
             if bool(oid_results) is False:
@@ -213,7 +294,8 @@ class Poller(object):
                 return
 
             for key, value in oid_results.items():
-                sources[_index(labels_oid, key)] = jm_general.decode(value)
+                sources[labels_oid][
+                    _index(prefix_length, key)] = jm_general.decode(value)
 
         # Get values
         for labels_oid in master.keys():
@@ -228,7 +310,8 @@ class Poller(object):
 
                 # Get OID values
                 values = {}
-                oid_results = snmp_object.swalk(values_oid)
+                oid_results = walk_results[values_oid]
+                prefix_length = _prefix_length(values_oid)
 
                 # Return if there is an error
                 if bool(oid_results) is False:
@@ -245,12 +328,12 @@ class Poller(object):
                         _ = float(value)
                     except:
                         continue
-                    values[_index(labels_oid, key)] = value * multiplier
+                    values[_index(prefix_length, key)] = value * multiplier
 
                 # Create list of data for json
                 data = []
                 for index, value in values.items():
-                    data.append([index, value, sources[index]])
+                    data.append([index, value, sources[labels_oid][index]])
 
                 # Finish up dict for json
                 datapoints[agent_label]['data'] = data
@@ -260,7 +343,7 @@ class Poller(object):
                 self.agent.populate(datapoints)
 
         # Post data
-        self.agent.post()
+        await loop.run_in_executor(None, self.agent.post)
 
     def _master(self):
         """Create the master dictionary for the host.
@@ -276,21 +359,22 @@ class Poller(object):
         hostname = self.hostname
         master = defaultdict(lambda: defaultdict(dict))
 
-        # Get all oid IDX values tied to the hostname
-        idx_host = db_host.GetHost(hostname).idx()
-        oid_indices = db_hostoid.oid_indices(idx_host)
-
         # Get OID metadata
-        for idx_oid in oid_indices:
-            oid_object = db_oid.GetIDX(idx_oid)
-
+        for oid_data in self.plan.oids(hostname):
             # Assign OIDs for values to the OID that
             # will be used to label the results
-            labels_oid = oid_object.oid_labels()
-            values_oid = oid_object.oid_values()
-            agent_label = oid_object.agent_label()
-            base_type = oid_object.base_type()
-            multiplier = oid_object.multiplier()
+            labels_oid = oid_data['oid_labels']
+            values_oid = oid_data['oid_values']
+            agent_label = oid_data['agent_label']
+            base_type = oid_data['base_type']
+            multiplier = oid_data['multiplier']
+
+            # Skip agent labels polled at other intervals
+            if self.intervals is not None:
+                interval = self.label_intervals.get(
+                    agent_label, self.host_interval)
+                if interval not in self.intervals:
+                    continue
 
             # Stuff to do
             master[labels_oid][agent_label]['values_oid'] = values_oid
@@ -301,33 +385,85 @@ class Poller(object):
         return master
 
 
-def _index(labels_oid, oid):
-    """Find the index value of an OID.
+def _intervals(config, hostname):
+    """Get the polling intervals for a host.
 
     Args:
-        labels_oid: OID used for labels
-        oid: OID value
+        config: ConfigAgent configuration object
+        hostname: Hostname
 
     Returns:
-        value: Index value
+        (host_interval, label_intervals): The host's polling interval and
+            a dict of intervals for agent labels polled at other intervals
+
+    """
+    # Initialize key variables
+    host_intervals = config.agent_host_intervals()
+    host_interval = host_intervals.get(hostname, config.agent_interval())
+    host_interval = scheduler.grid_interval(host_interval)
+
+    # Get intervals for agent labels
+    label_intervals = {}
+    for agent_label, interval in config.agent_label_intervals().items():
+        label_intervals[agent_label] = scheduler.grid_interval(interval)
+
+    # Return
+    return (host_interval, label_intervals)
+
+
+def _due(intervals, now):
+    """Get the polling intervals that are due.
+
+    Args:
+        intervals: Sorted list of polling intervals
+        now: Time of the poll
+
+    Returns:
+        due: List of the intervals that start at the same time as the
+            current interval of their greatest common divisor
 
     """
     # Initialize key variables
-    value = None
+    base = reduce(gcd, intervals)
+    start = (int(now) // base) * base
+
+    # Return
+    due = [interval for interval in intervals if start % interval == 0]
+    return due
 
-    # Get all the nodes in the oids
-    nodes_label = labels_oid.split('.')
-    nodes_oid = oid.split('.')
 
-    # Calculate the difference in lenth in terms of OID nodes
-    nodes_in_index = len(nodes_oid) - len(nodes_label)
+def _prefix_length(oid):
+    """Get the length of the text preceding the index of an OID's rows.
+
+    Args:
+        oid: OID that was walked
+
+    Returns:
+        value: Length of the OID and the '.' that follows it
+
+    """
+    # Return
+    value = len(oid) + 1
+    return value
+
+
+def _index(prefix_length, oid):
+    """Find the index value of an OID.
+
+    Args:
+        prefix_length: Length of the walked OID, see _prefix_length
+        oid: OID value
+
+    Returns:
+        value: Index value
+
+    """
+    # Get the nodes after the walked OID
+    value = oid[prefix_length:]
 
-    # Calculate what the index should be
-    value_nodes = nodes_oid[-nodes_in_index:]
-    if nodes_in_index == 1:
-        value = int(value_nodes[0])
-    else:
-        value = '.'.join(value_nodes)
+    # Single node indexes are integers
+    if '.' not in value:
+        value = int(value)
 
     # Return
     return value
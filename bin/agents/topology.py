@@ -8,7 +8,9 @@ Extracts agent data from cache directory files.
 # Standard libraries
 import sys
 import os
-import tempfile
+import time
+import multiprocessing
+from concurrent import futures
 
 # infoset libraries
 try:
@@ -17,10 +19,11 @@ except:
     print('You need to set your PYTHONPATH to include the infoset library')
     sys.exit(2)
 from infoset.utils import jm_configuration
-from infoset.utils import jm_general
 from infoset.utils import log
 from infoset.snmp import snmp_info
 from infoset.snmp import snmp_manager
+from infoset.topology import changes
+from infoset.topology import store
 
 
 class PollingAgent(object):
@@ -56,13 +59,23 @@ class PollingAgent(object):
         self.server_config = jm_configuration.Config()
         self.snmp_config = jm_configuration.ConfigSNMP()
 
-        # Cleanup, move temporary files to clean permanent directory.
-        # Delete temporary directory
+        # Snapshots of the last poll of each host, for incremental polls
+        self.snapshots = {}
+
+        # Worker processes that share the hosts. Created by query
+        self.pool = None
+        self.processes = 1
+
+        # Delete the data of hosts that are no longer polled. The data of
+        # other hosts is kept, as changes are found by comparing it with
+        # the next poll
         topology_directory = self.server_config.topology_directory()
-        if os.path.isdir(topology_directory):
-            jm_general.delete_files(topology_directory)
-        else:
+        if os.path.isdir(topology_directory) is False:
             os.makedirs(topology_directory, 0o755)
+        hostnames = self.agent_config.agent_hostnames()
+        for hostname in store.hostnames(self.server_config):
+            if hostname not in hostnames:
+                store.Device(self.server_config, hostname).delete()
 
     def name(self):
         """Return agent name.
@@ -88,15 +101,36 @@ class PollingAgent(object):
             None
 
         """
-        # Initialize key variables
-        delay = 3600
+        # Initialize key variables. Incremental polls are cheap enough to
+        # be done often. Otherwise every poll is a full poll
+        if self.agent_config.agent_incremental() is True:
+            delay = self.agent_config.agent_interval()
+        else:
+            delay = self.agent_config.agent_full_interval()
+
+        # Share the hosts between worker processes if required. They are
+        # created once and reused by every poll. Processes are started
+        # afresh rather than forked, as threads such as the SNMP engine's
+        # don't survive forking
+        self.processes = min(
+            self.agent_config.agent_processes(),
+            len(self.agent_config.agent_hostnames()))
+        if self.processes > 1:
+            context = multiprocessing.get_context('spawn')
+            self.pool = context.Pool(self.processes)
 
         # Post data to the remote server
-        while True:
-            self._poll()
-
-            # Sleep for "delay" seconds
-            Agent.agent_sleep(self.name(), delay)
+        try:
+            while True:
+                self._poll()
+
+                # Sleep for "delay" seconds
+                Agent.agent_sleep(self.name(), delay)
+        finally:
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool.join()
+                self.pool = None
 
     def _poll(self):
         """Query all remote hosts for data.
@@ -114,17 +148,53 @@ class PollingAgent(object):
         # Create a list of polling objects
         hostnames = self.agent_config.agent_hostnames()
 
+        # Share the hosts between worker processes if required
+        if self.pool is not None:
+            self._poll_shards(hostnames)
+            return
+
         for hostname in hostnames:
             # Add poller
             poller = Poller(
                 hostname, self.agent_config,
-                self.server_config, self.snmp_config)
+                self.server_config, self.snmp_config, self.snapshots)
             pollers.append(poller)
 
         # Start threaded polling
         if bool(pollers) is True:
             Agent.threads(self.agent_name, pollers)
 
+    def _poll_shards(self, hostnames):
+        """Query remote hosts using the pool of worker processes.
+
+        Each process polls its share of the hosts with its own threads and
+        SNMP engine. The snapshots of the hosts for incremental polls are
+        passed to the processes and returned by them.
+
+        Args:
+            hostnames: List of hostnames
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        jobs = []
+        processes = self.processes
+
+        # Share the hosts between the processes
+        for index in range(processes):
+            shard = hostnames[index::processes]
+            snapshots = {}
+            for hostname in shard:
+                if hostname in self.snapshots:
+                    snapshots[hostname] = self.snapshots[hostname]
+            jobs.append((self.agent_name, shard, snapshots))
+
+        # Poll
+        for snapshots in self.pool.map(_poll_shard, jobs):
+            self.snapshots.update(snapshots)
+
 
 class Poller(object):
     """Infoset agent that gathers data.
@@ -141,30 +211,37 @@ class Poller(object):
         post:
     """
 
-    def __init__(self, hostname, agent_config, server_config, snmp_config):
+    def __init__(
+            self, hostname, agent_config, server_config, snmp_config,
+            snapshots=None):
         """Method initializing the class.
 
         Args:
             hostname: Hostname to poll
-            agent_name: Name of agent
-            perm_dir: Directory where permanent YAML files should reside.
+            agent_config: ConfigAgent configuration object
+            server_config: Config configuration object
+            snmp_config: ConfigSNMP configuration object
+            snapshots: Dict of (time of last full poll, snmp_info
+                snapshot) tuples keyed by hostname. Used and updated for
+                incremental polls
 
         Returns:
             None
 
         """
         # Initialize key variables
-        self.agent_name = agent_config.name()
+        self.agent_name = agent_config.agent_name()
         self.hostname = hostname
         self.server_config = server_config
-
-        # Initialize key variables
-        self.agent = Agent.Agent(agent_config, hostname)
-
-        # Get snmp configuration information from infoset
-        validate = snmp_manager.Validate(hostname, snmp_config.snmp_auth())
-        self.snmp_params = validate.credentials()
-        self.snmp_object = snmp_manager.Interact(self.snmp_params)
+        self.snmp_config = snmp_config
+        self.snmp_params = None
+        self.snmp_object = None
+        self.incremental = agent_config.agent_incremental()
+        self.full_interval = agent_config.agent_full_interval()
+        if snapshots is None:
+            self.snapshots = {}
+        else:
+            self.snapshots = snapshots
 
     def query(self):
         """Query all remote hosts for data.
@@ -176,44 +253,58 @@ class Poller(object):
             None
 
         """
+        # Get snmp configuration information from infoset. This is done
+        # here so that credentials are determined by many threads at once.
+        # SNMP queries are made by the process-wide asyncio SNMP engine
+        validate = snmp_manager.Validate(
+            self.hostname, self.snmp_config.snmp_auth())
+        self.snmp_params = validate.credentials()
+
         # Check SNMP supported
         if bool(self.snmp_params) is True:
+            self.snmp_object = snmp_manager.Interact(self.snmp_params)
+
             # Get datapoints
-            self._create_yaml()
+            self._create_file()
         else:
             log_message = (
                 'Uncontactable host %s or no valid SNMP '
                 'credentials found for it.') % (self.hostname)
             log.log2quiet(1019, log_message)
 
-    def _create_yaml(self):
-        """Create the master dictionary for the host.
+    def _create_file(self):
+        """Create the topology file for the host.
 
         Args:
             None
         Returns:
-            value: Index value
+            None
 
         """
-        # Initialize key variables
-        temp_dir = tempfile.mkdtemp()
-        temp_file = ('%s/%s.yaml') % (temp_dir, self.hostname)
-        perm_file = self.server_config.topology_device_file(self.hostname)
-
         # Get data
         log_message = (
             'Querying topology data from host %s.'
             '') % (self.hostname)
         log.log2quiet(1019, log_message)
 
-        # Create YAML file by polling device
+        # Poll the device. Data that can't have changed since the previous
+        # poll is reused
+        (full_poll, previous) = self._previous()
         status = snmp_info.Query(self.snmp_object)
-        data = status.everything()
-        yaml_string = jm_general.dict2yaml(data)
-
-        # Dump data
-        with open(temp_file, 'w') as file_handle:
-            file_handle.write(yaml_string)
+        data = status.everything(
+            previous=previous, incremental=self.incremental)
+        if self.incremental is True:
+            self.snapshots[self.hostname] = (full_poll, status.snapshot())
+
+        # Save data, logging the changes since the previous poll
+        device = store.Device(self.server_config, self.hostname)
+        previous = None
+        if device.exists() is True:
+            previous = device.read()
+        device.write(data)
+        if previous is not None:
+            changes.Log(self.server_config, self.hostname).record(
+                previous, data)
 
         # Get data
         log_message = (
@@ -221,9 +312,88 @@ class Poller(object):
             '') % (self.hostname)
         log.log2quiet(1019, log_message)
 
-        # Clean up files
-        os.rename(temp_file, perm_file)
-        os.rmdir(temp_dir)
+    def _previous(self):
+        """Get the snapshot of the previous poll of the host.
+
+        Args:
+            None
+
+        Returns:
+            (full_poll, previous): Time of the last full poll and the
+                snmp_info snapshot of the previous poll. The snapshot is
+                None if a full poll is due
+
+        """
+        # Initialize key variables
+        now = time.time()
+
+        # Use the previous poll until a full poll is due
+        if self.incremental is True and self.hostname in self.snapshots:
+            (full_poll, previous) = self.snapshots[self.hostname]
+            if now - full_poll < self.full_interval:
+                return (full_poll, previous)
+
+        # Return
+        return (now, None)
+
+
+def _poll_shard(job):
+    """Query a share of the remote hosts in a worker process.
+
+    Args:
+        job: Tuple of the agent name, the list of hostnames to poll, and
+            the snapshots of the hosts. See Poller
+
+    Returns:
+        snapshots: Updated snapshots of the hosts
+
+    """
+    # Initialize key variables
+    (agent_name, hostnames, snapshots) = job
+    agent_config = jm_configuration.ConfigAgent(agent_name)
+    server_config = jm_configuration.Config()
+    snmp_config = jm_configuration.ConfigSNMP()
+
+    # Create a list of polling objects
+    pollers = [
+        Poller(hostname, agent_config, server_config, snmp_config, snapshots)
+        for hostname in hostnames]
+
+    # Poll. Failures of one host don't stop the others
+    threads_in_pool = min(server_config.agent_threads(), len(pollers))
+    with futures.ThreadPoolExecutor(max_workers=threads_in_pool) as executor:
+        queries = [executor.submit(poller.query) for poller in pollers]
+        for poller, query in zip(pollers, queries):
+            error = query.exception()
+            if error is not None:
+                log_message = (
+                    'Topology query of host %s failed: %s'
+                    '') % (poller.hostname, error)
+                log.log2warn(1120, log_message)
+
+    # Return snapshots as plain data, so they can be sent to the parent
+    for hostname, (full_poll, snapshot) in snapshots.items():
+        snapshots[hostname] = (full_poll, _plain(snapshot))
+    return snapshots
+
+
+def _plain(data):
+    """Convert dicts with default values in data to plain dicts.
+
+    Args:
+        data: Data
+
+    Returns:
+        result: data with plain dicts
+
+    """
+    # Return
+    if isinstance(data, dict) is True:
+        result = dict(
+            (key, _plain(value)) for key, value in data.items())
+    else:
+        result = data
+    return result
 
 
 def main():
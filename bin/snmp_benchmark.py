@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark the decoding of SNMP results.
+
+Decodes a large number of simulated IF-MIB table rows the same way the
+SNMP agent does, without contacting any devices.
+
+"""
+
+# Standard libraries
+import argparse
+import time
+
+# pip libraries
+from pysnmp.proto import rfc1902
+
+# Infoset libraries
+from infoset.snmp import snmp_engine
+from infoset.snmp import snmp_manager
+
+
+def cli():
+    """Return all the CLI options.
+
+    Args:
+        None
+
+    Returns:
+        args: Namespace() containing all of our CLI arguments as objects
+            - varbinds: Number of varbinds to decode
+            - repeat: Number of times to run each benchmark
+
+    """
+    # Header for the help menu of the application
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawTextHelpFormatter)
+
+    # CLI argument for the number of varbinds
+    parser.add_argument(
+        '--varbinds',
+        required=False,
+        default=100000,
+        type=int,
+        help='Number of varbinds to decode.'
+    )
+
+    # CLI argument for the number of repetitions
+    parser.add_argument(
+        '--repeat',
+        required=False,
+        default=5,
+        type=int,
+        help='Number of times to run each benchmark. The best is shown.'
+    )
+
+    # Get the parser value
+    args = parser.parse_args()
+    return args
+
+
+def columns(varbinds):
+    """Create walk results for ifDescr, ifInOctets and ifOutOctets.
+
+    Args:
+        varbinds: Total number of varbinds to create
+
+    Returns:
+        results: Dict of (name, value) lists keyed by walked OID
+
+    """
+    # Initialize key variables
+    results = {}
+    rows = varbinds // 3
+    values = {
+        '.1.3.6.1.2.1.2.2.1.2': lambda row: rfc1902.OctetString(
+            ('GigabitEthernet0/%s') % (row)),
+        '.1.3.6.1.2.1.2.2.1.10': lambda row: rfc1902.Counter32(row * 1000),
+        '.1.3.6.1.2.1.2.2.1.16': lambda row: rfc1902.Counter32(row * 2000)
+    }
+
+    # Create the rows
+    for oid, value in values.items():
+        nodes = snmp_manager.oid_nodes(oid)
+        results[oid] = [
+            (rfc1902.ObjectName(nodes + (row,)), value(row))
+            for row in range(1, rows + 1)]
+
+    # Return
+    return results
+
+
+def benchmark(name, function, varbinds, repeat):
+    """Time a function and print the result.
+
+    Args:
+        name: Name of the benchmark
+        function: Function to time
+        varbinds: Number of varbinds the function decodes
+        repeat: Number of times to run the function
+
+    Returns:
+        None
+
+    """
+    # Time the function
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    # Print
+    print(('%-20s %8.3f s %12.0f varbinds/s') % (name, best, varbinds / best))
+
+
+def main():
+    """Run the benchmarks.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    args = cli()
+    results = columns(args.varbinds)
+    varbinds = sum([len(column) for column in results.values()])
+
+    def walk():
+        """Decode walk results keyed by OID."""
+        for oid, column in results.items():
+            snmp_manager._format_results(var_binds=column, oid_to_get=oid)
+
+    def normalized():
+        """Decode walk results keyed by index."""
+        for oid, column in results.items():
+            snmp_manager._format_results(
+                normalized=True, var_binds=column, oid_to_get=oid)
+
+    def get():
+        """Decode get results, each for different OIDs."""
+        for column in results.values():
+            snmp_manager._format_results(get=True, var_binds=column)
+
+    def get_repeated():
+        """Decode get results for the same OIDs, as when polling."""
+        pdu = results['.1.3.6.1.2.1.2.2.1.10'][:snmp_engine.MAX_OIDS]
+        for _ in range(varbinds // len(pdu)):
+            snmp_manager._format_results(get=True, var_binds=pdu)
+
+    # Run
+    print(('Decoding %s varbinds, best of %s') % (varbinds, args.repeat))
+    benchmark('walk', walk, varbinds, args.repeat)
+    benchmark('walk (normalized)', normalized, varbinds, args.repeat)
+    benchmark('get', get, varbinds, args.repeat)
+    benchmark('get (same OIDs)', get_repeated, varbinds, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ from infoset.db import db_oid
 from infoset.db import db_host
 from infoset.db import db_hostoid
 from infoset.db.db_orm import HostOID, Host
+from infoset.snmp import snmp_engine
 from infoset.snmp import snmp_manager
 
 
@@ -93,13 +94,17 @@ def main():
     # Get OIDs
     oids = db_oid.all_oids()
 
-    # Process each hostname
-    for hostname in hostnames:
-        # Get SNMP information
-        snmp_config = jm_configuration.ConfigSNMP()
-        validate = snmp_manager.Validate(hostname, snmp_config.snmp_auth())
-        snmp_params = validate.credentials()
+    # Get SNMP credentials for all hosts at once
+    snmp_config = jm_configuration.ConfigSNMP()
+    validations = [
+        snmp_manager.Validate(hostname, snmp_config.snmp_auth())
+        for hostname in hostnames]
+    engine = snmp_engine.engine()
+    credentials = engine.gather(
+        [validate.credentials_async() for validate in validations])
 
+    # Process each hostname
+    for hostname, snmp_params in zip(hostnames, credentials):
         # Check SNMP supported
         if bool(snmp_params) is True:
             snmp_object = snmp_manager.Interact(snmp_params)
@@ -72,7 +72,7 @@ class Agent(object):
         self.data = defaultdict(lambda: defaultdict(dict))
         agent_name = config.agent_name()
         uid = get_uid(agent_name)
-        self.lang = language.Agent(agent_name)
+        self.lang = language.Agent(agent_name, lang=config.language())
 
         # Add timestamp
         self.data['timestamp'] = jm_general.normalized_timestamp()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Asyncio scheduler for agents that poll many hosts.
+
+Each job runs on its own interval. Intervals are multiples of the 300
+second grid that agent data timestamps are normalized to, and each run
+starts at the same offset into its interval. Offsets are spread across
+the first part of the interval based on the job's name so that hosts
+aren't all polled at the same instant, and the load on the network and
+the ingest server is smoothed.
+
+A job that is still running when it is next due is not started again.
+Overruns are logged.
+
+"""
+
+# Standard libraries
+import asyncio
+import time
+import zlib
+
+# Infoset libraries
+from infoset.utils import hidden
+from infoset.utils import log
+
+# Data timestamps are normalized to multiples of this many seconds
+GRID = 300
+
+# Longest time in seconds the scheduler sleeps for
+MAX_SLEEP = 60
+
+
+class Job(object):
+    """Class for a scheduled job.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+    """
+
+    def __init__(self, name, interval, offset, function, args):
+        """Method initializing the class.
+
+        Args:
+            name: Name of job
+            interval: Seconds between runs
+            offset: Seconds into each interval the job runs
+            function: Coroutine function to run
+            args: Arguments for the function
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.name = name
+        self.interval = interval
+        self.offset = offset
+        self.function = function
+        self.args = args
+        self.due = next_run(time.time(), interval, offset)
+        self.task = None
+
+
+class Scheduler(object):
+    """Class that runs jobs at fixed, grid aligned intervals.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        add:
+        run:
+    """
+
+    def __init__(self, agent_name, spread=0.5):
+        """Method initializing the class.
+
+        Args:
+            agent_name: Name of agent. Used to update its PID file
+            spread: Fraction of each interval over which the start times
+                of jobs are spread
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.agent_name = agent_name
+        self.spread = spread
+        self.jobs = []
+
+    def add(self, name, interval, function, *args):
+        """Add a job.
+
+        Args:
+            name: Name of job. Used to spread start times and in logs
+            interval: Seconds between runs. Rounded up to a multiple of
+                GRID
+            function: Coroutine function to run
+            args: Arguments for the function
+
+        Returns:
+            None
+
+        """
+        # Add
+        interval = grid_interval(interval)
+        job = Job(
+            name, interval, spread_offset(name, interval, self.spread),
+            function, args)
+        self.jobs.append(job)
+
+    async def run(self):
+        """Run jobs forever.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Run
+        while True:
+            # Start jobs that are due
+            now = time.time()
+            for job in self.jobs:
+                if job.due > now:
+                    continue
+                if job.task is not None and job.task.done() is False:
+                    log_message = (
+                        'Job "%s" of agent "%s" is still running from its '
+                        'previous %s second interval. Skipping this run.'
+                        '') % (job.name, self.agent_name, job.interval)
+                    log.log2warn(1116, log_message)
+                else:
+                    job.task = asyncio.ensure_future(self._execute(job))
+                job.due = next_run(now, job.interval, job.offset)
+
+            # Update the PID file timestamp (important)
+            update = hidden.Touch()
+            update.pid(self.agent_name)
+
+            # Sleep until the next job is due
+            delay = MAX_SLEEP
+            if bool(self.jobs) is True:
+                delay = min([job.due for job in self.jobs]) - time.time()
+            await asyncio.sleep(min(max(delay, 0), MAX_SLEEP))
+
+    async def _execute(self, job):
+        """Run a job once.
+
+        Args:
+            job: Job object
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        start = time.time()
+
+        # Errors must not stop other jobs. log.log2die raises SystemExit
+        try:
+            await job.function(*job.args)
+        except asyncio.CancelledError:
+            raise
+        except (Exception, SystemExit) as exception_error:
+            log_message = ('Job "%s" of agent "%s" failed: %s') % (
+                job.name, self.agent_name, exception_error)
+            log.log2warn(1117, log_message)
+
+        # Report overruns
+        duration = time.time() - start
+        if duration > job.interval:
+            log_message = (
+                'Job "%s" of agent "%s" took %.0f seconds. This is longer '
+                'than its %s second interval.') % (
+                    job.name, self.agent_name, duration, job.interval)
+            log.log2warn(1118, log_message)
+
+
+def grid_interval(interval):
+    """Round an interval up to a multiple of GRID.
+
+    Args:
+        interval: Interval in seconds
+
+    Returns:
+        value: Interval in seconds
+
+    """
+    # Return
+    value = max(1, -(-int(interval) // GRID)) * GRID
+    return value
+
+
+def spread_offset(name, interval, spread):
+    """Get the offset into each interval at which a job runs.
+
+    The offset depends only on the job's name, so it doesn't change when
+    the agent is restarted.
+
+    Args:
+        name: Name of job
+        interval: Interval in seconds
+        spread: Fraction of the interval over which offsets are spread
+
+    Returns:
+        value: Offset in seconds
+
+    """
+    # Initialize key variables
+    window = int(interval * min(max(spread, 0), 1))
+
+    # Return
+    if window < 1:
+        return 0
+    value = zlib.crc32(str(name).encode()) % window
+    return value
+
+
+def next_run(now, interval, offset):
+    """Get the next time a job runs.
+
+    Args:
+        now: Current time
+        interval: Interval in seconds
+        offset: Offset into each interval in seconds
+
+    Returns:
+        value: Time of the next run
+
+    """
+    # Return
+    value = (now // interval) * interval + offset
+    if value <= now:
+        value += interval
+    return value
@@ -6,6 +6,9 @@ Classes for agent data
 # Python standard libraries
 from collections import defaultdict
 
+# PIP libraries
+from sqlalchemy import func
+
 # Infoset libraries
 from infoset.utils import log
 from infoset.utils import jm_general
@@ -283,17 +286,19 @@ class GetDataPoint(object):
         # Get the result
         database = db.Database()
         session = database.session()
-        result = session.query(Datapoint).filter(
-            Datapoint.idx_agent == idx_agent)
+        result = session.query(
+            Datapoint.idx, Datapoint.agent_label,
+            Datapoint.uncharted_value).filter(
+                Datapoint.idx_agent == idx_agent)
 
         # Massage data
-        if result.count() > 0:
-            for instance in result:
-                agent_label = jm_general.decode(instance.agent_label)
-                idx = instance.idx
-                uncharted_value = jm_general.decode(instance.uncharted_value)
-                self.data_point_dict[agent_label] = (idx, uncharted_value)
-        else:
+        for instance in result:
+            agent_label = jm_general.decode(instance.agent_label)
+            idx = instance.idx
+            uncharted_value = jm_general.decode(instance.uncharted_value)
+            self.data_point_dict[agent_label] = (idx, uncharted_value)
+
+        if bool(self.data_point_dict) is False:
             log_message = ('Agent idx %s not found.') % (idx_agent)
             log.log2die(1050, log_message)
 
@@ -315,6 +320,57 @@ class GetDataPoint(object):
         return value
 
 
+def datapoint_summary(idx_agent, cursor=0, limit=1000):
+    """Get a page of datapoint summaries for an agent.
+
+    Only the columns required for the summary are read. Pages are ordered
+    by datapoint idx, so the idx of the last row returned can be used as
+    the cursor for the next page.
+
+    Only the most recent datapoint of each agent_label is returned, so
+    labels are unique across all pages. This matches the dict returned by
+    GetDataPoint.everything().
+
+    Args:
+        idx_agent: idx of agent
+        cursor: Only return datapoints with an idx greater than this
+        limit: Maximum number of rows to return
+
+    Returns:
+        rows: List of (idx, agent_label, uncharted_value) tuples
+
+    """
+    # Initialize key variables
+    rows = []
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    latest = session.query(
+        func.max(Datapoint.idx).label('idx')).filter(
+            Datapoint.idx_agent == idx_agent).group_by(
+                Datapoint.agent_label).subquery()
+    result = session.query(
+        Datapoint.idx, Datapoint.agent_label,
+        Datapoint.uncharted_value).join(
+            latest, Datapoint.idx == latest.c.idx).filter(
+                Datapoint.idx > cursor).order_by(
+                    Datapoint.idx).limit(limit)
+
+    # Massage data
+    for instance in result:
+        rows.append(
+            (instance.idx,
+             jm_general.decode(instance.agent_label),
+             jm_general.decode(instance.uncharted_value)))
+
+    # Return the session to the database pool after processing
+    session.close()
+
+    # Return
+    return rows
+
+
 def uid_exists(uid):
     """Determine whether the UID exists.
 
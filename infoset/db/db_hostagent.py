@@ -11,8 +11,9 @@ from sqlalchemy import and_
 
 # Infoset libraries
 from infoset.db import db
-from infoset.db.db_orm import HostAgent
+from infoset.db.db_orm import HostAgent, Host, Agent
 from infoset.utils import log
+from infoset.utils import jm_general
 
 
 class GetHostAgent(object):
@@ -191,3 +192,44 @@ def agent_indices(idx_host):
 
     # Return
     return idx_list
+
+
+def enabled_host_agents():
+    """Get all host / agent combinations where the agent is enabled.
+
+    Uses a single joined query instead of looking up each host and agent
+    separately.
+
+    Args:
+        None
+
+    Returns:
+        dict_list: List of dicts containing data, ordered by host
+
+    """
+    # Initialize key variables
+    dict_list = []
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    result = session.query(
+        Host.idx, Host.hostname, Agent.idx, Agent.name).filter(and_(
+            HostAgent.idx_host == Host.idx,
+            HostAgent.idx_agent == Agent.idx,
+            Agent.enabled == 1)).order_by(Host.idx, HostAgent.idx)
+
+    # Massage data
+    for instance in result:
+        data_dict = {}
+        data_dict['idx_host'] = instance[0]
+        data_dict['hostname'] = jm_general.decode(instance[1])
+        data_dict['idx_agent'] = instance[2]
+        data_dict['agent_name'] = jm_general.decode(instance[3])
+        dict_list.append(data_dict)
+
+    # Return the session to the database pool after processing
+    session.close()
+
+    # Return
+    return dict_list
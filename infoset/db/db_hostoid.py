@@ -4,11 +4,106 @@ Classes for oid data
 
 """
 # Python libraries
+import threading
+import time
+from collections import defaultdict
+
 from sqlalchemy import and_
+from sqlalchemy import func
 
 # Infoset libraries
+from infoset.utils import jm_general
 from infoset.db import db
-from infoset.db.db_orm import HostOID
+from infoset.db.db_orm import HostOID, Host, OID
+
+
+class PollingPlan(object):
+    """Class for the OIDs to poll on every host.
+
+    The plan for all hosts is read with a single query, and only read
+    again when the iset_host, iset_hostoid or iset_oid tables change.
+    Objects are thread safe so one can be shared by all pollers.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Methods:
+        __init__:
+        exists:
+        oids:
+    """
+
+    def __init__(self, check_interval=60):
+        """Function for intializing the class.
+
+        Args:
+            check_interval: Seconds between checks for database changes
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.check_interval = check_interval
+        self._plan = {}
+        self._version = None
+        self._checked = 0
+        self._lock = threading.Lock()
+
+    def exists(self, hostname):
+        """Determine whether the hostname exists.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            found: True if found
+
+        """
+        # Return
+        found = hostname in self._refresh()
+        return found
+
+    def oids(self, hostname):
+        """Get the OIDs to poll on a host.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            oids: List of dicts of OID data with the keys oid_values,
+                oid_labels, agent_label, base_type and multiplier
+
+        """
+        # Return
+        oids = self._refresh().get(hostname, [])
+        return oids
+
+    def _refresh(self):
+        """Read the plan again if the database has changed.
+
+        Args:
+            None
+
+        Returns:
+            plan: Dict of lists of OID data keyed by hostname
+
+        """
+        # Only check the database version occasionally
+        with self._lock:
+            now = time.time()
+            if now - self._checked >= self.check_interval:
+                self._checked = now
+                version = plan_version()
+                if version != self._version:
+                    self._plan = polling_plan()
+                    self._version = version
+
+            # Return
+            return self._plan
 
 
 def host_oid_exists(idx_host, idx_oid):
@@ -98,3 +193,78 @@ def oid_indices(idx_host):
 
     # Return
     return idx_list
+
+
+def polling_plan():
+    """Get the OIDs to poll on every host with a single query.
+
+    Args:
+        None
+
+    Returns:
+        plan: Dict of lists of OID data keyed by hostname. Hosts without
+            OIDs have empty lists
+
+    """
+    # Initialize key variables
+    plan = defaultdict(list)
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+    result = session.query(
+        Host.hostname, OID.oid_values, OID.oid_labels, OID.agent_label,
+        OID.base_type, OID.multiplier).outerjoin(
+            HostOID, HostOID.idx_host == Host.idx).outerjoin(
+                OID, OID.idx == HostOID.idx_oid)
+
+    # Massage data
+    for instance in result:
+        hostname = jm_general.decode(instance.hostname)
+        oids = plan[hostname]
+        if instance.oid_values is None:
+            continue
+        oids.append({
+            'oid_values': jm_general.decode(instance.oid_values),
+            'oid_labels': jm_general.decode(instance.oid_labels),
+            'agent_label': jm_general.decode(instance.agent_label),
+            'base_type': instance.base_type,
+            'multiplier': instance.multiplier})
+
+    # Return the session to the database pool after processing
+    session.close()
+
+    # Return
+    return dict(plan)
+
+
+def plan_version():
+    """Get a value that changes when the polling plan changes.
+
+    Args:
+        None
+
+    Returns:
+        version: Tuple of row counts and last modification times of the
+            iset_host, iset_hostoid and iset_oid tables
+
+    """
+    # Initialize key variables
+    columns = []
+
+    # Establish a database session
+    database = db.Database()
+    session = database.session()
+
+    # Get the counts and modification times in a single query. Counts
+    # change when rows are deleted
+    for table in [Host, HostOID, OID]:
+        columns.append(session.query(func.count(table.idx)).as_scalar())
+        columns.append(session.query(func.max(table.ts_modified)).as_scalar())
+    version = tuple(session.query(*columns).one())
+
+    # Return the session to the database pool after processing
+    session.close()
+
+    # Return
+    return version
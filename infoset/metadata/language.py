@@ -9,6 +9,7 @@ Description:
 """
 # Standard libraries
 import os
+import threading
 import yaml
 
 # infoset libraries
@@ -16,6 +17,11 @@ from infoset.utils import log
 from infoset.utils import jm_configuration
 from infoset.utils import jm_general
 
+# Process-wide cache of parsed language files.
+# Keyed by (language, agent_name), values are (mtime, yaml_data) tuples
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
 
 class Agent(object):
     """Class to handle languages for agents.
@@ -28,15 +34,17 @@ class Agent(object):
 
     Functions:
         __init__:
-        populate:
-        post:
+        label_description:
+        label_descriptions:
+        label_units:
     """
 
-    def __init__(self, agent_name):
+    def __init__(self, agent_name, lang=None):
         """Method initializing the class.
 
         Args:
-            agent_name
+            agent_name: Name of agent
+            lang: Language to use. Read from the configuration if None
 
         Returns:
             None
@@ -44,27 +52,14 @@ class Agent(object):
         """
         # Initialize key variables
         self.agent_name = agent_name
-        self.agent_yaml = {}
 
         # Get the language used
-        config = jm_configuration.Config()
-        lang = config.language()
-
-        # Determine the agent's language yaml file
-        root_directory = jm_general.root_directory()
-        yaml_file = (
-            '%s/infoset/metadata/%s/agents/%s.yaml') % (
-                root_directory, lang, self.agent_name)
-
-        # Read the agent's language yaml file
-        if os.path.exists(yaml_file) is True:
-            with open(yaml_file, 'r') as file_handle:
-                yaml_from_file = file_handle.read()
-            self.agent_yaml = yaml.load(yaml_from_file)
-        else:
-            log_message = ('Agent language file %s does not exist.') % (
-                yaml_file)
-            log.log2warn(1034, log_message)
+        if lang is None:
+            config = jm_configuration.Config()
+            lang = config.language()
+
+        # Read the agent's language yaml file (cached)
+        self.agent_yaml = _agent_yaml(lang, self.agent_name)
 
     def label_description(self, agent_label):
         """Return the name of the agent.
@@ -91,6 +86,36 @@ class Agent(object):
         # Return
         return value
 
+    def label_descriptions(self, agent_labels):
+        """Return the descriptions of many agent labels at once.
+
+        Args:
+            agent_labels: Iterable of agent labels
+
+        Returns:
+            values: Dict of label descriptions keyed by agent label.
+                Labels without descriptions have a value of ''
+
+        """
+        # Initialize key variables
+        values = {}
+        data = {}
+        top_key = 'agent_source_descriptions'
+
+        if top_key in self.agent_yaml:
+            data = self.agent_yaml[top_key]
+
+        # Process labels
+        for agent_label in agent_labels:
+            value = ''
+            if agent_label in data:
+                if 'description' in data[agent_label]:
+                    value = data[agent_label]['description']
+            values[agent_label] = value
+
+        # Return
+        return values
+
     def label_units(self, agent_label):
         """Return the name of the agent.
 
@@ -116,3 +141,57 @@ class Agent(object):
 
         # Return
         return value
+
+
+def _agent_yaml(lang, agent_name):
+    """Return the parsed language file for an agent.
+
+    The file is only parsed again if its modification time changes.
+
+    Args:
+        lang: Language
+        agent_name: Name of agent
+
+    Returns:
+        agent_yaml: Dict of data from the language file
+
+    """
+    # Initialize key variables
+    agent_yaml = {}
+    key = (lang, agent_name)
+
+    # Determine the agent's language yaml file
+    root_directory = jm_general.root_directory()
+    yaml_file = (
+        '%s/infoset/metadata/%s/agents/%s.yaml') % (
+            root_directory, lang, agent_name)
+
+    # Get the file's modification time
+    try:
+        mtime = os.path.getmtime(yaml_file)
+    except OSError:
+        log_message = ('Agent language file %s does not exist.') % (
+            yaml_file)
+        log.log2warn(1034, log_message)
+        return agent_yaml
+
+    # Return cached data if the file hasn't changed
+    with _CACHE_LOCK:
+        if key in _CACHE:
+            (cached_mtime, cached_yaml) = _CACHE[key]
+            if cached_mtime == mtime:
+                return cached_yaml
+
+    # Read the agent's language yaml file
+    with open(yaml_file, 'r') as file_handle:
+        yaml_from_file = file_handle.read()
+    agent_yaml = yaml.load(yaml_from_file)
+    if agent_yaml is None:
+        agent_yaml = {}
+
+    # Update the cache
+    with _CACHE_LOCK:
+        _CACHE[key] = (mtime, agent_yaml)
+
+    # Return
+    return agent_yaml
@@ -1,5 +1,7 @@
 """Infoset snmp package."""
 
+import importlib
+
 from infoset.snmp.base_query import Query
 
 from infoset.snmp import jm_iana_enterprise
@@ -16,35 +18,125 @@ from infoset.snmp.mib_lldp import LldpQuery
 from infoset.snmp.mib_qbridge import QbridgeQuery
 from infoset.snmp.mib_snmpv2 import Snmpv2Query
 
-from infoset.snmp.cisco import CiscoC2900Query
-from infoset.snmp.cisco import CiscoCdpQuery
-from infoset.snmp.cisco import CiscoIetfIpQuery
-from infoset.snmp.cisco import CiscoStackQuery
-from infoset.snmp.cisco import CiscoVlanMembershipQuery
-from infoset.snmp.cisco import CiscoVtpQuery
-
-from infoset.snmp.juniper import JuniperVlanQuery
-
 
 __all__ = ('cisco', 'juniper')
 
-QUERIES = [CiscoC2900Query, CiscoVtpQuery, CiscoIetfIpQuery,
-           CiscoCdpQuery, CiscoStackQuery, CiscoVlanMembershipQuery,
+# Layers of data gathered by MIB queries
+LAYERS = ('layer1', 'layer2', 'layer3', 'system')
+
+# MIB queries in the order their results are merged. Vendor MIB queries
+# are named by vendor, module and class. They are only used for devices
+# of the vendor, and their modules are only imported when first needed.
+QUERIES = [('cisco', 'infoset.snmp.cisco.mib_ciscoc2900', 'CiscoC2900Query'),
+           ('cisco', 'infoset.snmp.cisco.mib_ciscovtp', 'CiscoVtpQuery'),
+           ('cisco', 'infoset.snmp.cisco.mib_ciscoietfip',
+            'CiscoIetfIpQuery'),
+           ('cisco', 'infoset.snmp.cisco.mib_ciscocdp', 'CiscoCdpQuery'),
+           ('cisco', 'infoset.snmp.cisco.mib_ciscostack', 'CiscoStackQuery'),
+           ('cisco', 'infoset.snmp.cisco.mib_ciscovlanmembership',
+            'CiscoVlanMembershipQuery'),
            Snmpv2Query, IfQuery, BridgeQuery, IpQuery,
            Ipv6Query, EtherlikeQuery, EntityQuery, LldpQuery,
-           EssSwitchQuery, JuniperVlanQuery, QbridgeQuery]
+           EssSwitchQuery,
+           ('juniper', 'infoset.snmp.juniper.mib_junipervlan',
+            'JuniperVlanQuery'),
+           QbridgeQuery]
 
+# Methods of jm_iana_enterprise.Query that identify each vendor
+VENDORS = {
+    'cisco': 'is_cisco',
+    'juniper': 'is_juniper'}
 
-def get_queries(layer):
+# MIB queries for each layer, keyed by vendor and then layer. The vendor
+# is None when it isn't known, and an empty string for vendors without
+# vendor MIB queries
+_REGISTRY = {}
+
+
+def get_queries(layer, enterprise=None):
     """Get mib queries which gather information related to a specific OSI layer.
 
     Args:
-        tag: The layer of queries needed
+        layer: The layer of queries needed
+        enterprise: IANA enterprise number of the device. Queries for the
+            MIBs of all vendors are returned if None
 
     Returns:
         queries: List of queries tagged the given layer
 
     """
-    return [
-        class_object for class_object in QUERIES if layer in dir(
-            class_object)]
+    # Return
+    queries = _registry(_vendor(enterprise)).get(layer, [])
+    return queries
+
+
+def _vendor(enterprise):
+    """Get the vendor with vendor MIB queries for an enterprise number.
+
+    Args:
+        enterprise: IANA enterprise number. None if not known
+
+    Returns:
+        vendor: Vendor. None if the enterprise number isn't known, an
+            empty string if the vendor has no vendor MIB queries
+
+    """
+    # Initialize key variables
+    vendor = None
+
+    # Identify the vendor
+    if enterprise is not None:
+        vendor = ''
+        query = jm_iana_enterprise.Query(enterprise=enterprise)
+        for name, method in sorted(VENDORS.items()):
+            if getattr(query, method)() is True:
+                vendor = name
+                break
+
+    # Return
+    return vendor
+
+
+def _registry(vendor):
+    """Get the MIB queries for each layer for a vendor's devices.
+
+    The registry is only built once for each vendor.
+
+    Args:
+        vendor: Vendor. None if not known
+
+    Returns:
+        registry: Dict of lists of MIB query classes keyed by layer
+
+    """
+    # Build the registry if necessary
+    if vendor not in _REGISTRY:
+        # Initialize key variables
+        registry = dict((layer, []) for layer in LAYERS)
+
+        # Get the classes in order, importing vendor modules
+        for item in QUERIES:
+            if isinstance(item, tuple) is True:
+                (query_vendor, module_name, class_name) = item
+                if vendor is not None and vendor != query_vendor:
+                    continue
+                module = importlib.import_module(module_name)
+                class_object = getattr(module, class_name)
+            else:
+                class_object = item
+
+            # Add the class to each layer it gathers data for
+            for layer in LAYERS:
+                if layer in dir(class_object):
+                    registry[layer].append(class_object)
+
+        # Update. Another thread may have done this already, which is
+        # harmless
+        _REGISTRY[vendor] = registry
+
+    # Return
+    return _REGISTRY[vendor]
+
+
+# Build the registry for devices without vendor MIB queries
+_registry('')
@@ -23,6 +23,18 @@ class Query(object):
 
     tags = []
 
+    # Names of snmp_info.INDICATORS that change when the MIB's data does.
+    # Data is only walked again on incremental polls if one of them has
+    # changed. None if the data must be walked on every poll
+    indicators = None
+
+    # Fields of the data that only change when one of the indicators
+    # does, keyed by layer. If set, the layer's method is called with the
+    # fields to skip on incremental polls, and the other fields and
+    # layers are walked on every poll. None if all the data only changes
+    # with the indicators
+    static = None
+
     def __init__(self, snmp_object, test_oid, tags):
         """Function for intializing the class.
 
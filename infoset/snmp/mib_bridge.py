@@ -2,10 +2,26 @@
 """Class interacts with devices supporting BRIDGE-MIB."""
 
 
+import asyncio
 from collections import defaultdict
-import binascii
 
 from infoset.snmp.base_query import Query
+from infoset.snmp import jm_iana_enterprise
+from infoset.snmp import snmp_engine
+
+# BRIDGE-MIB dot1dTpFdbPort and dot1dBasePortIfIndex
+_DOT1DTPFDBPORT = '.1.3.6.1.2.1.17.4.3.1.2'
+_DOT1DBASEPORTIFINDEX = '.1.3.6.1.2.1.17.1.4.1.2'
+
+# Q-BRIDGE-MIB dot1qTpFdbPort and dot1qVlanFdbId
+_DOT1QTPFDBPORT = '.1.3.6.1.2.1.17.7.1.2.2.1.2'
+_DOT1QVLANFDBID = '.1.3.6.1.2.1.17.7.1.4.2.1.3'
+
+# CISCO-VTP-MIB vtpVlanState
+_VTPVLANSTATE = '.1.3.6.1.4.1.9.9.46.1.3.1.1.2'
+
+# Cisco VLANs reserved for FDDI and Token Ring
+_RESERVED_VLANS = range(1002, 1006)
 
 
 def get_query():
@@ -48,11 +64,34 @@ class BridgeQuery(Query):
             None
 
         """
-        # Get one OID entry in MIB (dot1dBasePortIfIndex)
-        test_oid = '.1.3.6.1.2.1.17.4.3.1.2'
+        # Get one OID entry in MIB (dot1dTpFdbPort)
+        test_oid = _DOT1DTPFDBPORT
 
         super().__init__(snmp_object, test_oid, tags=['layer1'])
 
+    def supported(self):
+        """Return device's support for the MIB.
+
+        Devices that only support the MAC address table of Q-BRIDGE-MIB
+        are supported too.
+
+        Args:
+            None
+
+        Returns:
+            validity: True if supported
+
+        """
+        # Initialize key variables
+        validity = False
+
+        # Return
+        for oid in [self.test_oid, _DOT1QTPFDBPORT]:
+            if self.snmp_object.oid_exists(oid) is True:
+                validity = True
+                break
+        return validity
+
     def layer1(self):
         """Get layer 1 data from device.
 
@@ -69,111 +108,213 @@ class BridgeQuery(Query):
     def _macaddresstable(self):
         """Return dict of the devices MAC address table.
 
+        The Q-BRIDGE-MIB table is used if the device supports it, as it
+        has the MAC addresses of all VLANs. Otherwise the BRIDGE-MIB table
+        is used. Cisco devices only show the BRIDGE-MIB table of one VLAN
+        at a time, so the table of each VLAN is walked concurrently.
+
         Args:
             None
 
         Returns:
-            final: Dict of MAC addresses keyed by ifIndex
+            final: Dict of MAC addresses (jm_macs) and the VLANs of each
+                MAC address (jm_macvlans) keyed by ifIndex
 
         """
         # Initialize key variables
-        data_dict = defaultdict(lambda: defaultdict(dict))
         final = defaultdict(lambda: defaultdict(dict))
-        baseport = self._dot1dtpfdbport()
-        macs = self._dot1dtpfdbaddress()
-        baseportifindex = self.dot1dbaseport_2_ifindex()
-
-        # Create a dict keyed by ifIndex
-        for key, value in macs.items():
-            # Get ifIndex from dot1dBasePort
-            ifindex = baseportifindex[int(baseport[key])]
-
-            # With multi-threading sometimes baseportifindex has empty values.
-            if bool(ifindex) is False:
-                continue
-
-            # Assign MAC addresses to ifIndex
-            if ifindex not in data_dict:
-                data_dict[ifindex] = [value]
-            else:
-                data_dict[ifindex].append(value)
+        engine = snmp_engine.engine()
+        entries = []
+
+        # Get (ifIndex, VLAN, MAC address) entries
+        if self.snmp_object.oid_exists(_DOT1QTPFDBPORT) is True:
+            entries = engine.run(_dot1qtpfdb(self.snmp_object))
+        if bool(entries) is False:
+            contexts = [(vlan, self.snmp_object.context(
+                _context(self.snmp_object, vlan))) for vlan in self._vlans()]
+            if bool(contexts) is False:
+                contexts = [(None, self.snmp_object)]
+            results = engine.gather([
+                _dot1dtpfdb(snmp_object, vlan=vlan)
+                for (vlan, snmp_object) in contexts])
+            for result in results:
+                if result is not None:
+                    entries.extend(result)
 
         # Assign MACs to secondary key for final result
-        for key, value in data_dict.items():
-            final[key]['jm_macs'] = []
-            for next_mac in value:
-                final[key]['jm_macs'].append(next_mac)
+        for (ifindex, vlan, macaddress) in entries:
+            if 'jm_macs' not in final[ifindex]:
+                final[ifindex]['jm_macs'] = []
+                final[ifindex]['jm_macvlans'] = {}
+            if macaddress not in final[ifindex]['jm_macvlans']:
+                final[ifindex]['jm_macs'].append(macaddress)
+                final[ifindex]['jm_macvlans'][macaddress] = []
+            if vlan is not None:
+                final[ifindex]['jm_macvlans'][macaddress].append(vlan)
 
         # Return
         return final
 
-    def _dot1dtpfdbport(self):
-        """Return dict of BRIDGE-MIB dot1dtpfdbport data.
+    def _vlans(self):
+        """Return the VLANs with a MAC address table of their own.
 
         Args:
             None
 
         Returns:
-            data_dict: Dict of dot1dtpfdbport using the OID nodes
-                excluding the OID root as key
+            vlans: Sorted list of operational VLANs of Cisco devices. Empty
+                for other devices
 
         """
         # Initialize key variables
-        data_dict = defaultdict(dict)
+        vlans = set()
 
-        # Process values
-        oid = '.1.3.6.1.2.1.17.4.3.1.2'
-        results = self.snmp_object.walk(oid, normalized=False)
+        # Only Cisco devices have a table for each VLAN
+        enterprise = jm_iana_enterprise.Query(
+            enterprise=self.snmp_object.enterprise_number())
+        if enterprise.is_cisco() is False:
+            return []
+
+        # Process CISCO-VTP-MIB vtpVlanState values
+        results = self.snmp_object.swalk(_VTPVLANSTATE, normalized=False)
         for key, value in results.items():
-            new_key = key[len(oid):]
-            data_dict[new_key] = value
+            vlan = int(key.split('.')[-1])
+            if value == 1 and vlan not in _RESERVED_VLANS:
+                vlans.add(vlan)
 
-        # Return data
-        return data_dict
+        # Return
+        return sorted(vlans)
 
-    def _dot1dtpfdbaddress(self):
-        """Return dict of BRIDGE-MIB dot1dTpFdbAddress data.
+    def dot1dbaseport_2_ifindex(self):
+        """Return dict of BRIDGE-MIB dot1dBasePortIfIndex data.
 
         Args:
             None
 
         Returns:
-            data_dict: Dict of dot1dTpFdbAddress using the OID nodes
-                excluding the OID root as key
+            data_dict: Dict of dot1dBasePortIfIndex with dot1dBasePort as key.
 
         """
         # Initialize key variables
         data_dict = defaultdict(dict)
 
         # Process values
-        oid = '.1.3.6.1.2.1.17.4.3.1.1'
-        results = self.snmp_object.walk(oid, normalized=False)
+        results = self.snmp_object.walk(
+            _DOT1DBASEPORTIFINDEX, normalized=True)
         for key, value in results.items():
-            new_key = key[len(oid):]
-            macaddress = binascii.hexlify(value).decode('utf-8')
-            data_dict[new_key] = macaddress.lower()
+            data_dict[int(key)] = value
 
         # Return data
         return data_dict
 
-    def dot1dbaseport_2_ifindex(self):
-        """Return dict of BRIDGE-MIB dot1dBasePortIfIndex data.
 
-        Args:
-            None
+async def _dot1qtpfdb(snmp_object):
+    """Return the entries of the Q-BRIDGE-MIB MAC address table.
 
-        Returns:
-            data_dict: Dict of dot1dBasePortIfIndex with dot1dBasePort as key.
+    Args:
+        snmp_object: SNMP Interact class object from snmp_manager.py
 
-        """
-        # Initialize key variables
-        data_dict = defaultdict(dict)
+    Returns:
+        entries: List of (ifIndex, VLAN, MAC address) tuples
 
-        # Process values
-        oid = '.1.3.6.1.2.1.17.1.4.1.2'
-        results = self.snmp_object.walk(oid, normalized=True)
-        for key, value in results.items():
-            data_dict[int(key)] = value
+    """
+    # Initialize key variables
+    entries = []
+    vlans = defaultdict(list)
+
+    # Walk the tables concurrently
+    (ports, fdbids, baseports) = await asyncio.gather(
+        snmp_object.walk_async(_DOT1QTPFDBPORT, normalized=False),
+        snmp_object.swalk_async(_DOT1QVLANFDBID, normalized=False),
+        snmp_object.walk_async(_DOT1DBASEPORTIFINDEX, normalized=True))
+
+    # Get the VLANs of each filtering database. Devices that don't
+    # report them use the VLAN number
+    for key, value in fdbids.items():
+        vlans[value].append(int(key.split('.')[-1]))
+
+    # Process dot1qTpFdbPort values. They are indexed by the filtering
+    # database and MAC address
+    for key, value in ports.items():
+        nodes = key[len(_DOT1QTPFDBPORT) + 1:].split('.')
+        fdbid = int(nodes[0])
+        macaddress = _macaddress(nodes[1:])
+        ifindex = baseports.get(str(value))
+        if bool(ifindex) is False:
+            continue
+        for vlan in vlans.get(fdbid, [fdbid]):
+            entries.append((ifindex, vlan, macaddress))
+
+    # Return
+    return entries
+
+
+async def _dot1dtpfdb(snmp_object, vlan=None):
+    """Return the entries of the BRIDGE-MIB MAC address table.
 
-        # Return data
-        return data_dict
+    Args:
+        snmp_object: SNMP Interact class object from snmp_manager.py
+        vlan: VLAN of the table. None if not known
+
+    Returns:
+        entries: List of (ifIndex, VLAN, MAC address) tuples
+
+    """
+    # Initialize key variables
+    entries = []
+
+    # Walk the tables concurrently. VLANs may have no table
+    if vlan is None:
+        walk = snmp_object.walk_async
+    else:
+        walk = snmp_object.swalk_async
+    (ports, baseports) = await asyncio.gather(
+        walk(_DOT1DTPFDBPORT, normalized=False),
+        walk(_DOT1DBASEPORTIFINDEX, normalized=True))
+
+    # Process dot1dTpFdbPort values. They are indexed by MAC address
+    for key, value in ports.items():
+        macaddress = _macaddress(key[len(_DOT1DTPFDBPORT) + 1:].split('.'))
+        ifindex = baseports.get(str(value))
+
+        # With multi-threading sometimes baseportifindex has empty values.
+        if bool(ifindex) is False:
+            continue
+        entries.append((ifindex, vlan, macaddress))
+
+    # Return
+    return entries
+
+
+def _context(snmp_object, vlan):
+    """Return the name of the SNMP context of a VLAN of a Cisco device.
+
+    Args:
+        snmp_object: SNMP Interact class object from snmp_manager.py
+        vlan: VLAN
+
+    Returns:
+        name: Context name
+
+    """
+    # Return
+    if snmp_object.snmp_params['snmp_version'] == 3:
+        name = ('vlan-%s') % (vlan)
+    else:
+        name = str(vlan)
+    return name
+
+
+def _macaddress(nodes):
+    """Return a MAC address from the nodes of an OID.
+
+    Args:
+        nodes: List of the six decimal nodes of the MAC address
+
+    Returns:
+        macaddress: Lower case hex string
+
+    """
+    # Return
+    macaddress = ''.join(['%02x' % (int(node)) for node in nodes[-6:]])
+    return macaddress
@@ -43,6 +43,9 @@ class EntityQuery(Query):
 
     """
 
+    # Changes to the data are shown by entLastChangeTime
+    indicators = ['entity']
+
     def __init__(self, snmp_object):
         """Function for intializing the class.
 
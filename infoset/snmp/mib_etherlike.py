@@ -37,6 +37,10 @@ class EtherlikeQuery(Query):
 
     """
 
+    # The duplex status is negotiated when a link comes up, which changes
+    # ifLastChange
+    indicators = ['interfaces']
+
     def __init__(self, snmp_object):
         """Function for intializing the class.
 
@@ -38,6 +38,15 @@ class IfQuery(Query):
 
     """
 
+    # Rows are added and removed when ifTableLastChange changes, and the
+    # operational status changes with ifLastChange. The alias, speed,
+    # administrative status, counters and interface stack can change
+    # without either, so they are walked on every poll
+    indicators = ['interfaces']
+    static = {'layer1': [
+        'ifDescr', 'ifType', 'ifName', 'ifIndex', 'ifOperStatus',
+        'ifLastChange']}
+
     def __init__(self, snmp_object):
         """Function for intializing the class.
 
@@ -73,11 +82,11 @@ class IfQuery(Query):
         final['IF-MIB']['ifStackStatus'] = self.ifstackstatus()
         return final
 
-    def layer1(self):
+    def layer1(self, skip=None):
         """Get layer 1 data from device using Layer 1 OIDs.
 
         Args:
-            None
+            skip: List of fields not to walk
 
         Returns:
             final: Final results
@@ -87,52 +96,56 @@ class IfQuery(Query):
         final = defaultdict(lambda: defaultdict(dict))
 
         # Get interface ifDescr data
-        _get_data('ifDescr', self.ifdescr, final)
+        _get_data('ifDescr', self.ifdescr, final, skip=skip)
 
         # Get interface ifAlias data
-        _get_data('ifAlias', self.ifalias, final)
+        _get_data('ifAlias', self.ifalias, final, skip=skip)
 
         # Get interface ifSpeed data
-        _get_data('ifSpeed', self.ifspeed, final)
+        _get_data('ifSpeed', self.ifspeed, final, skip=skip)
 
         # Get interface ifOperStatus data
-        _get_data('ifOperStatus', self.ifoperstatus, final)
+        _get_data('ifOperStatus', self.ifoperstatus, final, skip=skip)
 
         # Get interface ifAdminStatus data
-        _get_data('ifAdminStatus', self.ifadminstatus, final)
+        _get_data('ifAdminStatus', self.ifadminstatus, final, skip=skip)
 
         # Get interface ifType data
-        _get_data('ifType', self.iftype, final)
+        _get_data('ifType', self.iftype, final, skip=skip)
 
         # Get interface ifName data
-        _get_data('ifName', self.ifname, final)
+        _get_data('ifName', self.ifname, final, skip=skip)
 
         # Get interface ifIndex data
-        _get_data('ifIndex', self.ifindex, final)
+        _get_data('ifIndex', self.ifindex, final, skip=skip)
 
         # Get interface ifPhysAddress data
-        _get_data('ifPhysAddress', self.ifphysaddress, final)
+        _get_data('ifPhysAddress', self.ifphysaddress, final, skip=skip)
 
         # Get interface ifInOctets data
-        _get_data('ifInOctets', self.ifinoctets, final)
+        _get_data('ifInOctets', self.ifinoctets, final, skip=skip)
 
         # Get interface ifOutOctets data
-        _get_data('ifOutOctets', self.ifoutoctets, final)
+        _get_data('ifOutOctets', self.ifoutoctets, final, skip=skip)
 
         # Get interface ifInBroadcastPkts data
-        _get_data('ifInBroadcastPkts', self.ifinbroadcastpkts, final)
+        _get_data(
+            'ifInBroadcastPkts', self.ifinbroadcastpkts, final, skip=skip)
 
         # Get interface ifOutBroadcastPkts data
-        _get_data('ifOutBroadcastPkts', self.ifoutbroadcastpkts, final)
+        _get_data(
+            'ifOutBroadcastPkts', self.ifoutbroadcastpkts, final, skip=skip)
 
         # Get interface ifInMulticastPkts data
-        _get_data('ifInMulticastPkts', self.ifinmulticastpkts, final)
+        _get_data(
+            'ifInMulticastPkts', self.ifinmulticastpkts, final, skip=skip)
 
         # Get interface ifOutMulticastPkts data
-        _get_data('ifOutMulticastPkts', self.ifoutmulticastpkts, final)
+        _get_data(
+            'ifOutMulticastPkts', self.ifoutmulticastpkts, final, skip=skip)
 
         # Get interface ifLastChange data
-        _get_data('ifLastChange', self.iflastchange, final)
+        _get_data('ifLastChange', self.iflastchange, final, skip=skip)
 
         # Return
         return final
@@ -599,18 +612,23 @@ class IfQuery(Query):
         return final
 
 
-def _get_data(title, func, dest):
+def _get_data(title, func, dest, skip=None):
     """Populate dest with data from the given function.
 
     Args:
         title: The name of the data
         func: The function which will return the data
         dest: a dict which will store the data
+        skip: List of the names of data not to get
 
     Returns:
         dest: The modified destination dict
 
     """
+    # Skip data that isn't needed
+    if skip is not None and title in skip:
+        return dest
+
     # Get interface ifDescr data
     values = func()
     for key, value in values.items():
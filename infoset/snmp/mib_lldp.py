@@ -40,6 +40,9 @@ class LldpQuery(Query):
 
     """
 
+    # Changes to the data are shown by lldpStatsRemTablesLastChangeTime
+    indicators = ['lldp']
+
     def __init__(self, snmp_object):
         """Function for intializing the class.
 
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Persistent cache of SNMP information about hosts.
+
+The cache stores the SNMP credential group that works for a host, its
+sysObjectID, the OIDs it supports and the largest GETBULK size it
+accepts. This saves several round trips to each device every poll.
+
+Each host has a YAML file in the hidden snmp_cache directory so that the
+information is shared by all agents and scripts. Entries expire after
+server:snmp_cache_ttl seconds, and are discarded if the cached
+credentials stop working.
+
+"""
+
+# Standard libraries
+import os
+import tempfile
+import threading
+import time
+
+# pip libraries
+import yaml
+
+# Infoset libraries
+from infoset.utils import hidden
+from infoset.utils import jm_configuration
+
+# Process-wide copy of the cache files.
+# Keyed by hostname, values are (mtime, data) tuples
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+# Time to live of cache entries
+_TTL = None
+
+
+class Host(object):
+    """Class for the cached SNMP information of a host.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        group:
+        update_group:
+        invalidate:
+        sysobjectid:
+        update_sysobjectid:
+        supported:
+        update_supported:
+        max_repetitions:
+        update_max_repetitions:
+    """
+
+    def __init__(self, hostname):
+        """Method initializing the class.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.hostname = hostname
+        self.filename = hidden.File().snmp_cache(hostname)
+
+    def group(self, stale=False):
+        """Get the cached SNMP credential group for the host.
+
+        Args:
+            stale: Return the group even if the entry has expired
+
+        Returns:
+            group_name: Group name, None if not cached
+
+        """
+        # Initialize key variables
+        group_name = None
+        data = self._data(stale=stale)
+
+        # Get the group
+        if 'group_name' in data:
+            group_name = data['group_name']
+
+        # Return
+        return group_name
+
+    def update_group(self, group_name, sysobjectid=None):
+        """Cache the SNMP credential group that works for the host.
+
+        A new entry is started if the group changes or the entry has
+        expired.
+
+        Args:
+            group_name: Group name
+            sysobjectid: sysObjectID of the host, if known
+
+        Returns:
+            None
+
+        """
+        # Only update if something has changed
+        with _CACHE_LOCK:
+            data = self._data(locked=True)
+            if data.get('group_name') != group_name:
+                data = {
+                    'group_name': group_name,
+                    'timestamp': int(time.time())}
+                if sysobjectid is not None:
+                    data['sysobjectid'] = sysobjectid
+                self._write(data)
+            elif sysobjectid is not None:
+                if data.get('sysobjectid') != sysobjectid:
+                    self._write(dict(data, sysobjectid=sysobjectid))
+
+    def invalidate(self, group_name=None):
+        """Discard the cached information for the host.
+
+        Args:
+            group_name: Only discard if this is the cached group. Always
+                discard if None
+
+        Returns:
+            None
+
+        """
+        # Discard
+        with _CACHE_LOCK:
+            data = self._data(stale=True, locked=True)
+            if bool(data) is False:
+                return
+            if group_name is None or data.get('group_name') == group_name:
+                self._write({})
+
+    def sysobjectid(self):
+        """Get the cached sysObjectID of the host.
+
+        Args:
+            None
+
+        Returns:
+            value: sysObjectID, None if not cached
+
+        """
+        # Return
+        return self._data().get('sysobjectid')
+
+    def update_sysobjectid(self, value):
+        """Cache the sysObjectID of the host.
+
+        Args:
+            value: sysObjectID
+
+        Returns:
+            None
+
+        """
+        # Update
+        self._update('sysobjectid', value)
+
+    def supported(self, oid):
+        """Get whether the host is known to support an OID.
+
+        Args:
+            oid: OID
+
+        Returns:
+            value: True or False, None if not cached
+
+        """
+        # Return
+        return self._data().get('supported', {}).get(oid)
+
+    def update_supported(self, oid, value):
+        """Cache whether the host supports an OID.
+
+        Args:
+            oid: OID
+            value: True if supported
+
+        Returns:
+            None
+
+        """
+        # Update
+        with _CACHE_LOCK:
+            data = self._data(locked=True)
+            if bool(data) is False:
+                return
+            supported = dict(data.get('supported', {}))
+            if supported.get(oid) != value:
+                supported[oid] = value
+                self._write(dict(data, supported=supported))
+
+    def max_repetitions(self):
+        """Get the largest GETBULK max-repetitions the host accepts.
+
+        Args:
+            None
+
+        Returns:
+            value: max-repetitions, None if not cached
+
+        """
+        # Return
+        return self._data().get('max_repetitions')
+
+    def update_max_repetitions(self, value):
+        """Cache the largest GETBULK max-repetitions the host accepts.
+
+        Args:
+            value: max-repetitions
+
+        Returns:
+            None
+
+        """
+        # Update
+        self._update('max_repetitions', value)
+
+    def _update(self, key, value):
+        """Update a value in an unexpired entry.
+
+        Args:
+            key: Key
+            value: Value
+
+        Returns:
+            None
+
+        """
+        # Update. Values are only cached alongside working credentials
+        with _CACHE_LOCK:
+            data = self._data(locked=True)
+            if bool(data) is False:
+                return
+            if data.get(key) != value:
+                self._write(dict(data, **{key: value}))
+
+    def _data(self, stale=False, locked=False):
+        """Read the host's cache entry.
+
+        Args:
+            stale: Return the entry even if it has expired
+            locked: True if _CACHE_LOCK is already held
+
+        Returns:
+            data: Dict of cached data. Empty if there is none
+
+        """
+        # Read the file
+        if locked is True:
+            data = _read(self.hostname, self.filename)
+        else:
+            with _CACHE_LOCK:
+                data = _read(self.hostname, self.filename)
+
+        # Ignore expired entries
+        if stale is False:
+            if int(time.time()) - data.get('timestamp', 0) > _ttl():
+                data = {}
+
+        # Return
+        return data
+
+    def _write(self, data):
+        """Write the host's cache entry. _CACHE_LOCK must be held.
+
+        The file is replaced atomically as other processes may read it.
+
+        Args:
+            data: Dict of data
+
+        Returns:
+            None
+
+        """
+        # Write to a temporary file first
+        directory = os.path.dirname(self.filename)
+        (file_descriptor, temp_file) = tempfile.mkstemp(dir=directory)
+        with os.fdopen(file_descriptor, 'w') as f_handle:
+            yaml.safe_dump(data, f_handle, default_flow_style=False)
+        os.replace(temp_file, self.filename)
+
+        # Update the process-wide copy
+        _CACHE[self.hostname] = (os.path.getmtime(self.filename), data)
+
+
+def _read(hostname, filename):
+    """Read a host's cache file. _CACHE_LOCK must be held.
+
+    The file is only parsed again if its modification time changes.
+
+    Args:
+        hostname: Hostname
+        filename: Cache filename
+
+    Returns:
+        data: Dict of cached data. Empty if there is none
+
+    """
+    # Initialize key variables
+    data = {}
+
+    # Get the file's modification time
+    try:
+        mtime = os.path.getmtime(filename)
+    except OSError:
+        return data
+
+    # Return cached data if the file hasn't changed
+    if hostname in _CACHE:
+        (cached_mtime, cached_data) = _CACHE[hostname]
+        if cached_mtime == mtime:
+            return cached_data
+
+    # Read the file
+    with open(filename, 'r') as f_handle:
+        try:
+            data = yaml.safe_load(f_handle)
+        except yaml.YAMLError:
+            data = {}
+
+    # Older versions only stored the group name. Treat it as expired so
+    # that the credentials are verified before the entry is rewritten.
+    if isinstance(data, str) is True:
+        data = {'group_name': data.strip(), 'timestamp': 0}
+    elif isinstance(data, dict) is False:
+        data = {}
+
+    # Update the cache
+    _CACHE[hostname] = (mtime, data)
+
+    # Return
+    return data
+
+
+def _ttl():
+    """Get the time to live of cache entries.
+
+    Args:
+        None
+
+    Returns:
+        _TTL: Time to live in seconds
+
+    """
+    # Initialize key variables
+    global _TTL
+
+    # Read the configuration once
+    if _TTL is None:
+        config = jm_configuration.Config()
+        _TTL = config.snmp_cache_ttl()
+
+    # Return
+    return _TTL
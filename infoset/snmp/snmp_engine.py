@@ -0,0 +1,824 @@
+#!/usr/bin/env python3
+"""Asyncio SNMP engine shared by all SNMP queries in a process.
+
+All SNMP requests made by snmp_manager.Interact objects are sent by a
+single pysnmp asyncio engine running in a background thread. This allows
+a single process to have many thousands of requests outstanding without
+needing an operating system thread for each of them.
+
+The number of outstanding requests is limited globally, and per device so
+that a single device isn't overwhelmed.
+
+The pysnmp engine, authentication and transport objects are created once
+and reused for all queries. They are only ever used by the event loop's
+thread, so they are never shared between threads.
+
+Request timeouts adapt to each device's round trip time. Devices that
+stop responding are skipped for a while. See snmp_health.
+
+Requests can be sent to an SNMP context, such as a VLAN of a Cisco switch,
+by adding a "snmp_context" key to the SNMP parameters. The context is
+selected with the community string "community@context" for SNMPv1 and
+SNMPv2c, and with the context name for SNMPv3.
+
+"""
+
+# Standard libraries
+import asyncio
+import functools
+import threading
+import time
+
+# pip libraries
+from pysnmp.proto import errind
+from pysnmp.proto import rfc1902
+from pysnmp.proto import rfc1905
+try:
+    from pysnmp.hlapi import asyncio as hlapi
+except (ImportError, AttributeError):
+    # pysnmp installations without the asyncio API
+    hlapi = None
+
+# Import project libraries
+from infoset.utils import jm_configuration
+from infoset.utils import log
+from infoset.snmp import snmp_health
+
+# Maximum number of OIDs in a GET request PDU
+MAX_OIDS = 32
+
+# SNMP PDU error-status values
+TOO_BIG = 1
+NO_SUCH_NAME = 2
+
+# Error indication returned for devices that are being skipped
+UNAVAILABLE = 'Device skipped after repeated SNMP timeouts'
+
+# Error indications returned when the device rejects the credentials
+AUTHENTICATION_ERRORS = (
+    errind.AuthenticationError, errind.AuthenticationFailure,
+    errind.NoAuthentication, errind.UnknownCommunityName,
+    errind.UnknownUserName, errind.UnsupportedAuthProtocol,
+    errind.UnsupportedPrivProtocol, errind.WrongDigest)
+
+# Process-wide engine
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+
+class Engine(object):
+    """Class that sends SNMP requests using an asyncio event loop.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        run:
+        gather:
+        available:
+        get:
+        walk:
+        request:
+    """
+
+    def __init__(
+            self, max_requests=10000, max_host_requests=4, timeout=5,
+            retries=2, breaker_failures=3, breaker_backoff=300):
+        """Method initializing the class.
+
+        Args:
+            max_requests: Maximum number of requests outstanding at any
+                one time for the process
+            max_host_requests: Maximum number of requests outstanding at
+                any one time for each device
+            timeout: Longest time in seconds to wait for a reply
+            retries: Number of times to retry a request
+            breaker_failures: Number of consecutive failures after which
+                a device is skipped
+            breaker_backoff: Seconds a device is first skipped for
+
+        Returns:
+            None
+
+        """
+        # Die if there is no asyncio support
+        if hlapi is None:
+            log_message = (
+                'The installed version of pysnmp does not support asyncio. '
+                'Please upgrade pysnmp.')
+            log.log2die(1112, log_message)
+
+        # Initialize key variables
+        self.max_requests = max_requests
+        self.max_host_requests = max_host_requests
+        self.timeout = timeout
+        self.retries = retries
+        self.breaker_failures = breaker_failures
+        self.breaker_backoff = breaker_backoff
+        self.bulk_limits = {}
+        self._host_semaphores = {}
+        self._health = {}
+        self._auth_objects = {}
+        self._transport_objects = {}
+        self._context_objects = {}
+        self._usm_engines = {}
+        self._semaphore = None
+        self._snmp_engine = None
+        self._context = None
+
+        # Start the event loop in a background thread
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, args=(ready,), name='snmp_engine')
+        self._thread.daemon = True
+        self._thread.start()
+        ready.wait()
+
+    def _run(self, ready):
+        """Run the event loop forever.
+
+        Args:
+            ready: threading.Event to set once the loop is running
+
+        Returns:
+            None
+
+        """
+        # Everything asyncio related must be created in the loop's thread
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_requests)
+        self._snmp_engine = hlapi.SnmpEngine()
+        self._context = hlapi.ContextData()
+
+        # Run
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def run(self, coroutine):
+        """Run a coroutine on the engine and wait for its result.
+
+        This is the way synchronous code uses the engine.
+
+        Args:
+            coroutine: Coroutine to run
+
+        Returns:
+            result: Result of the coroutine
+
+        """
+        # Waiting on the loop from inside the loop would block forever
+        if threading.current_thread() is self._thread:
+            log_message = (
+                'Synchronous SNMP query made from the SNMP engine\'s '
+                'event loop. Use the asynchronous version instead.')
+            log.log2die(1113, log_message)
+
+        # Run the coroutine
+        future = asyncio.run_coroutine_threadsafe(
+            guard(coroutine), self._loop)
+        (result, error) = future.result()
+
+        # Exceptions, including those from log.log2die, are re-raised in
+        # the calling thread
+        if error is not None:
+            raise error
+
+        # Return
+        return result
+
+    def gather(self, coroutines):
+        """Run many coroutines concurrently and wait for them to finish.
+
+        Coroutines that fail don't affect the others. Their results are
+        None.
+
+        Args:
+            coroutines: List of coroutines to run
+
+        Returns:
+            results: List of results in the same order as coroutines
+
+        """
+        # Initialize key variables
+        results = []
+
+        # Run
+        outcomes = self.run(_gather(coroutines))
+        for (result, error) in outcomes:
+            if isinstance(error, Exception) is True:
+                log_message = ('Unexpected error during SNMP polling: %s') % (
+                    error)
+                log.log2warn(1114, log_message)
+            results.append(result)
+
+        # Return
+        return results
+
+    def available(self, hostname):
+        """Determine whether requests are being sent to a device.
+
+        Only called from the event loop's thread so no locking is needed.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            available: False if the device is being skipped
+
+        """
+        # Return
+        return self._host_health(hostname).available()
+
+    async def get(self, snmp_params, oids, max_oids=MAX_OIDS):
+        """Do an SNMP GET of one or more OIDs.
+
+        OIDs are split across as many request PDUs as needed. The PDUs
+        are sent concurrently.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+            oids: List of OIDs to get
+            max_oids: Maximum number of OIDs to place in a PDU
+
+        Returns:
+            (error_indication, error_status, error_index, var_binds)
+
+        """
+        # Initialize key variables
+        var_binds = []
+        batches = [
+            oids[start:start + max_oids]
+            for start in range(0, len(oids), max_oids)]
+
+        # Get the data
+        results = await asyncio.gather(
+            *[self._get_batch(snmp_params, batch) for batch in batches])
+        for result in results:
+            (error_indication, error_status, _, batch_var_binds) = result
+            if error_indication or error_status:
+                return result
+            var_binds.extend(batch_var_binds)
+
+        # Return
+        return (None, 0, 0, var_binds)
+
+    async def _get_batch(self, snmp_params, oids):
+        """Do an SNMP GET of OIDs, splitting the PDU if required.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+            oids: List of OIDs to get
+
+        Returns:
+            (error_indication, error_status, error_index, var_binds)
+
+        """
+        # Get the data
+        result = await self.request(snmp_params, 'get', oids)
+        (error_indication, error_status, _, _) = result
+
+        # Split the PDU in two if the response would be too big. SNMPv1
+        # agents fail the whole PDU if any OID doesn't exist, so split to
+        # find the OIDs that do.
+        if bool(error_indication) is False and len(oids) > 1:
+            if (error_status == TOO_BIG) or (
+                    error_status == NO_SUCH_NAME and
+                    snmp_params['snmp_version'] == 1):
+                half = len(oids) // 2
+                results = await asyncio.gather(
+                    self._get_batch(snmp_params, oids[:half]),
+                    self._get_batch(snmp_params, oids[half:]))
+                var_binds = []
+                for result in results:
+                    (error_indication, error_status, _, batch_var_binds) = (
+                        result)
+                    if error_indication:
+                        return result
+                    if error_status and error_status != NO_SUCH_NAME:
+                        return result
+                    var_binds.extend(batch_var_binds)
+                result = (None, 0, 0, var_binds)
+
+        # Return
+        return result
+
+    async def walk(self, snmp_params, oids, max_repetitions=25):
+        """Walk one or more OID subtrees in lockstep.
+
+        All subtrees are requested in the same PDUs so that table columns
+        are walked in a single pass over the table. GETBULK is used for
+        SNMPv2c and SNMPv3, GETNEXT for SNMPv1.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+            oids: List of OID subtrees to walk
+            max_repetitions: Maximum number of values to request per
+                GETBULK. This is shared between the subtrees being walked
+
+        Returns:
+            (error_indication, error_status, error_index, columns) where
+                columns is a list of (name, value) lists, one per OID
+
+        """
+        # Initialize key variables
+        subtrees = [rfc1902.ObjectName(oid.lstrip('.')) for oid in oids]
+        current = list(subtrees)
+        columns = [[] for _ in oids]
+        active = list(range(len(oids)))
+
+        # Walk
+        while bool(active) is True:
+            # Get the next batch of rows for unfinished subtrees
+            names = [current[column] for column in active]
+            if snmp_params['snmp_version'] == 1:
+                (error_indication, error_status,
+                 error_index, rows) = await self.request(
+                     snmp_params, 'next', names)
+
+                # SNMPv1 agents signal the end of the MIB with noSuchName.
+                # The error index identifies the subtree that has ended
+                if (error_status == NO_SUCH_NAME) and (
+                        bool(error_indication) is False):
+                    position = max(int(error_index) - 1, 0)
+                    active.pop(min(position, len(active) - 1))
+                    continue
+            else:
+                repetitions = max(1, max_repetitions // len(active))
+                (error_indication, error_status,
+                 error_index, rows) = await self.request(
+                     snmp_params, 'bulk', names,
+                     max_repetitions=repetitions)
+
+                # Ask for fewer rows if the response would be too big.
+                # Remember the limit for the host's next walks
+                if (error_status == TOO_BIG) and (repetitions > 1):
+                    max_repetitions = max(1, max_repetitions // 2)
+                    self.bulk_limits[snmp_params['snmp_hostname']] = (
+                        max_repetitions)
+                    continue
+
+            # Return errors
+            if error_indication or error_status:
+                return (error_indication, error_status, error_index, columns)
+
+            # Stop if nothing more was returned
+            if bool(rows) is False:
+                break
+
+            # Keep values until each subtree is left
+            finished = set()
+            for row in rows:
+                for position, (name, value) in enumerate(row[:len(active)]):
+                    column = active[position]
+                    if column in finished:
+                        continue
+                    if isinstance(value, rfc1905.EndOfMibView) is True:
+                        finished.add(column)
+                    elif subtrees[column].isPrefixOf(name) is False:
+                        finished.add(column)
+                    elif name <= current[column]:
+                        # Stop if the agent returns non increasing OIDs
+                        finished.add(column)
+                    else:
+                        columns[column].append((name, value))
+                        current[column] = name
+
+            # Update the list of unfinished subtrees
+            active = [column for column in active if column not in finished]
+
+        # Return
+        return (None, 0, 0, columns)
+
+    async def request(self, snmp_params, command, oids, max_repetitions=0):
+        """Send a single SNMP request PDU.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+            command: 'get', 'next' or 'bulk'
+            oids: List of OIDs for the request
+            max_repetitions: Rows to request per GETBULK
+
+        Returns:
+            (error_indication, error_status, error_index, var_binds)
+
+        """
+        # Initialize key variables
+        hostname = snmp_params['snmp_hostname']
+        semaphore = self._host_semaphore(hostname)
+        health = self._host_health(hostname)
+        context_object = self._context_object(snmp_params)
+        var_binds = [
+            hlapi.ObjectType(hlapi.ObjectIdentity(str(oid).lstrip('.')))
+            for oid in oids]
+
+        # Get reusable objects for the request
+        snmp_engine = self._engine_object(snmp_params)
+        authentication_object = self._auth_object(snmp_params)
+        transport_object = await self._transport_object(snmp_params)
+
+        # Limit the number of outstanding requests for the device first,
+        # then for the process
+        async with semaphore:
+            async with self._semaphore:
+                # Don't wait for devices that have stopped responding
+                if health.available() is False:
+                    return (UNAVAILABLE, 0, 0, [])
+
+                # The SNMP engine keeps a configuration entry for every
+                # timeout a transport is used with, so the transport's
+                # timeout never changes. The device's timeout is enforced
+                # here instead, and requests are retried here
+                timeout = health.timeout(walk=command != 'get')
+                started = time.time()
+                for attempt in range(self.retries + 1):
+                    sent = time.time()
+                    if command == 'get':
+                        pending = hlapi.getCmd(
+                            snmp_engine, authentication_object,
+                            transport_object, context_object, *var_binds,
+                            lookupMib=False)
+                    elif command == 'next':
+                        pending = hlapi.nextCmd(
+                            snmp_engine, authentication_object,
+                            transport_object, context_object, *var_binds,
+                            lookupMib=False)
+                    else:
+                        pending = hlapi.bulkCmd(
+                            snmp_engine, authentication_object,
+                            transport_object, context_object,
+                            0, max_repetitions, *var_binds,
+                            lookupMib=False)
+                    try:
+                        result = await asyncio.wait_for(pending, timeout)
+                    except asyncio.TimeoutError:
+                        result = (errind.requestTimedOut, 0, 0, [])
+                    if isinstance(
+                            result[0], errind.RequestTimedOut) is False:
+                        break
+
+        # Update the device's health. Round trip times are only measured
+        # for GET requests that weren't retried. The size of the reply to
+        # other requests varies too much
+        if isinstance(result[0], errind.RequestTimedOut) is True:
+            health.failure(started)
+        elif attempt == 0 and command == 'get':
+            health.success(time.time() - sent)
+        else:
+            health.success()
+
+        # Return
+        return result
+
+    def _auth_object(self, snmp_params):
+        """Get the cached authentication object for a set of credentials.
+
+        Reusing the object lets the SNMP engine reuse its configuration
+        for the credentials, including SNMPv3 localized keys. Only called
+        from the event loop's thread so no locking is needed.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+
+        Returns:
+            authentication_object: Auth object for query
+
+        """
+        # Initialize key variables
+        key = _credential_key(snmp_params)
+
+        # Create the object if required
+        if key not in self._auth_objects:
+            self._auth_objects[key] = _get_auth_object(snmp_params)
+
+        # Return
+        return self._auth_objects[key]
+
+    def _engine_object(self, snmp_params):
+        """Get the pysnmp SNMP engine for a request.
+
+        pysnmp keeps one SNMPv3 user per user name in each SNMP engine.
+        Credentials that share a user name, but not keys or protocols,
+        would silently use the keys of the first ones used. Each set of
+        SNMPv3 credentials therefore has its own SNMP engine. SNMPv1 and
+        SNMPv2c requests share one. Only called from the event loop's
+        thread so no locking is needed.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+
+        Returns:
+            snmp_engine: pysnmp SnmpEngine object
+
+        """
+        # SNMPv1 and SNMPv2c communities can't collide
+        if snmp_params['snmp_version'] != 3:
+            return self._snmp_engine
+
+        # Create the engine if required. Contexts don't need one each
+        key = _credential_key(snmp_params)[:-1]
+        if key not in self._usm_engines:
+            self._usm_engines[key] = hlapi.SnmpEngine()
+
+        # Return
+        return self._usm_engines[key]
+
+    def _context_object(self, snmp_params):
+        """Get the cached context object for a request.
+
+        Only called from the event loop's thread so no locking is needed.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+
+        Returns:
+            context_object: Context object for query
+
+        """
+        # Initialize key variables
+        name = snmp_params.get('snmp_context')
+
+        # SNMPv1 and SNMPv2c select contexts with the community string
+        if name is None or snmp_params['snmp_version'] != 3:
+            return self._context
+
+        # Create the object if required
+        if name not in self._context_objects:
+            self._context_objects[name] = hlapi.ContextData(
+                contextName=name)
+
+        # Return
+        return self._context_objects[name]
+
+    async def _transport_object(self, snmp_params):
+        """Get the cached transport object for a host.
+
+        Creating a transport resolves the hostname. This blocks, so it is
+        done in a worker thread the first time the host is queried. Only
+        called from the event loop's thread so no locking is needed.
+
+        Args:
+            snmp_params: Dict of SNMP parameters
+
+        Returns:
+            transport_object: Transport object for query
+
+        """
+        # Initialize key variables
+        key = (snmp_params['snmp_hostname'], snmp_params['snmp_port'])
+
+        # Create the object if required. Requests are timed out and
+        # retried by the request method, so the transport only needs to
+        # outlast the longest timeout
+        if key not in self._transport_objects:
+            transport_object = await self._loop.run_in_executor(
+                None, functools.partial(
+                    hlapi.UdpTransportTarget, key,
+                    timeout=self.timeout + 1, retries=0))
+            self._transport_objects[key] = transport_object
+
+        # Return
+        return self._transport_objects[key]
+
+    def _host_health(self, hostname):
+        """Get the health tracker of a device.
+
+        Only called from the event loop's thread so no locking is needed.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            health: snmp_health.Host object
+
+        """
+        # Create the tracker if required
+        if hostname not in self._health:
+            self._health[hostname] = snmp_health.Host(
+                hostname, max_timeout=self.timeout,
+                failure_limit=self.breaker_failures,
+                backoff=self.breaker_backoff)
+
+        # Return
+        return self._health[hostname]
+
+    def _host_semaphore(self, hostname):
+        """Get the semaphore limiting requests to a device.
+
+        Only called from the event loop's thread so no locking is needed.
+
+        Args:
+            hostname: Hostname
+
+        Returns:
+            semaphore: asyncio.Semaphore for the host
+
+        """
+        # Create the semaphore if required
+        if hostname not in self._host_semaphores:
+            self._host_semaphores[hostname] = asyncio.Semaphore(
+                self.max_host_requests)
+
+        # Return
+        return self._host_semaphores[hostname]
+
+
+def engine():
+    """Get the process-wide SNMP engine, starting it if required.
+
+    Args:
+        None
+
+    Returns:
+        _ENGINE: Engine object
+
+    """
+    # Initialize key variables
+    global _ENGINE
+
+    # Create the engine once
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            config = jm_configuration.Config()
+            _ENGINE = Engine(
+                max_requests=config.snmp_max_requests(),
+                max_host_requests=config.snmp_max_host_requests(),
+                timeout=config.snmp_timeout(),
+                retries=config.snmp_retries(),
+                breaker_failures=config.snmp_breaker_failures(),
+                breaker_backoff=config.snmp_breaker_backoff())
+
+    # Return
+    return _ENGINE
+
+
+def authentication_error(error_indication):
+    """Determine whether an error indication is a credentials failure.
+
+    Args:
+        error_indication: Error indication of an SNMP response
+
+    Returns:
+        True if the device rejected the credentials. False for other
+            errors such as timeouts
+
+    """
+    # Return
+    return isinstance(error_indication, AUTHENTICATION_ERRORS)
+
+
+async def guard(coroutine):
+    """Run a coroutine capturing all exceptions.
+
+    log.log2die raises SystemExit. This must not escape into the event
+    loop as it would stop the loop for every other caller.
+
+    Args:
+        coroutine: Coroutine to run
+
+    Returns:
+        (result, error): Result of the coroutine and the exception raised
+            if any
+
+    """
+    # Initialize key variables
+    result = None
+    error = None
+
+    # Run
+    try:
+        result = await coroutine
+    except BaseException as exception_error:
+        error = exception_error
+
+    # Return
+    return (result, error)
+
+
+async def _gather(coroutines):
+    """Run coroutines concurrently capturing all exceptions.
+
+    Args:
+        coroutines: List of coroutines
+
+    Returns:
+        outcomes: List of (result, error) tuples
+
+    """
+    # Return
+    return await asyncio.gather(
+        *[guard(coroutine) for coroutine in coroutines])
+
+
+def _credential_key(snmp_params):
+    """Get a key that uniquely identifies a set of SNMP credentials.
+
+    Args:
+        snmp_params: Dict of SNMP parameters
+
+    Returns:
+        key: Tuple of credential values
+
+    """
+    # Initialize key variables
+    key = (
+        snmp_params['snmp_version'],
+        snmp_params['snmp_community'],
+        snmp_params['snmp_secname'],
+        snmp_params['snmp_authprotocol'],
+        snmp_params['snmp_authpassword'],
+        snmp_params['snmp_privprotocol'],
+        snmp_params['snmp_privpassword'],
+        snmp_params.get('snmp_context'))
+
+    # Return
+    return key
+
+
+def _get_auth_object(snmp_params):
+    """Get the authentication object to be used by the engine.
+
+    Args:
+        snmp_params: Dict of SNMP parameters
+
+    Returns:
+        authentication_object: Auth object for query
+
+    """
+    # Initialize key variables
+    authentication_object = None
+
+    # Process SNMPv1
+    if snmp_params['snmp_version'] == 1:
+        # Setup SNMPv1 authentication object
+        authentication_object = hlapi.CommunityData(
+            _community(snmp_params), mpModel=0)
+
+    # Process SNMPv2
+    elif snmp_params['snmp_version'] == 2:
+        # Setup SNMPv2 authentication object
+        authentication_object = hlapi.CommunityData(
+            _community(snmp_params))
+
+    # Process SNMPv3
+    else:
+        # Setup AuthProtocol (Default SHA)
+        if snmp_params['snmp_authprotocol'] is None:
+            authproto_object = hlapi.usmNoAuthProtocol
+        else:
+            if snmp_params['snmp_authprotocol'].lower() == 'md5':
+                authproto_object = hlapi.usmHMACMD5AuthProtocol
+            else:
+                authproto_object = hlapi.usmHMACSHAAuthProtocol
+
+        # Setup privProtocol (Default AES256)
+        if snmp_params['snmp_privprotocol'] is None:
+            privproto_object = hlapi.usmNoPrivProtocol
+        else:
+            if snmp_params['snmp_privprotocol'].lower() == 'des':
+                privproto_object = hlapi.usmDESPrivProtocol
+            elif snmp_params['snmp_privprotocol'].lower() == '3des':
+                privproto_object = hlapi.usm3DESEDEPrivProtocol
+            elif snmp_params['snmp_privprotocol'].lower() == 'aes':
+                privproto_object = hlapi.usmAesCfb128Protocol
+            elif snmp_params['snmp_privprotocol'].lower() == 'aes128':
+                privproto_object = hlapi.usmAesCfb128Protocol
+            elif snmp_params['snmp_privprotocol'].lower() == 'aes192':
+                privproto_object = hlapi.usmAesCfb192Protocol
+            else:
+                privproto_object = hlapi.usmAesCfb256Protocol
+
+        # Setup SNMPv3 authentication object
+        authentication_object = hlapi.UsmUserData(
+            snmp_params['snmp_secname'],
+            snmp_params['snmp_authpassword'],
+            snmp_params['snmp_privpassword'],
+            authProtocol=authproto_object,
+            privProtocol=privproto_object)
+
+    # Return
+    return authentication_object
+
+
+def _community(snmp_params):
+    """Get the community string for SNMPv1 and SNMPv2c requests.
+
+    Args:
+        snmp_params: Dict of SNMP parameters
+
+    Returns:
+        community: Community string, indexed by the context if there is one
+
+    """
+    # Initialize key variables
+    community = snmp_params['snmp_community']
+    context = snmp_params.get('snmp_context')
+
+    # Return
+    if context is not None:
+        community = ('%s@%s') % (community, context)
+    return community
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""Track how well devices respond to SNMP requests.
+
+The round trip time of each device is measured so that GET requests to
+devices that usually answer quickly time out quickly. Walks are given
+the full timeout, as the time taken to answer a GETBULK request depends
+on the number of rows requested. Devices that stop
+answering are skipped for a while, with the time doubling each time they
+fail again, instead of every request waiting for its full timeout.
+
+Each host has a YAML file in the hidden snmp_health directory so that all
+agents and scripts benefit from what the others have learnt.
+
+"""
+
+# Standard libraries
+import os
+import tempfile
+import time
+
+# pip libraries
+import yaml
+
+# Infoset libraries
+from infoset.utils import hidden
+from infoset.utils import log
+
+# Timeouts are never shorter than this many seconds (RFC 6298)
+MIN_TIMEOUT = 1.0
+
+# Timeout used until a device's round trip time is known
+INITIAL_TIMEOUT = 1.0
+
+# Timeouts are rounded up to multiples of this many seconds
+TIMEOUT_STEP = 0.25
+
+# Devices are never skipped for more than this many seconds at a time
+MAX_BACKOFF = 3600
+
+# Seconds between checks for updates by other processes
+REFRESH_INTERVAL = 10
+
+# Seconds between saves of round trip time measurements
+SAVE_INTERVAL = 60
+
+
+class Host(object):
+    """Class for the SNMP health of a host.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        available:
+        timeout:
+        success:
+        failure:
+    """
+
+    def __init__(
+            self, hostname, max_timeout=5, failure_limit=3, backoff=300):
+        """Method initializing the class.
+
+        Args:
+            hostname: Hostname
+            max_timeout: Longest timeout in seconds
+            failure_limit: Number of consecutive failures after which the
+                host is skipped
+            backoff: Seconds the host is first skipped for
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.hostname = hostname
+        self.max_timeout = max_timeout
+        self.failure_limit = failure_limit
+        self.backoff = backoff
+        self.filename = hidden.File().snmp_health(hostname)
+        self._state = _blank()
+        self._mtime = None
+        self._checked = 0
+        self._saved = 0
+        self._last_failure = 0
+
+        # Read the saved state
+        self._refresh(force=True)
+
+    def available(self):
+        """Determine whether the host should be sent requests.
+
+        Once the host's skip time has passed requests are allowed again.
+        One more failure skips the host for twice as long.
+
+        Args:
+            None
+
+        Returns:
+            available: True if available
+
+        """
+        # Return
+        self._refresh()
+        return time.time() >= self._state['open_until']
+
+    def timeout(self, walk=False):
+        """Get the timeout to use for requests to the host.
+
+        Args:
+            walk: True for GETNEXT and GETBULK requests. Round trip times
+                are only measured for GET requests, so walks always get
+                the longest timeout
+
+        Returns:
+            value: Timeout in seconds
+
+        """
+        # Return
+        if walk is True:
+            return self.max_timeout
+        return _timeout(
+            self._state['srtt'], self._state['rttvar'], self.max_timeout)
+
+    def success(self, rtt=None):
+        """Record a reply from the host.
+
+        Args:
+            rtt: Round trip time of the request in seconds. None if it
+                can't be measured because the request was retried, or
+                isn't a GET request
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        now = time.time()
+        save = False
+
+        # The host is working again
+        if bool(self._state['failures']) is True:
+            self._state['failures'] = 0
+            self._state['open_until'] = 0
+            self._state['backoff'] = 0
+            save = True
+
+        # Update round trip time estimates
+        if rtt is not None:
+            (self._state['srtt'], self._state['rttvar']) = _rtt(
+                self._state['srtt'], self._state['rttvar'], rtt)
+            if now - self._saved > SAVE_INTERVAL:
+                save = True
+
+        # Save
+        if save is True:
+            self._save()
+
+    def failure(self, started):
+        """Record a request to the host that timed out.
+
+        Requests that were outstanding at the same time count as a
+        single failure.
+
+        Args:
+            started: Time the request was sent
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        now = time.time()
+
+        # Ignore requests sent before the last failure was detected
+        if started < self._last_failure:
+            return
+        self._last_failure = now
+        self._state['failures'] += 1
+
+        # Skip the host for a while if it keeps failing
+        if self._state['failures'] >= self.failure_limit:
+            backoff = min(
+                max(self._state['backoff'] * 2, self.backoff),
+                max(MAX_BACKOFF, self.backoff))
+            self._state['backoff'] = backoff
+            self._state['open_until'] = now + backoff
+
+            log_message = (
+                'Device %s has not responded to %s consecutive SNMP '
+                'requests. Skipping it for %s seconds') % (
+                    self.hostname, self._state['failures'], backoff)
+            log.log2warn(1115, log_message)
+
+        # Save
+        self._save()
+
+    def _refresh(self, force=False):
+        """Read state saved by other processes.
+
+        Args:
+            force: Check the file even if it was checked recently
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        now = time.time()
+
+        # Don't check too often
+        if force is False and now - self._checked < REFRESH_INTERVAL:
+            return
+        self._checked = now
+
+        # Get the file's modification time
+        try:
+            mtime = os.path.getmtime(self.filename)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+
+        # Read the file
+        with open(self.filename, 'r') as f_handle:
+            try:
+                data = yaml.safe_load(f_handle)
+            except yaml.YAMLError:
+                data = None
+        if isinstance(data, dict) is True:
+            state = _blank()
+            state.update(
+                (key, value) for key, value in data.items() if key in state)
+            self._state = state
+        self._mtime = mtime
+
+    def _save(self):
+        """Save the state for other processes.
+
+        The file is replaced atomically as other processes may read it.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Write to a temporary file first
+        directory = os.path.dirname(self.filename)
+        (file_descriptor, temp_file) = tempfile.mkstemp(dir=directory)
+        with os.fdopen(file_descriptor, 'w') as f_handle:
+            yaml.safe_dump(self._state, f_handle, default_flow_style=False)
+        os.replace(temp_file, self.filename)
+
+        # Update
+        self._mtime = os.path.getmtime(self.filename)
+        self._saved = time.time()
+
+
+def _blank():
+    """Get the state of a host with no history.
+
+    Args:
+        None
+
+    Returns:
+        state: Dict of state
+
+    """
+    # Return
+    state = {
+        'srtt': None,
+        'rttvar': None,
+        'failures': 0,
+        'open_until': 0,
+        'backoff': 0}
+    return state
+
+
+def _rtt(srtt, rttvar, rtt):
+    """Update the smoothed round trip time and its variation.
+
+    This is the estimator TCP uses (RFC 6298).
+
+    Args:
+        srtt: Smoothed round trip time. None if there is no history
+        rttvar: Round trip time variation
+        rtt: New round trip time measurement
+
+    Returns:
+        (srtt, rttvar): Updated values
+
+    """
+    # Update
+    if srtt is None:
+        srtt = rtt
+        rttvar = rtt / 2
+    else:
+        rttvar = 0.75 * rttvar + 0.25 * abs(srtt - rtt)
+        srtt = 0.875 * srtt + 0.125 * rtt
+
+    # Return
+    return (srtt, rttvar)
+
+
+def _timeout(srtt, rttvar, max_timeout):
+    """Get the timeout for a round trip time.
+
+    Args:
+        srtt: Smoothed round trip time. None if there is no history
+        rttvar: Round trip time variation
+        max_timeout: Longest timeout
+
+    Returns:
+        value: Timeout in seconds
+
+    """
+    # Use the default until the round trip time is known
+    if srtt is None:
+        value = INITIAL_TIMEOUT
+    else:
+        value = srtt + 4 * rttvar
+        value = TIMEOUT_STEP * -(-value // TIMEOUT_STEP)
+
+    # Return
+    value = min(max(value, MIN_TIMEOUT), max_timeout)
+    return value
@@ -3,14 +3,44 @@
 
 import time
 from collections import defaultdict
+from concurrent import futures
+from functools import partial
 
+from infoset.utils import jm_configuration
 from infoset.snmp import jm_iana_enterprise
 from infoset.snmp import get_queries
+from infoset.snmp import LAYERS
+
+# OIDs walked to detect changes to the data of MIBs, keyed by indicator.
+# MIB query classes name the indicators that apply to them
+INDICATORS = {
+    # SNMPv2-MIB sysUpTime. Devices that restart are polled in full
+    'uptime': ['.1.3.6.1.2.1.1.3'],
+    # IF-MIB ifTableLastChange and ifLastChange
+    'interfaces': ['.1.3.6.1.2.1.31.1.5', '.1.3.6.1.2.1.2.2.1.9'],
+    # ENTITY-MIB entLastChangeTime
+    'entity': ['.1.3.6.1.2.1.47.1.4.1'],
+    # LLDP-MIB lldpStatsRemTablesLastChangeTime
+    'lldp': ['.1.0.8802.1.1.2.1.2.1']}
 
 
 class Query(object):
     """Class interacts with IfMIB devices.
 
+    MIB queries for a device are run concurrently in a pool of threads.
+    The pool is no larger than the number of SNMP requests allowed to be
+    outstanding to a device (server:snmp_max_host_requests), so devices
+    aren't overwhelmed.
+
+    Each MIB is only tested for support once, however many layers it
+    provides data for. Vendor MIBs are only tested on devices of the
+    vendor. Identical SNMP requests made by different MIB queries are
+    only sent to the device once.
+
+    Polls can be incremental. Cheap change indicators are read first, and
+    the data of MIBs whose indicators haven't changed since the previous
+    poll is copied from its snapshot instead of being walked again.
+
     Args:
         None
 
@@ -18,14 +48,25 @@ class Query(object):
         None
 
     Methods:
+        everything:
+        misc:
+        system:
+        layer1:
+        layer2:
+        layer3:
+        enterprise:
+        capabilities:
+        snapshot:
 
     """
 
-    def __init__(self, snmp_object):
+    def __init__(self, snmp_object, max_workers=None):
         """Function for intializing the class.
 
         Args:
             snmp_object: SNMP Interact class object from snmp_manager.py
+            max_workers: Maximum number of MIB queries to run at the same
+                time. Uses server:snmp_max_host_requests if None
 
         Returns:
             None
@@ -34,11 +75,29 @@ class Query(object):
         # Define query object
         self.snmp_object = snmp_object
 
-    def everything(self):
+        # Limit the number of concurrent MIB queries
+        if max_workers is None:
+            config = jm_configuration.Config()
+            max_workers = config.snmp_max_host_requests()
+        self.max_workers = max(1, max_workers)
+
+        # MIB query objects for the MIBs the device supports
+        self._capabilities = None
+        self._enterprise = None
+
+        # Indicators and data of each MIB from the last poll
+        self._snapshot = {'indicators': {}, 'results': {}}
+
+    def everything(self, previous=None, incremental=False):
         """Get all information from device.
 
         Args:
-            None
+            previous: Snapshot of the device's previous poll, from the
+                snapshot method. Only MIB data that may have changed since
+                is walked. Everything is walked if None
+            incremental: True if the snapshot of this poll will be used by
+                the next one. Change indicators are only read if this is
+                True or there is a previous poll to compare them with
 
         Returns:
             data: Aggregated data
@@ -47,12 +106,10 @@ class Query(object):
         # Initialize key variables
         data = {}
 
-        # Append data
+        # Append data. The MIB queries for all layers run concurrently
         data['misc'] = self.misc()
-        data['layer1'] = self.layer1()
-        data['layer2'] = self.layer2()
-        data['layer3'] = self.layer3()
-        data['system'] = self.system()
+        data.update(self._layers(
+            LAYERS, previous=previous, incremental=incremental))
 
         # Return
         return data
@@ -73,9 +130,7 @@ class Query(object):
         data['host'] = self.snmp_object.hostname()
 
         # Get vendor information
-        sysobjectid = self.snmp_object.sysobjectid()
-        vendor = jm_iana_enterprise.Query(sysobjectid=sysobjectid)
-        data['IANAEnterpriseNumber'] = vendor.enterprise()
+        data['IANAEnterpriseNumber'] = self.enterprise()
 
         # Return
         return data
@@ -90,25 +145,8 @@ class Query(object):
             data: Aggregated data
 
         """
-        # Initialize data
-        data = defaultdict(lambda: defaultdict(dict))
-        processed = False
-
         # Get system information from SNMPv2-MIB, ENTITY-MIB, IF-MIB
-        # Instantiate a query object for each system query
-        for item in [
-                Query(self.snmp_object)
-                for Query in get_queries('system')]:
-
-            if item.supported():
-                processed = True
-                data = _add_system(item, data)
-
-        # Return
-        if processed is True:
-            return data
-        else:
-            return None
+        return self._layers(['system'])['system']
 
     def layer1(self):
         """Get all layer1 information from device.
@@ -120,24 +158,8 @@ class Query(object):
             data: Aggregated data
 
         """
-        # Initialize key values
-        data = defaultdict(lambda: defaultdict(dict))
-        processed = False
-
-        # Get information layer1 queries
-
-        for item in [
-                Query(self.snmp_object)
-                for Query in get_queries('layer1')]:
-            if item.supported():
-                processed = True
-                data = _add_layer1(item, data)
-
         # Return
-        if processed is True:
-            return data
-        else:
-            return None
+        return self._layers(['layer1'])['layer1']
 
     def layer2(self):
         """Get all layer2 information from device.
@@ -149,22 +171,8 @@ class Query(object):
             data: Aggregated data
 
         """
-        # Initialize key variables
-        data = defaultdict(lambda: defaultdict(dict))
-        processed = False
-
-        for item in [
-                Query(self.snmp_object)
-                for Query in get_queries('layer2')]:
-            if item.supported():
-                processed = True
-                data = _add_layer2(item, data)
-
         # Return
-        if processed is True:
-            return data
-        else:
-            return None
+        return self._layers(['layer2'])['layer2']
 
     def layer3(self):
         """Get all layer3 information from device.
@@ -175,119 +183,334 @@ class Query(object):
         Returns:
             data: Aggregated data
 
+        """
+        # Return
+        return self._layers(['layer3'])['layer3']
+
+    def enterprise(self):
+        """Get the IANA enterprise number of the device.
+
+        Args:
+            None
+
+        Returns:
+            value: Enterprise number. None if the device has no sysObjectID
+
+        """
+        # The sysObjectID is usually already known from the search for the
+        # device's credentials
+        if self._enterprise is None:
+            sysobjectid = self.snmp_object.sysobjectid()
+            if bool(sysobjectid) is True:
+                vendor = jm_iana_enterprise.Query(sysobjectid=sysobjectid)
+                self._enterprise = vendor.enterprise()
+
+        # Return
+        return self._enterprise
+
+    def capabilities(self):
+        """Get the MIBs the device supports.
+
+        Support is tested once for each MIB that applies to the device's
+        vendor. The results of the tests are also cached across polls by
+        snmp_manager.
+
+        Args:
+            None
+
+        Returns:
+            capabilities: Dict of MIB query objects keyed by query class,
+                for each MIB supported
+
+        """
+        # Test each MIB once
+        if self._capabilities is None:
+            # Initialize key variables
+            items = []
+            enterprise = self.enterprise()
+            self._capabilities = {}
+
+            # Instantiate a query object for each query of every layer
+            for layer in LAYERS:
+                for query in get_queries(layer, enterprise):
+                    if query not in [type(item) for item in items]:
+                        items.append(query(self.snmp_object))
+
+            # Test them all
+            supported = self._map([item.supported for item in items])
+            for item, validity in zip(items, supported):
+                if validity is True:
+                    self._capabilities[type(item)] = item
+
+        # Return
+        return self._capabilities
+
+    def snapshot(self):
+        """Get a snapshot of the last poll for use by the next one.
+
+        Args:
+            None
+
+        Returns:
+            snapshot: Dict of the change indicators and the data of each
+                MIB query, keyed by (query class, layer)
+
+        """
+        # Return
+        return self._snapshot
+
+    def _layers(self, layers, previous=None, incremental=False):
+        """Get information for several layers from device.
+
+        The MIB queries run concurrently. Their results are merged in the
+        same order as if they had been run one after another.
+
+        Args:
+            layers: List of layers
+            previous: Snapshot of the previous poll. See everything
+            incremental: True if the snapshot will be used by the next
+                poll. See everything
+
+        Returns:
+            results: Dict of aggregated data keyed by layer. The data is
+                None for layers no MIB supported
+
         """
         # Initialize key variables
-        data = defaultdict(lambda: defaultdict(dict))
-        processed = False
+        jobs = []
+        keys = []
+        static = {}
+        results = {}
+        snapshot = {'indicators': {}, 'results': {}}
+
+        # Share the results of identical SNMP requests while polling
+        self.snmp_object.share_results(True)
+        try:
+            # Find out what has changed since the previous poll
+            capabilities = self.capabilities()
+            enterprise = self.enterprise()
+            if previous is not None or incremental is True:
+                snapshot['indicators'] = self._indicators(capabilities)
+            changed = _changes(previous, snapshot['indicators'])
+
+            # Get the layer data of each supported MIB unless it can't
+            # have changed. Only some fields of the data of MIBs with
+            # static fields can be copied from the previous poll
+            for layer in layers:
+                for query in get_queries(layer, enterprise):
+                    if query not in capabilities:
+                        continue
+                    key = (query, layer)
+                    keys.append(key)
+                    if _unchanged(query, changed) is True and (
+                            key in previous['results']):
+                        if query.static is None:
+                            snapshot['results'][key] = previous[
+                                'results'][key]
+                            continue
+                        if layer in query.static:
+                            static[key] = query.static[layer]
+                    jobs.append(key)
+            functions = []
+            for (query, layer) in jobs:
+                function = getattr(capabilities[query], layer)
+                if (query, layer) in static:
+                    function = partial(function, skip=static[(query, layer)])
+                functions.append(function)
+            data = self._map(functions)
+            snapshot['results'].update(zip(jobs, data))
+            for key, fields in static.items():
+                _copy_fields(
+                    previous['results'][key], snapshot['results'][key],
+                    fields)
+        finally:
+            self.snmp_object.share_results(False)
+        self._snapshot = snapshot
+
+        # Merge the results
+        for layer in layers:
+            results[layer] = None
+        for key in keys:
+            (_, layer) = key
+            result = snapshot['results'][key]
+            if results[layer] is None:
+                results[layer] = defaultdict(lambda: defaultdict(dict))
+            if layer == 'system':
+                _add_system(result, results[layer])
+            else:
+                _add_data(result, results[layer])
+
+        # Return
+        return results
+
+    def _indicators(self, capabilities):
+        """Read the change indicators that apply to the device's MIBs.
+
+        Args:
+            capabilities: Dict of supported MIB query objects
+
+        Returns:
+            indicators: Dict of the values of the indicators' OIDs, keyed
+                by indicator. Values are empty if they couldn't be read
 
-        for item in [
-                Query(self.snmp_object)
-                for Query in get_queries('layer3')]:
-            if item.supported():
-                processed = True
-                data = _add_layer3(item, data)
+        """
+        # Initialize key variables
+        names = set(['uptime'])
+        indicators = {}
+        oids = []
+
+        # Get the indicators that apply
+        for query in capabilities.keys():
+            if query.indicators is not None:
+                names.update(query.indicators)
+        for name in sorted(names):
+            oids.extend(INDICATORS[name])
+
+        # Walk them all at once
+        values = self.snmp_object.swalk_columns(oids)
+        for name in sorted(names):
+            indicators[name] = {}
+            for oid in INDICATORS[name]:
+                indicators[name].update(values.get(oid, {}))
 
         # Return
-        if processed is True:
-            return data
-        else:
-            return None
+        return indicators
 
+    def _map(self, functions):
+        """Run functions concurrently.
 
-def _add_data(source, target):
-    """Add data from source to target dict. Both dicts must have two keys.
+        Args:
+            functions: List of functions to run. They take no arguments
+
+        Returns:
+            results: List of results in the same order as functions.
+                Exceptions, including those from log.log2die, are re-raised
+
+        """
+        # Run
+        with futures.ThreadPoolExecutor(
+                max_workers=self.max_workers) as executor:
+            jobs = [executor.submit(function) for function in functions]
+
+        # Return
+        results = [job.result() for job in jobs]
+        return results
+
+
+def _changes(previous, indicators):
+    """Get the change indicators that have changed since a previous poll.
+
+    Indicators that can't be read are treated as changed.
 
     Args:
-        source: Source dict
-        target: Target dict
+        previous: Snapshot of the previous poll. None if there wasn't one
+        indicators: Current values of the indicators
 
     Returns:
-        target: Aggregated data
+        changed: Set of the names of changed indicators. None if
+            everything must be treated as changed
 
     """
-    # Process data
-    for primary in source.keys():
-        for secondary, value in source[primary].items():
-            target[primary][secondary] = value
+    # Initialize key variables
+    changed = set()
+
+    # Everything changes if there is no previous poll or the device has
+    # restarted since
+    if previous is None:
+        return None
+    uptime = list(indicators['uptime'].values())
+    previous_uptime = list(previous['indicators'].get('uptime', {}).values())
+    if bool(uptime) is False or bool(previous_uptime) is False:
+        return None
+    if uptime[0] < previous_uptime[0]:
+        return None
+
+    # Compare
+    for name, values in indicators.items():
+        if name == 'uptime':
+            continue
+        if bool(values) is False:
+            changed.add(name)
+        elif values != previous['indicators'].get(name):
+            changed.add(name)
 
-        # Return
-    return target
+    # Return
+    return changed
 
 
-def _add_layer1(query, original_data):
-    """Add data from successful layer1 MIB query to original data provided.
+def _unchanged(query, changed):
+    """Determine whether the data of a MIB query can't have changed.
 
     Args:
-        query: MIB query object
-        original_data: Two keyed dict of data
+        query: MIB query class
+        changed: Set of changed indicators, from _changes
 
     Returns:
-        new_data: Aggregated data
+        unchanged: True if the data can be copied from the previous poll
 
     """
-    # Process query
-    result = query.layer1()
-    new_data = _add_data(
-        result, original_data)
+    # Initialize key variables
+    unchanged = False
+
+    # Check the indicators of the query
+    if changed is not None and query.indicators is not None:
+        if bool(changed.intersection(query.indicators)) is False:
+            unchanged = True
 
     # Return
-    return new_data
+    return unchanged
 
 
-def _add_layer2(query, original_data):
-    """Add data from successful layer2 MIB query to original data provided.
+def _copy_fields(source, target, fields):
+    """Copy fields of layer data from source to target dict.
 
     Args:
-        query: MIB query object
-        original_data: Two keyed dict of data
+        source: Layer data of a MIB query from a previous poll
+        target: Layer data of the MIB query from the current poll
+        fields: List of the fields to copy
 
     Returns:
-        new_data: Aggregated data
+        None
 
     """
-    # Process query
-    result = query.layer2()
-    new_data = _add_data(
-        result, original_data)
-
-    # Return
-    return new_data
+    # Copy
+    for key, values in source.items():
+        for field in fields:
+            if field in values:
+                target[key][field] = values[field]
 
 
-def _add_layer3(query, original_data):
-    """Add data from successful layer3 MIB query to original data provided.
+def _add_data(source, target):
+    """Add data from source to target dict. Both dicts must have two keys.
 
     Args:
-        query: MIB query object
-        original_data: Two keyed dict of data
+        source: Source dict
+        target: Target dict
 
     Returns:
-        new_data: Aggregated data
+        target: Aggregated data
 
     """
-    # Process query
-    result = query.layer3()
-    new_data = _add_data(
-        result, original_data)
+    # Process data
+    for primary in source.keys():
+        for secondary, value in source[primary].items():
+            target[primary][secondary] = value
 
-    # Return
-    return new_data
+        # Return
+    return target
 
 
-def _add_system(query, data):
+def _add_system(result, data):
     """Add data from successful system MIB query to original data provided.
 
     Args:
-        query: MIB query object
+        result: Data from a MIB query's system method
         data: Three keyed dict of data
 
     Returns:
         data: Aggregated data
 
     """
-    # Process query
-    result = query.system()
-
     # Add tag
     for primary in result.keys():
         for secondary in result[primary].keys():
@@ -1,17 +1,26 @@
 #!/usr/bin/env python3
 """SNMP manager class."""
 
-import os
+import asyncio
+import functools
 
-from pysnmp.entity.rfc3413.oneliner import cmdgen
+from pyasn1.type import univ
 from pysnmp.proto import rfc1905
 from pysnmp.proto import rfc1902
 from pysnmp.smi import rfc1902 as smi
 
 # Import project libraries
 from infoset.utils import log
-from infoset.utils import hidden
 from infoset.snmp import jm_iana_enterprise
+from infoset.snmp import snmp_cache
+from infoset.snmp import snmp_engine
+
+# Default number of rows requested per GETBULK when walking
+MAX_REPETITIONS = 25
+
+# Functions converting pysnmp values to python types, keyed by class.
+# Filled in by _convert as new classes are seen
+_CONVERTERS = {}
 
 
 class Validate(object):
@@ -25,10 +34,8 @@ class Validate(object):
 
     Functions:
         __init__:
-        oid_exists:
-        walk:
-        get:
-        query:
+        credentials:
+        credentials_async:
     """
 
     def __init__(self, hostname, snmp_config):
@@ -40,6 +47,9 @@ class Validate(object):
     def credentials(self):
         """Determine the valid SNMP credentials for a host.
 
+        Credentials found to work within the cache's time to live are
+        used without contacting the host.
+
         Args:
             None
 
@@ -47,82 +57,103 @@ class Validate(object):
             credentials: Dict of snmp_credentials to use
 
         """
-        # Initialize key variables
-        cache_exists = False
-        group_key = 'group_name'
+        # Return
+        return snmp_engine.engine().run(self.credentials_async())
+
+    async def credentials_async(self):
+        """Determine the valid SNMP credentials for a host asynchronously.
 
-        # Determine whether cached value exists
-        filez = hidden.File()
-        dirz = hidden.Directory()
-        snmp_dir = dirz.snmp_cache()
-        filename = filez.snmp_cache(self.hostname)
+        Args:
+            None
 
-        # Create UID directory / file if not yet created
-        if os.path.exists(snmp_dir) is False:
-            os.makedirs(snmp_dir)
-        if os.path.exists(filename) is True:
-            cache_exists = True
+        Returns:
+            credentials: Dict of snmp_credentials to use
 
-        if cache_exists is False:
-            # Get credentials
-            credentials = self._credentials()
+        """
+        # Initialize key variables
+        group_key = 'group_name'
+        credentials = None
+        cache = snmp_cache.Host(self.hostname)
 
-            # Save credentials if successful
-            if credentials is not None:
-                _update_cache(filename, credentials[group_key])
+        # Skip devices that have stopped responding
+        if snmp_engine.engine().available(self.hostname) is False:
+            return None
 
-        else:
-            # Read credentials from cache
-            if os.path.isfile(filename):
-                with open(filename) as f_handle:
-                    group_name = f_handle.readline()
+        # Use the cached group if it is still valid
+        group_name = cache.group()
+        if group_name is not None:
+            for params_dict in self.snmp_config:
+                if params_dict[group_key] == group_name:
+                    return dict(params_dict, snmp_hostname=self.hostname)
 
-            # Get credentials
-            credentials = self._credentials(group_name)
+        # Try the previously successful group first
+        group_name = cache.group(stale=True)
+        if group_name is not None:
+            (credentials, object_id) = await self._credentials(group_name)
 
-            # Try the rest if these credentials fail
-            if credentials is None:
-                credentials = self._credentials()
+        # Try the rest if these credentials fail
+        if credentials is None:
+            (credentials, object_id) = await self._credentials()
 
-            # Update cache if found
-            if credentials is not None:
-                _update_cache(filename, credentials[group_key])
+        # Update cache if found. The sysObjectID was read while probing,
+        # so it doesn't have to be read again
+        if credentials is not None:
+            cache.update_group(credentials[group_key], sysobjectid=object_id)
 
         # Return
         return credentials
 
-    def _credentials(self, group=None):
+    async def _credentials(self, group=None):
         """Determine the valid SNMP credentials for a host.
 
+        All candidate groups are tried at the same time. The first group
+        to work is used and the remaining attempts are cancelled. The
+        SNMP engine's per host limit bounds the number of simultaneous
+        attempts.
+
         Args:
             group: SNMP group name to try
 
         Returns:
-            credentials: Dict of snmp_credentials to use
+            (credentials, object_id): Dict of snmp_credentials to use and
+                the sysObjectID of the host. None if no group works
 
         """
         # Initialize key variables
         credentials = None
+        object_id = None
+        attempts = {}
 
         # Probe device with all SNMP options
         for params_dict in self.snmp_config:
-            # Update credentials
-            params_dict['snmp_hostname'] = self.hostname
-
-            # Try successive groups
-            if group is None:
-                # Verify connectivity
-                if _contactable(params_dict) is True:
-                    credentials = params_dict
-                    break
-            else:
-                if params_dict['group_name'] == group:
-                    # Verify connectivity
-                    if _contactable(params_dict) is True:
-                        credentials = params_dict
+            # Update credentials. The configuration may be shared by
+            # several hosts being probed at the same time, so copy it.
+            params_dict = dict(params_dict, snmp_hostname=self.hostname)
+
+            # Try all groups, or only the one requested
+            if group is None or params_dict['group_name'] == group:
+                attempt = asyncio.ensure_future(
+                    _contactable(params_dict))
+                attempts[attempt] = params_dict
+
+        # Wait for the first group that works
+        pending = set(attempts.keys())
+        try:
+            while bool(pending) is True and credentials is None:
+                (done, pending) = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.result() is not None:
+                        credentials = attempts[attempt]
+                        object_id = attempt.result()
+                        break
+        finally:
+            # Cancel the remaining attempts
+            for attempt in pending:
+                attempt.cancel()
 
         # Return
-        return credentials
+        return (credentials, object_id)
 
 
 class Interact(object):
@@ -136,6 +167,8 @@ class Interact(object):
 
     Functions:
         __init__:
+        share_results:
+        context:
         oid_exists:
         walk:
         get:
@@ -163,6 +196,62 @@ class Interact(object):
                            'Non existent host?')
             log.log2die(1005, log_message)
 
+        # Cached information about the host
+        self.cache = snmp_cache.Host(snmp_parameters['snmp_hostname'])
+        self.errors = 0
+        self._sysobjectid = None
+
+        # Responses to requests, keyed by request, while they are shared
+        self._shared = None
+
+    def share_results(self, enabled=True):
+        """Share the results of identical requests.
+
+        While enabled, requests for the same OIDs are only sent to the
+        device once and their response is reused. This saves round trips
+        when several MIB queries walk the same columns during a poll.
+        Disabling discards the saved responses, so that values are fresh
+        the next time.
+
+        Args:
+            enabled: True to share results, False to stop
+
+        Returns:
+            None
+
+        """
+        # Start with no saved responses either way
+        if enabled is True:
+            self._shared = {}
+        else:
+            self._shared = None
+
+    def context(self, name):
+        """Get an object that queries an SNMP context of the device.
+
+        The object shares the device's cached information, and shares
+        results if this object does.
+
+        Args:
+            name: Context name, such as a VLAN number for Cisco devices
+
+        Returns:
+            snmp_object: Interact object
+
+        """
+        # Initialize key variables
+        snmp_params = dict(self.snmp_params)
+        snmp_params['snmp_context'] = name
+
+        # Create the object
+        snmp_object = Interact(snmp_params)
+        snmp_object._sysobjectid = self._sysobjectid
+        if self._shared is not None:
+            snmp_object.share_results()
+
+        # Return
+        return snmp_object
+
     def enterprise_number(self):
         """Return SNMP enterprise number for the device.
 
@@ -203,7 +292,20 @@ class Interact(object):
         """Check if device is contactable.
 
         Args:
-            device_id: Device ID
+            None
+
+        Returns:
+            contactable: True if a contactable
+
+        """
+        # Return
+        return snmp_engine.engine().run(self.contactable_async())
+
+    async def contactable_async(self):
+        """Check if device is contactable asynchronously.
+
+        Args:
+            None
 
         Returns:
             contactable: True if a contactable
@@ -217,10 +319,14 @@ class Interact(object):
         try:
             # If we can poll the SNMP sysObjectID,
             # then the device is contactable
-            result = self.sysobjectid(connectivity_check=True)
+            result = await self.sysobjectid_async(connectivity_check=True)
             if bool(result) is True:
                 contactable = True
 
+        except asyncio.CancelledError:
+            # Another check succeeded first
+            raise
+
         except Exception as _:
             # Not contactable
             contactable = False
@@ -244,15 +350,40 @@ class Interact(object):
         Returns:
             object_id: sysObjectID value
 
+        """
+        # Return
+        return snmp_engine.engine().run(
+            self.sysobjectid_async(connectivity_check=connectivity_check))
+
+    async def sysobjectid_async(self, connectivity_check=False):
+        """Get the sysObjectID of the device asynchronously.
+
+        Args:
+            connectivity_check: See sysobjectid
+
+        Returns:
+            object_id: sysObjectID value
+
         """
         # Initialize key variables
         oid = '.1.3.6.1.2.1.1.2.0'
         object_id = None
 
+        # Use the known value unless checking connectivity
+        if connectivity_check is False:
+            object_id = self._sysobjectid
+            if object_id is None:
+                object_id = self.cache.sysobjectid()
+            if object_id is not None:
+                return object_id
+
         # Get sysObjectID
-        results = self.get(oid, connectivity_check=connectivity_check)
+        results = await self.get_async(
+            oid, connectivity_check=connectivity_check)
         if bool(results) is True:
             object_id = ('.%s') % (results[oid].decode('utf-8'))
+            self._sysobjectid = object_id
+            self.cache.update_sysobjectid(object_id)
 
         # Return
         return object_id
@@ -269,6 +400,12 @@ class Interact(object):
         """
         # Initialize key variables
         validity = False
+        errors = self.errors
+
+        # Use the cached value if available
+        cached = self.cache.supported(oid_to_get)
+        if cached is not None:
+            return cached
 
         # Validate OID
         if self.oid_exists_get(oid_to_get) is True:
@@ -278,6 +415,10 @@ class Interact(object):
             if self.oid_exists_walk(oid_to_get) is True:
                 validity = True
 
+        # Cache the result if the device responded to every query
+        if errors == self.errors:
+            self.cache.update_supported(oid_to_get, validity)
+
         # Return
         return validity
 
@@ -339,24 +480,30 @@ class Interact(object):
             results: Results
 
         """
-        # Initialize key variables
-        results = {}
-
         # Process data
         data = self.walk(
             oid_to_get, normalized=normalized, connectivity_check=True)
 
-        # If oid not found then return blank dict
-        for value in data.values():
-            if isinstance(value, rfc1905.NoSuchInstance) is False:
-                results = data
-            # If nothing is retuned, then fail
-            elif bool(value) is True:
-                results = data
-            break
+        # Return
+        return _swalk_results(data)
+
+    async def swalk_async(self, oid_to_get, normalized=False):
+        """Do a failsafe SNMPwalk asynchronously.
+
+        Args:
+            oid_to_get: OID to get
+            normalized: See swalk
+
+        Returns:
+            results: Results
+
+        """
+        # Process data
+        data = await self.walk_async(
+            oid_to_get, normalized=normalized, connectivity_check=True)
 
         # Return
-        return results
+        return _swalk_results(data)
 
     def walk(self, oid_to_get, normalized=False, connectivity_check=False):
         """Do an SNMPwalk.
@@ -381,6 +528,23 @@ class Interact(object):
             oid_to_get, get=False,
             connectivity_check=connectivity_check, normalized=normalized)
 
+    async def walk_async(
+            self, oid_to_get, normalized=False, connectivity_check=False):
+        """Do an SNMPwalk asynchronously.
+
+        Args:
+            oid_to_get: OID to walk
+            normalized: See walk
+            connectivity_check: See walk
+
+        Returns:
+            Dictionary of tuples (OID, value)
+
+        """
+        return await self.query_async(
+            oid_to_get, get=False,
+            connectivity_check=connectivity_check, normalized=normalized)
+
     def get(self, oid_to_get, connectivity_check=False, normalized=False):
         """Do an SNMPget.
 
@@ -404,11 +568,31 @@ class Interact(object):
             oid_to_get, get=True,
             connectivity_check=connectivity_check, normalized=normalized)
 
+    async def get_async(
+            self, oid_to_get, connectivity_check=False, normalized=False):
+        """Do an SNMPget asynchronously.
+
+        Args:
+            oid_to_get: OID to get
+            normalized: See get
+            connectivity_check: See get
+
+        Returns:
+            Dictionary of tuples (OID, value)
+
+        """
+        return await self.query_async(
+            oid_to_get, get=True,
+            connectivity_check=connectivity_check, normalized=normalized)
+
     def query(
             self, oid_to_get, get=False, connectivity_check=False,
             normalized=False):
         """Do an SNMP query.
 
+        The query is made by the process-wide asyncio SNMP engine. The
+        calling thread waits for the result.
+
         Args:
             oid_to_get: OID to walk
             get: Flag determining whether to do a GET or WALK
@@ -425,47 +609,303 @@ class Interact(object):
         Returns:
             Dictionary of tuples (OID, value)
 
+        """
+        # Return
+        return snmp_engine.engine().run(
+            self.query_async(
+                oid_to_get, get=get, connectivity_check=connectivity_check,
+                normalized=normalized))
+
+    async def query_async(
+            self, oid_to_get, get=False, connectivity_check=False,
+            normalized=False):
+        """Do an SNMP query asynchronously.
+
+        Must be run by the process-wide asyncio SNMP engine.
+
+        Args:
+            oid_to_get: OID to walk
+            get: Flag determining whether to do a GET or WALK
+            normalized: See query
+            connectivity_check: See query
+
+        Returns:
+            Dictionary of tuples (OID, value)
+
+        """
+        # Get the data
+        results = await self._query_async(
+            [oid_to_get], get=get, connectivity_check=connectivity_check,
+            normalized=normalized)
+
+        # Return
+        if get is True:
+            return results
+        return results[oid_to_get]
+
+    def multiget(self, oids_to_get, connectivity_check=False):
+        """Do an SNMPget of many OIDs using as few PDUs as possible.
+
+        Args:
+            oids_to_get: List of OIDs to get
+            connectivity_check:
+                Set if testing for connectivity. Some session
+                errors are ignored so that a null result is returned
+
+        Returns:
+            Dictionary of values keyed by OID
+
+        """
+        # Return
+        return snmp_engine.engine().run(
+            self.multiget_async(
+                oids_to_get, connectivity_check=connectivity_check))
+
+    async def multiget_async(self, oids_to_get, connectivity_check=False):
+        """Do an SNMPget of many OIDs asynchronously.
+
+        Args:
+            oids_to_get: List of OIDs to get
+            connectivity_check: See multiget
+
+        Returns:
+            Dictionary of values keyed by OID
+
+        """
+        # Return
+        return await self._query_async(
+            oids_to_get, get=True, connectivity_check=connectivity_check)
+
+    def walk_columns(
+            self, oids_to_get, normalized=False, connectivity_check=False):
+        """Walk many OIDs, such as table columns, in a single pass.
+
+        Args:
+            oids_to_get: List of OIDs to walk
+            normalized: See walk
+            connectivity_check: See walk
+
+        Returns:
+            Dictionary of walk results keyed by each walked OID
+
+        """
+        # Return
+        return snmp_engine.engine().run(
+            self.walk_columns_async(
+                oids_to_get, normalized=normalized,
+                connectivity_check=connectivity_check))
+
+    async def walk_columns_async(
+            self, oids_to_get, normalized=False, connectivity_check=False):
+        """Walk many OIDs in a single pass asynchronously.
+
+        Args:
+            oids_to_get: List of OIDs to walk
+            normalized: See walk
+            connectivity_check: See walk
+
+        Returns:
+            Dictionary of walk results keyed by each walked OID
+
+        """
+        # Return
+        return await self._query_async(
+            oids_to_get, get=False, connectivity_check=connectivity_check,
+            normalized=normalized)
+
+    def swalk_columns(self, oids_to_get, normalized=False):
+        """Do a failsafe SNMPwalk of many OIDs in a single pass.
+
+        Args:
+            oids_to_get: List of OIDs to walk
+            normalized: See swalk
+
+        Returns:
+            Dictionary of swalk results keyed by each walked OID
+
+        """
+        # Return
+        return snmp_engine.engine().run(
+            self.swalk_columns_async(oids_to_get, normalized=normalized))
+
+    async def swalk_columns_async(self, oids_to_get, normalized=False):
+        """Do a failsafe SNMPwalk of many OIDs asynchronously.
+
+        Args:
+            oids_to_get: List of OIDs to walk
+            normalized: See swalk
+
+        Returns:
+            Dictionary of swalk results keyed by each walked OID
+
+        """
+        # Initialize key variables
+        results = {}
+
+        # Process data
+        data = await self.walk_columns_async(
+            oids_to_get, normalized=normalized, connectivity_check=True)
+        for oid_to_get, oid_results in data.items():
+            results[oid_to_get] = _swalk_results(oid_results)
+
+        # Return
+        return results
+
+    async def _query_async(
+            self, oids_to_get, get=False, connectivity_check=False,
+            normalized=False):
+        """Do an SNMP query of many OIDs asynchronously.
+
+        Must be run by the process-wide asyncio SNMP engine.
+
+        Args:
+            oids_to_get: List of OIDs
+            get: Flag determining whether to do a GET or WALK
+            normalized: See query
+            connectivity_check: See query
+
+        Returns:
+            return_results: Dictionary of values keyed by OID for GETs.
+                Dictionary of walk results keyed by each walked OID for
+                WALKs
+
         """
         # Initialize variables
         return_results = {}
         snmp_params = self.snmp_params
 
-        # Check if OID is valid
-        valid_format = oid_valid_format(oid_to_get)
-        if valid_format is False:
-            log_message = ('OID %s has an invalid format') % (oid_to_get)
-            log.log2die(1020, log_message)
+        # Check if OIDs are valid
+        for oid_to_get in oids_to_get:
+            valid_format = oid_valid_format(oid_to_get)
+            if valid_format is False:
+                log_message = ('OID %s has an invalid format') % (oid_to_get)
+                log.log2die(1020, log_message)
 
-        # Create the object
-        snmp_object = cmdgen.CommandGenerator()
+        # Fill the results object by getting OID data
+        (session_error_string, session_error_status,
+         session_error_index, var_binds) = await self._request(
+             oids_to_get, get=get)
 
-        # Setup Transport object
-        transport_object = cmdgen.UdpTransportTarget(
-            (snmp_params['snmp_hostname'], snmp_params['snmp_port']))
+        # Crash on error, return blank results if doing certain types of
+        # connectivity checks
+        if session_error_string:
+            # Cached information can't be trusted if the credentials no
+            # longer work. Timeouts and other errors don't mean that they
+            # have changed. Contexts that don't exist fail even if the
+            # credentials work
+            self.errors += 1
+            if snmp_engine.authentication_error(
+                    session_error_string) is True and (
+                        snmp_params.get('snmp_context') is None):
+                self.cache.invalidate(snmp_params.get('group_name'))
 
-        # Create the auth object
-        authentication_object = _get_auth_object(snmp_params)
+            log_message = (
+                'Error occurred for OID %s on host %s: '
+                '(%s) ErrorNum: %s, ErrorInd: '
+                '%s') % (', '.join(oids_to_get),
+                         snmp_params['snmp_hostname'],
+                         session_error_string,
+                         session_error_status, session_error_index)
 
-        # Fill the results object by getting OID data
+            blank_results = _process_error(
+                connectivity_check=connectivity_check,
+                session_error_status=session_error_status,
+                session_error_index=session_error_index,
+                get=get,
+                log_message=log_message)
+            if get is True:
+                return blank_results
+            for oid_to_get in oids_to_get:
+                return_results[oid_to_get] = {}
+            return return_results
+
+        # Format results
+        if get is True:
+            return_results = _format_results(
+                normalized=normalized, get=get, var_binds=var_binds)
+        else:
+            for oid_to_get, column in zip(oids_to_get, var_binds):
+                return_results[oid_to_get] = _format_results(
+                    normalized=normalized, get=get, var_binds=column,
+                    oid_to_get=oid_to_get)
+
+        # Return
+        return return_results
+
+    async def _request(self, oids_to_get, get=False):
+        """Get the device's response to an SNMP request for many OIDs.
+
+        While results are shared, identical requests made at the same time
+        or later are only sent once.
+
+        Args:
+            oids_to_get: List of OIDs
+            get: Flag determining whether to do a GET or WALK
+
+        Returns:
+            (error_string, error_status, error_index, var_binds): Response
+
+        """
+        # Send the request every time unless results are shared
+        if self._shared is None:
+            return await self._fetch(oids_to_get, get=get)
+
+        # Send the request only once. The shared request must not be
+        # cancelled if one of the callers is
+        key = (tuple(oids_to_get), get)
+        if key not in self._shared:
+            self._shared[key] = asyncio.ensure_future(
+                snmp_engine.guard(self._fetch(oids_to_get, get=get)))
+        (response, error) = await asyncio.shield(self._shared[key])
+
+        # Exceptions, including those from log.log2die, are re-raised for
+        # every caller
+        if error is not None:
+            raise error
+
+        # Return
+        return response
+
+    async def _fetch(self, oids_to_get, get=False):
+        """Send an SNMP request for many OIDs to the device.
+
+        Args:
+            oids_to_get: List of OIDs
+            get: Flag determining whether to do a GET or WALK
+
+        Returns:
+            (error_string, error_status, error_index, var_binds): Response
+
+        """
+        # Initialize variables
+        snmp_params = self.snmp_params
+        engine = snmp_engine.engine()
+
+        # Send the request
         try:
             # Get the data
             if get is True:
                 (session_error_string, session_error_status,
-                 session_error_index, var_binds) = \
-                    snmp_object.getCmd(
-                        authentication_object, transport_object, oid_to_get)
+                 session_error_index, var_binds) = await engine.get(
+                     snmp_params, oids_to_get)
             else:
+                # GETBULK is used unless the device only supports SNMPv1
                 (session_error_string, session_error_status,
-                 session_error_index, var_binds) = \
-                    snmp_object.nextCmd(
-                        authentication_object, transport_object, oid_to_get)
+                 session_error_index, var_binds) = await engine.walk(
+                     snmp_params, oids_to_get,
+                     max_repetitions=_max_repetitions(
+                         snmp_params, self.cache.max_repetitions()))
+
+        # Queries are cancelled when another one has already succeeded
+        except asyncio.CancelledError:
+            raise
 
         # Do something here
         except Exception as exception_error:
             # Check for errors and print out results
             log_message = (
                 'Error occurred during SNMPget on host '
-                'OID %s from %s: (%s)') % (oid_to_get,
+                'OID %s from %s: (%s)') % (', '.join(oids_to_get),
                                            snmp_params['snmp_hostname'],
                                            exception_error)
             log.log2die(1023, log_message)
@@ -473,30 +913,41 @@ class Interact(object):
             log_message = ('Unexpected error')
             log.log2die(1002, log_message)
 
-        # Crash on error, return blank results if doing certain types of
-        # connectivity checks
-        if session_error_string:
-            log_message = (
-                'Error occurred for OID %s on host %s: '
-                '(%s) ErrorNum: %s, ErrorInd: '
-                '%s') % (oid_to_get,
-                         snmp_params['snmp_hostname'],
-                         session_error_string,
-                         session_error_status, session_error_index)
+        # Remember the largest GETBULK size the device accepts
+        if get is False:
+            limit = engine.bulk_limits.get(snmp_params['snmp_hostname'])
+            if limit is not None:
+                self.cache.update_max_repetitions(limit)
 
-            return _process_error(
-                connectivity_check=connectivity_check,
-                session_error_status=session_error_status,
-                session_error_index=session_error_index,
-                get=get,
-                log_message=log_message)
+        # Return
+        return (session_error_string, session_error_status,
+                session_error_index, var_binds)
 
-        # Format results
-        return_results = _format_results(
-            normalized=normalized, get=get, var_binds=var_binds)
 
-        # Return
-        return return_results
+def _swalk_results(data):
+    """Return the results of a failsafe SNMPwalk.
+
+    Args:
+        data: Results of a walk
+
+    Returns:
+        results: data, or a blank dict if the OID wasn't found
+
+    """
+    # Initialize key variables
+    results = {}
+
+    # If oid not found then return blank dict
+    for value in data.values():
+        if isinstance(value, rfc1905.NoSuchInstance) is False:
+            results = data
+        # If nothing is retuned, then fail
+        elif bool(value) is True:
+            results = data
+        break
+
+    # Return
+    return results
 
 
 def _process_error(
@@ -556,7 +1007,8 @@ def _process_error(
     log.log2die(1003, log_message)
 
 
-def _format_results(normalized=False, get=False, var_binds=None):
+def _format_results(
+        normalized=False, get=False, var_binds=None, oid_to_get=None):
     """Normalize the results of an walk.
 
     Args:
@@ -567,7 +1019,9 @@ def _format_results(normalized=False, get=False, var_binds=None):
             primary key is a universal value such as IF-MIB::ifIndex
             or BRIDGE-MIB::dot1dBasePort
         get: True if formatting the results of an SNMP get
-        var_binds: Dict of results
+        var_binds: List of (OID, value) tuples
+        oid_to_get: OID that was walked. Results outside of its subtree
+            are discarded
 
     Returns:
         return_results: Dict of results
@@ -575,6 +1029,11 @@ def _format_results(normalized=False, get=False, var_binds=None):
     """
     # Initialize key variables
     return_results = {}
+    prefix = None
+    prefix_length = 0
+    if bool(oid_to_get) is True:
+        prefix = oid_nodes(oid_to_get)
+        prefix_length = len(prefix)
 
     # ### Start ##########################################################
     # ####################################################################
@@ -585,21 +1044,38 @@ def _format_results(normalized=False, get=False, var_binds=None):
     if get is True:
         # Returns a single tuple
         for oid_returned, value in var_binds:
-            oid_fixed = ('.%s') % (oid_returned)
+            nodes = _nodes(oid_returned)
+            if normalized is True:
+                oid_fixed = str(nodes[-1])
+            else:
+                oid_fixed = oid_string(nodes)
             return_results[oid_fixed] = _convert(value)
     else:
         # Returns a list of tuples
-        for var_row in var_binds:
-            for oid_returned, value in var_row:
-                oid_fixed = ('.%s') % (oid_returned)
-                return_results[oid_fixed] = _convert(value)
+        for oid_returned, value in var_binds:
+            # GETBULK responses can overshoot the end of the MIB
+            if isinstance(value, rfc1905.EndOfMibView) is True:
+                continue
+
+            # Ignore OIDs outside of the walked subtree
+            nodes = _nodes(oid_returned)
+            if prefix is not None:
+                if len(nodes) <= prefix_length or (
+                        nodes[:prefix_length] != prefix):
+                    continue
+
+            # Only the nodes after the walked OID need converting to text
+            if normalized is True:
+                oid_fixed = str(nodes[-1])
+            elif prefix is not None:
+                oid_fixed = ('%s.%s') % (
+                    oid_to_get, '.'.join(map(str, nodes[prefix_length:])))
+            else:
+                oid_fixed = oid_string(nodes)
+            return_results[oid_fixed] = _convert(value)
     # ####################################################################
     # ### Stop ###########################################################
 
-    # Return normalized results if required
-    if normalized is True:
-        return_results = _normalized_walk(return_results)
-
     # Return
     return return_results
 
@@ -614,27 +1090,48 @@ def _convert(value):
         converted: converted value. Only returns BYTES and INTEGERS
 
     """
-    # Initialieze key values
-    converted = None
+    # Look up the conversion for the class of the value
+    value_class = value.__class__
+    converter = _CONVERTERS.get(value_class)
+    if converter is None:
+        converter = _converter(value_class)
+        _CONVERTERS[value_class] = converter
 
+    # Return
+    return converter(value)
+
+
+def _converter(value_class):
+    """Get the function that converts a class of pysnmp value.
+
+    Args:
+        value_class: Class of value
+
+    Returns:
+        converter: Function converting values of the class
+
+    """
     # Convert string type values to bytes
-    if isinstance(value, rfc1902.OctetString) is True:
-        converted = bytes(value)
-    elif isinstance(value, rfc1902.Opaque) is True:
-        converted = bytes(value)
-    elif isinstance(value, rfc1902.Bits) is True:
-        converted = bytes(value)
-    elif isinstance(value, rfc1902.IpAddress) is True:
-        converted = bytes(value)
-    elif isinstance(value, smi.ObjectIdentity) is True:
+    if issubclass(value_class, rfc1902.OctetString) is True:
+        converter = bytes
+    elif issubclass(value_class, rfc1902.Opaque) is True:
+        converter = bytes
+    elif issubclass(value_class, rfc1902.Bits) is True:
+        converter = bytes
+    elif issubclass(value_class, rfc1902.IpAddress) is True:
+        converter = bytes
+    elif issubclass(value_class, smi.ObjectIdentity) is True:
         # DO NOT CHANGE !!!
-        converted = bytes(str(value), 'utf-8')
-    elif isinstance(value, rfc1905.NoSuchObject) is True:
+        converter = _convert_oid
+    elif issubclass(value_class, univ.ObjectIdentifier) is True:
+        # OID values aren't resolved against MIBs
+        converter = _convert_oid
+    elif issubclass(value_class, rfc1905.NoSuchObject) is True:
         # Nothing if OID not found
-        converted = None
-    elif isinstance(value, rfc1905.NoSuchInstance) is True:
+        converter = _convert_none
+    elif issubclass(value_class, rfc1905.NoSuchInstance) is True:
         # Nothing if OID not found
-        converted = None
+        converter = _convert_none
     else:
         # Convert everything else into integer values
         # rfc1902.Integer
@@ -644,91 +1141,120 @@ def _convert(value):
         # rfc1902.Unsigned32
         # rfc1902.TimeTicks
         # rfc1902.Counter64
-        converted = int(value)
+        converter = int
 
     # Return
-    return converted
+    return converter
 
 
-def _get_auth_object(snmp_params):
-    """Get the authentication object to be used by cmdgen library.
+def _convert_oid(value):
+    """Convert an OID value to bytes.
 
     Args:
-        snmp_params: Dict of SNMP parameters
+        value: Value to convert
 
     Returns:
-        authentication_object: Auth object for query
+        converted: OID without a leading '.' as bytes
 
     """
-    # Initialize key variables
-    authentication_object = None
+    # Return
+    return bytes(str(value), 'utf-8')
 
-    # Process SNMPv2
-    if snmp_params['snmp_version'] == 2:
-        # Setup SNMPv2 authentication object
-        authentication_object = cmdgen.CommunityData(
-            snmp_params['snmp_community'])
 
-    # Process SNMPv3
-    else:
-        # Setup AuthProtocol (Default SHA)
-        if snmp_params['snmp_authprotocol'] is None:
-            authproto_object = cmdgen.usmNoAuthProtocol
-        else:
-            if snmp_params['snmp_authprotocol'].lower() == 'md5':
-                authproto_object = cmdgen.usmHMACMD5AuthProtocol
-            else:
-                authproto_object = cmdgen.usmHMACSHAAuthProtocol
+def _convert_none(value):
+    """Convert a value signifying a missing OID.
 
-        # Setup privProtocol (Default AES256)
-        if snmp_params['snmp_privprotocol'] is None:
-            privproto_object = cmdgen.usmNoPrivProtocol
-        else:
-            if snmp_params['snmp_privprotocol'].lower() == 'des':
-                privproto_object = cmdgen.usmDESPrivProtocol
-            elif snmp_params['snmp_privprotocol'].lower() == '3des':
-                privproto_object = cmdgen.usm3DESEDEPrivProtocol
-            elif snmp_params['snmp_privprotocol'].lower() == 'aes':
-                privproto_object = cmdgen.usmAesCfb128Protocol
-            elif snmp_params['snmp_privprotocol'].lower() == 'aes128':
-                privproto_object = cmdgen.usmAesCfb128Protocol
-            elif snmp_params['snmp_privprotocol'].lower() == 'aes192':
-                privproto_object = cmdgen.usmAesCfb192Protocol
-            else:
-                privproto_object = cmdgen.usmAesCfb256Protocol
+    Args:
+        value: Value to convert
+
+    Returns:
+        None
+
+    """
+    # Return
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def oid_nodes(oid):
+    """Convert an OID string to a tuple of integers.
+
+    Args:
+        oid: OID string, with or without a leading '.'
+
+    Returns:
+        nodes: Tuple of OID nodes
 
-        # Setup SNMPv3 authentication object
-        authentication_object = cmdgen.UsmUserData(
-            snmp_params['snmp_secname'],
-            snmp_params['snmp_authpassword'],
-            snmp_params['snmp_privpassword'],
-            authProtocol=authproto_object,
-            privProtocol=privproto_object)
+    """
+    # Return
+    nodes = tuple([int(node) for node in oid.lstrip('.').split('.')])
+    return nodes
+
+
+@functools.lru_cache(maxsize=65536)
+def oid_string(nodes):
+    """Convert a tuple of integers to an OID string.
+
+    Args:
+        nodes: Tuple of OID nodes
 
+    Returns:
+        oid: OID string with a leading '.'
+
+    """
     # Return
-    return authentication_object
+    oid = ('.%s') % ('.'.join(map(str, nodes)))
+    return oid
 
 
-def _normalized_walk(walk_results):
-    """Normalize the results of an walk.
+def _nodes(oid):
+    """Get the nodes of an OID returned by pysnmp.
 
     Args:
-        walk_results: Results of an walk
+        oid: pysnmp ObjectName or OID string
 
     Returns:
-        result: Dict of the format {'ifindex', 'oid_value')
+        nodes: Tuple of OID nodes
+
+    """
+    # pysnmp stores OIDs as tuples of integers already
+    try:
+        nodes = oid.asTuple()
+    except AttributeError:
+        nodes = oid_nodes(str(oid))
+
+    # Return
+    return nodes
+
+
+def _max_repetitions(snmp_params, limit=None):
+    """Get the GETBULK max-repetitions value to use for walks.
+
+    Args:
+        snmp_params: Dict of SNMP parameters
+        limit: Largest value known to be accepted by the device
+
+    Returns:
+        max_repetitions: Number of rows to request per GETBULK
 
     """
     # Initialize key variables
-    result = {}
+    max_repetitions = snmp_params.get('snmp_max_repetitions')
 
-    # Create the result
-    for key, value in walk_results.items():
-        octets = key.split('.')
-        result[octets[-1]] = value
+    # Use the default if not configured or invalid
+    try:
+        max_repetitions = int(max_repetitions)
+    except (TypeError, ValueError):
+        max_repetitions = MAX_REPETITIONS
+    if max_repetitions < 1:
+        max_repetitions = MAX_REPETITIONS
 
-    # Return result
-    return result
+    # Don't exceed what the device accepts
+    if bool(limit) is True:
+        max_repetitions = min(max_repetitions, limit)
+
+    # Return
+    return max_repetitions
 
 
 def _instance_found(results):
@@ -802,39 +1328,23 @@ def oid_valid_format(oid):
     return True
 
 
-def _update_cache(filename, snmp_group):
-    """Update the SNMP credentials cache file with successful snmp_group.
-
-    Args:
-        filename: Cache filename
-        group: SNMP group that successfully authenticated
-
-    Returns:
-        None
-
-    """
-    # Do update
-    with open(filename, 'w+') as env:
-        env.write(snmp_group)
-
-
-def _contactable(params_dict):
+async def _contactable(params_dict):
     """Determine whether host is contactable.
 
     Args:
         params_dict: Dict of SNMP parameters to try
 
     Returns:
-        alive: True if contactable
+        object_id: sysObjectID of the host. None if not contactable
 
     """
     # Initialize key variables
-    alive = False
+    object_id = None
 
-    # Verify connectivity
+    # Verify connectivity. The sysObjectID read to do this is remembered
     query = Interact(params_dict)
-    if query.contactable() is True:
-        alive = True
+    if await query.contactable_async() is True:
+        object_id = await query.sysobjectid_async()
 
     # Return
-    return alive
+    return object_id
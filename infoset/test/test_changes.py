@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Test the topology changes module."""
+
+import unittest
+
+from infoset.topology import changes as testimport
+from infoset.test import topology_helpers
+
+
+class KnownValues(topology_helpers.TopologyTestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Data read from a file has string keys
+    previous = {
+        'misc': {'timestamp': 1000},
+        'layer1': {
+            '1': {'ifName': 'Gi0/1', 'ifOperStatus': 1, 'vmVlan': 10,
+                  'jm_macs': ['001a2b3c4d5e']},
+            '2': {'ifName': 'Gi0/2', 'ifOperStatus': 1}}}
+    current = {
+        'misc': {'timestamp': 2000},
+        'layer1': {
+            1: {'ifName': 'Gi0/1', 'ifOperStatus': 2, 'vmVlan': 20,
+                'jm_macs': ['0000000000aa']},
+            3: {'ifName': 'Gi0/3', 'ifOperStatus': 1,
+                'lldpRemSysName': 'core'}}}
+    expected = [
+        [1, 'status', {'ifOperStatus': 1}, {'ifOperStatus': 2}],
+        [1, 'vlan', {'vmVlan': 10}, {'vmVlan': 20}],
+        [1, 'mac', None, ['0000000000aa']],
+        [2, 'port', 'Gi0/2', None],
+        [3, 'port', None, 'Gi0/3']]
+
+    def test_diff(self):
+        """Testing function diff."""
+        self.assertEqual(
+            testimport.diff(self.previous, self.current), self.expected)
+        self.assertEqual(testimport.diff(self.current, self.current), [])
+
+    def test_log(self):
+        """Testing methods record and read, and function changes."""
+        # Nothing logged
+        changelog = testimport.Log(self.config, 'test_host')
+        self.assertEqual(changelog.read(), [])
+        self.assertEqual(changelog.record(self.current, self.current), 0)
+
+        # Log changes at two times
+        self.assertEqual(changelog.record(self.previous, self.current), 5)
+        later = dict(self.previous, misc={'timestamp': 3000})
+        changelog.record(self.current, later)
+        self.assertEqual(len(changelog.read()), 10)
+
+        # Read a time range
+        result = changelog.read(start=1500, stop=2500)
+        self.assertEqual(
+            [[item['ifindex'], item['change'], item['old'], item['new']]
+             for item in result], self.expected)
+        self.assertEqual(
+            set(item['timestamp'] for item in result), set([2000]))
+        self.assertEqual(
+            len(testimport.changes(self.config, start=2500)), 5)
+        self.assertEqual(
+            testimport.changes(self.config, hostname='other_host'), [])
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Test the topology fleet module."""
+
+import unittest
+
+from infoset.topology import fleet as testimport
+from infoset.topology import store
+from infoset.test import topology_helpers
+
+
+class TestFleet(topology_helpers.TopologyTestCase):
+    """Checks all functions and methods."""
+
+    def test_normalize_mac(self):
+        """Testing function normalize_mac."""
+        for value in ['00:1A:2B:3C:4D:5E', '001a.2b3c.4d5e', '001a2b3c4d5e']:
+            self.assertEqual(testimport.normalize_mac(value), '001a2b3c4d5e')
+        self.assertIsNone(testimport.normalize_mac('001a2b3c4d'))
+
+    def test_lookups(self):
+        """Testing functions mac, ip and neighbors."""
+        # Nothing indexed
+        self.assertEqual(testimport.mac(self.config, '001a2b3c4d5e'), [])
+
+        # The MAC address is learned on the access port of one switch and
+        # the uplink of another
+        store.Device(self.config, 'access').write(
+            topology_helpers.device_data('Gi0/1', ['001a2b3c4d5e']))
+        store.Device(self.config, 'core').write(
+            topology_helpers.device_data(
+                'Gi1/1', ['001a2b3c4d5e'], neighbor='access',
+                arp={'10.0.0.1': '001a2b3c4d5e'}))
+        locations = testimport.mac(self.config, '00:1a:2b:3c:4d:5e')
+        self.assertEqual(
+            [(item['host'], item['ifName'], item['vlan'])
+             for item in locations],
+            [('access', 'Gi0/1', 10), ('core', 'Gi1/1', 10)])
+        self.assertEqual(
+            testimport.ip(self.config, '10.0.0.1'),
+            {'001a2b3c4d5e': {'hosts': ['core'], 'locations': locations}})
+        self.assertEqual(
+            testimport.neighbors(self.config, host='core'),
+            {'core': [{'ifindex': 1, 'ifName': 'Gi1/1', 'protocol': 'lldp',
+                       'neighbor': 'access', 'port': 'Gi0/48'}]})
+        self.assertEqual(testimport.neighbors(self.config, host='access'),
+                         {'access': []})
+
+        # Devices are indexed again after the index is cleared
+        testimport.clear()
+        self.assertEqual(
+            testimport.mac(self.config, '001a2b3c4d5e'), locations)
+
+        # Devices are reindexed when their data changes
+        data = topology_helpers.device_data('Gi0/1', ['0000000000aa'])
+        data['layer1'][1]['jm_macvlans'] = {'0000000000aa': [20, 30]}
+        store.Device(self.config, 'access').write(data)
+        topology_helpers.touch(self.config, 'access')
+        self.assertEqual(
+            [item['host'] for item in testimport.mac(
+                self.config, '001a2b3c4d5e')], ['core'])
+        self.assertEqual(
+            [(item['host'], item['vlan']) for item in testimport.mac(
+                self.config, '0000000000aa')],
+            [('access', 20), ('access', 30)])
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
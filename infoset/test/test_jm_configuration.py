@@ -105,10 +105,20 @@ class TestConfig(unittest.TestCase):
         # Initializing key variables
         # Doesn't fail because directory now exists
         result = self.testobj.topology_device_file(self.random_string)
-        expected = ('%s/%s.yaml') % (
+        expected = ('%s/%s.json') % (
             self.testobj.topology_directory(), self.random_string)
         self.assertEqual(result, expected)
 
+    def test_topology_changes_file(self):
+        """Testing method / function topology_changes_file."""
+        # Initializing key variables
+        result = self.testobj.topology_changes_file(self.random_string)
+        expected = ('%s/topology_changes/%s.log') % (
+            self.configuration_dict['data_directory'], self.random_string)
+        self.assertEqual(result, expected)
+        self.assertEqual(
+            os.path.isdir(self.testobj.topology_changes_directory()), True)
+
     def test_ingest_cache_directory(self):
         """Testing method / function ingest_cache_directory."""
         # Initializing key variables
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Test the language module."""
+
+import unittest
+
+from infoset.metadata import language as testimport
+
+
+class TestAgent(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Intstantiate a good agent
+    agent_name = 'snmp'
+    good_agent = testimport.Agent(agent_name, lang='en')
+
+    def test_label_description(self):
+        """Testing method label_description."""
+        # Testing with known good value
+        result = self.good_agent.label_description('ifInOctets')
+        self.assertEqual(result, 'Input Bandwidth')
+
+        # Testing with known bad value
+        result = self.good_agent.label_description('bogus')
+        self.assertEqual(result, '')
+
+    def test_label_descriptions(self):
+        """Testing method label_descriptions."""
+        # Testing with good and bad values
+        expected = {
+            'ifInOctets': 'Input Bandwidth',
+            'ifOutOctets': 'Output Bandwidth',
+            'bogus': ''
+        }
+        result = self.good_agent.label_descriptions(expected.keys())
+        self.assertEqual(result, expected)
+
+    def test_agent_yaml(self):
+        """Testing function _agent_yaml."""
+        # Parsed files are shared between instances
+        agent = testimport.Agent(self.agent_name, lang='en')
+        self.assertIs(agent.agent_yaml, self.good_agent.agent_yaml)
+
+        # Testing with non existent agent
+        result = testimport._agent_yaml('en', 'bogus')
+        self.assertEqual(result, {})
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
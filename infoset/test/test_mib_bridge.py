@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Test the mib_bridge module."""
+
+import asyncio
+import unittest
+
+from infoset.snmp import mib_bridge as testimport
+
+
+class Query(object):
+    """Class for snmp_manager.Interact mock returning fixed walk results."""
+
+    def __init__(self, results, snmp_version=2):
+        """Initialize the class."""
+        self.results = results
+        self.snmp_params = {'snmp_version': snmp_version}
+
+    async def walk_async(self, oid_to_get, normalized=False):
+        """Do a SNMPwalk."""
+        return self.results.get(oid_to_get, {})
+
+    async def swalk_async(self, oid_to_get, normalized=False):
+        """Do a failsafe SNMPwalk."""
+        return self.results.get(oid_to_get, {})
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # dot1dBasePortIfIndex results keyed by dot1dBasePort
+    baseports = {'1': 10101, '2': 10102}
+
+    def test_dot1qtpfdb(self):
+        """Testing function _dot1qtpfdb."""
+        # Filtering database 5 is used by VLAN 20. Database 30 is unknown
+        oid = testimport._DOT1QTPFDBPORT
+        snmpobj = Query({
+            oid: {
+                ('%s.5.0.26.43.60.77.94') % (oid): 1,
+                ('%s.30.0.26.43.60.77.95') % (oid): 2,
+                ('%s.30.0.26.43.60.77.96') % (oid): 0},
+            testimport._DOT1QVLANFDBID: {
+                ('%s.0.20') % (testimport._DOT1QVLANFDBID): 5},
+            testimport._DOT1DBASEPORTIFINDEX: self.baseports})
+
+        # Test
+        result = asyncio.run(testimport._dot1qtpfdb(snmpobj))
+        self.assertEqual(sorted(result), [
+            (10101, 20, '001a2b3c4d5e'), (10102, 30, '001a2b3c4d5f')])
+
+    def test_dot1dtpfdb(self):
+        """Testing function _dot1dtpfdb."""
+        oid = testimport._DOT1DTPFDBPORT
+        snmpobj = Query({
+            oid: {('%s.0.26.43.60.77.94') % (oid): 2},
+            testimport._DOT1DBASEPORTIFINDEX: self.baseports})
+
+        # Test
+        result = asyncio.run(testimport._dot1dtpfdb(snmpobj, vlan=10))
+        self.assertEqual(result, [(10102, 10, '001a2b3c4d5e')])
+
+    def test_context(self):
+        """Testing function _context."""
+        self.assertEqual(testimport._context(Query({}), 10), '10')
+        self.assertEqual(
+            testimport._context(Query({}, snmp_version=3), 10), 'vlan-10')
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
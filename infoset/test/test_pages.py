@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Test the topology pages module."""
+
+import unittest
+
+from infoset.topology import pages as testimport
+from infoset.topology import store
+from infoset.test import topology_helpers
+
+
+class KnownValues(topology_helpers.TopologyTestCase):
+    """Checks all functions and methods."""
+
+    def test_create(self):
+        """Testing function create."""
+        # Pages are reused while the file doesn't change
+        device = store.Device(self.config, 'test_host')
+        device.write(topology_helpers.device_data('Gi0/1'))
+        html = testimport.create(self.config, 'test_host')
+        self.assertIn('Gi0/1', html)
+        self.assertIs(testimport.create(self.config, 'test_host'), html)
+
+        # Pages are created again when the file is rewritten
+        device.write(topology_helpers.device_data('Gi0/2'))
+        topology_helpers.touch(self.config, 'test_host')
+        result = testimport.create(self.config, 'test_host')
+        self.assertIn('Gi0/2', result)
+        self.assertNotIn('Gi0/1', result)
+        self.assertIs(testimport.create(self.config, 'test_host'), result)
+
+        # Cleared pages are created again
+        testimport.clear()
+        self.assertIsNot(testimport.create(self.config, 'test_host'), result)
+
+        # Pages of deleted hosts are discarded
+        device.delete()
+        self.assertIsNone(testimport.create(self.config, 'test_host'))
+        self.assertEqual(testimport._HTML, {})
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
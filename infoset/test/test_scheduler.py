@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Test the scheduler module."""
+
+import unittest
+
+from infoset.agents import scheduler as testimport
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Required
+    maxDiff = None
+
+    def test_grid_interval(self):
+        """Testing function grid_interval."""
+        # Test
+        self.assertEqual(testimport.grid_interval(300), 300)
+        self.assertEqual(testimport.grid_interval(60), 300)
+        self.assertEqual(testimport.grid_interval(0), 300)
+        self.assertEqual(testimport.grid_interval(301), 600)
+        self.assertEqual(testimport.grid_interval(900), 900)
+
+    def test_spread_offset(self):
+        """Testing function spread_offset."""
+        # Offsets don't change and are within the spread
+        offset = testimport.spread_offset('host', 300, 0.5)
+        self.assertEqual(offset, testimport.spread_offset('host', 300, 0.5))
+        self.assertTrue(0 <= offset < 150)
+
+        # Names are spread
+        offsets = set(
+            [testimport.spread_offset(
+                ('host%s') % (count), 300, 0.5) for count in range(100)])
+        self.assertTrue(len(offsets) > 50)
+
+        # No spread
+        self.assertEqual(testimport.spread_offset('host', 300, 0), 0)
+
+    def test_next_run(self):
+        """Testing function next_run."""
+        # Later in the current interval
+        self.assertEqual(testimport.next_run(3000, 300, 10), 3010)
+
+        # In the next interval
+        self.assertEqual(testimport.next_run(3010, 300, 10), 3310)
+        self.assertEqual(testimport.next_run(3100, 300, 10), 3310)
+        self.assertEqual(testimport.next_run(3100, 900, 10), 3610)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
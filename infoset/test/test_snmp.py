@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Test the snmp agent."""
+
+import asyncio
+import importlib.util
+import os
+import threading
+import unittest
+
+from mock import Mock, patch
+
+# The agent is a script rather than a module of the infoset package
+_SPEC = importlib.util.spec_from_file_location(
+    'snmp_agent', os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)))), 'bin', 'agents', 'snmp.py'))
+testimport = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(testimport)
+
+
+class Config(object):
+    """Agent configuration with a label polled every 600 seconds."""
+
+    def agent_name(self):
+        """Return the agent name."""
+        return 'snmp'
+
+    def agent_hostnames(self):
+        """Return the hostnames to poll."""
+        return ['test_host']
+
+    def agent_spread(self):
+        """Return the fraction of intervals over which jobs are spread."""
+        return 0.5
+
+    def agent_interval(self):
+        """Return the default polling interval."""
+        return 300
+
+    def agent_host_intervals(self):
+        """Return the polling intervals of hosts."""
+        return {}
+
+    def agent_label_intervals(self):
+        """Return the polling intervals of agent labels."""
+        return {'slow_label': 600}
+
+
+class Plan(object):
+    """Polling plan with an agent label for each interval."""
+
+    def exists(self, hostname):
+        """Return True if the host is in the database."""
+        return True
+
+    def oids(self, hostname):
+        """Return the OIDs to poll on the host."""
+        return [
+            {'oid_labels': '.1.1', 'oid_values': '.1.2',
+             'agent_label': 'fast_label', 'base_type': 1, 'multiplier': 1},
+            {'oid_labels': '.1.1', 'oid_values': '.1.3',
+             'agent_label': 'slow_label', 'base_type': 1, 'multiplier': 1}]
+
+
+class Interact(object):
+    """Class for snmp_manager.Interact mock returning fixed walk results."""
+
+    def __init__(self, snmp_params):
+        """Initialize the class."""
+        self.snmp_params = snmp_params
+
+    async def swalk_columns_async(self, oids_to_get, normalized=False):
+        """Do a failsafe SNMPwalk of many OIDs."""
+        results = {}
+        for oid in oids_to_get:
+            results[oid] = {('%s.1') % (oid): 10}
+        return results
+
+
+class Validate(object):
+    """Class for snmp_manager.Validate mock accepting any credentials."""
+
+    def __init__(self, hostname, snmp_config):
+        """Initialize the class."""
+        self.hostname = hostname
+
+    async def credentials_async(self):
+        """Return working credentials."""
+        return {'snmp_hostname': self.hostname}
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Required
+    maxDiff = None
+
+    def test_due(self):
+        """Testing function _due."""
+        self.assertEqual(testimport._due([300, 600], 610), [300, 600])
+        self.assertEqual(testimport._due([300, 600], 910), [300])
+        self.assertEqual(testimport._due([600, 900], 1810), [600, 900])
+        self.assertEqual(testimport._due([600, 900], 2410), [600])
+
+    @patch.object(testimport.snmp_manager, 'Validate', Validate)
+    @patch.object(testimport.snmp_manager, 'Interact', Interact)
+    @patch.object(testimport.jm_configuration, 'ConfigSNMP', Mock())
+    @patch.object(testimport.db_hostoid, 'PollingPlan', Plan)
+    @patch.object(testimport.jm_configuration, 'ConfigAgent')
+    @patch.object(testimport.Agent, 'Agent')
+    def test_schedule(self, mock_agent, mock_config):
+        """Testing method _schedule with labels polled at two intervals."""
+        # Initialize key variables
+        mock_config.return_value = Config()
+        agent = testimport.PollingAgent()
+        threads = []
+        mock_agent.side_effect = lambda *args: (
+            threads.append(threading.current_thread()) or
+            mock_agent.return_value)
+
+        # The host has a single job
+        schedule = agent._schedule()
+        self.assertEqual(len(schedule.jobs), 1)
+        job = schedule.jobs[0]
+        self.assertEqual(job.interval, 300)
+
+        # Both labels are posted together when both intervals are due
+        with patch.object(testimport.time, 'time', return_value=610):
+            asyncio.run(job.function(*job.args))
+        labels = [
+            list(call[0][0].keys())[0]
+            for call in mock_agent.return_value.populate.call_args_list]
+        self.assertEqual(sorted(labels), ['fast_label', 'slow_label'])
+        self.assertEqual(mock_agent.return_value.post.call_count, 1)
+
+        # Agents are created outside the event loop's thread
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.main_thread())
+
+        # Only the label polled every 300 seconds is due at other times
+        mock_agent.reset_mock()
+        with patch.object(testimport.time, 'time', return_value=910):
+            asyncio.run(job.function(*job.args))
+        labels = [
+            list(call[0][0].keys())[0]
+            for call in mock_agent.return_value.populate.call_args_list]
+        self.assertEqual(labels, ['fast_label'])
+        self.assertEqual(mock_agent.return_value.post.call_count, 1)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test the snmp_cache module."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from infoset.snmp import snmp_cache as testimport
+
+
+class TestHost(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    hostname = 'test_host'
+
+    def setUp(self):
+        """Use a temporary cache file for each test."""
+        # Initialize key variables
+        self.directory = tempfile.mkdtemp()
+        self.filename = ('%s/%s.yaml') % (self.directory, self.hostname)
+        testimport._CACHE.clear()
+
+        # Patch the cache filename and time to live
+        patcher = patch.object(
+            testimport.hidden.File, 'snmp_cache', return_value=self.filename)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(testimport, '_TTL', 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Delete the temporary cache file."""
+        shutil.rmtree(self.directory)
+
+    def test_group(self):
+        """Testing methods group and update_group."""
+        # Nothing cached
+        cache = testimport.Host(self.hostname)
+        self.assertIsNone(cache.group())
+
+        # Cache the group. It must be visible to new objects
+        cache.update_group('test_group')
+        self.assertEqual(cache.group(), 'test_group')
+        self.assertEqual(testimport.Host(self.hostname).group(), 'test_group')
+        self.assertTrue(os.path.isfile(self.filename))
+
+        # The sysObjectID found while probing is cached with the group
+        cache.update_group('test_group', sysobjectid='.1.3.6.1.4.1.9')
+        self.assertEqual(cache.sysobjectid(), '.1.3.6.1.4.1.9')
+        cache.update_group('other_group', sysobjectid='.1.3.6.1.4.1.2636')
+        self.assertEqual(cache.group(), 'other_group')
+        self.assertEqual(cache.sysobjectid(), '.1.3.6.1.4.1.2636')
+
+    def test_expiry(self):
+        """Testing expiry of cache entries."""
+        # Write an expired entry in the old format
+        with open(self.filename, 'w') as f_handle:
+            f_handle.write('old_group')
+        cache = testimport.Host(self.hostname)
+        self.assertIsNone(cache.group())
+        self.assertEqual(cache.group(stale=True), 'old_group')
+
+        # Values aren't added to expired entries
+        cache.update_sysobjectid('.1.3.6.1.4.1.9')
+        self.assertIsNone(cache.sysobjectid())
+
+    def test_invalidate(self):
+        """Testing method invalidate."""
+        # Populate the cache
+        cache = testimport.Host(self.hostname)
+        cache.update_group('test_group')
+        cache.update_supported('.1.3.6.1', True)
+        cache.update_max_repetitions(10)
+        self.assertEqual(cache.supported('.1.3.6.1'), True)
+        self.assertIsNone(cache.supported('.1.3.6.2'))
+        self.assertEqual(cache.max_repetitions(), 10)
+
+        # Failures of other groups don't invalidate the cache
+        cache.invalidate('other_group')
+        self.assertEqual(cache.group(), 'test_group')
+
+        # Failures of the cached group do
+        cache.invalidate('test_group')
+        self.assertIsNone(cache.group())
+        self.assertIsNone(cache.supported('.1.3.6.1'))
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Test the snmp_engine module."""
+
+import asyncio
+import unittest
+
+from infoset.snmp import snmp_engine as testimport
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Required
+    maxDiff = None
+
+    # SNMP parameters
+    snmp_params = {
+        'snmp_hostname': 'localhost',
+        'snmp_port': 161,
+        'snmp_version': 2,
+        'snmp_community': 'public',
+        'snmp_secname': None,
+        'snmp_authprotocol': None,
+        'snmp_authpassword': None,
+        'snmp_privprotocol': None,
+        'snmp_privpassword': None,
+        'group_name': 'test'
+    }
+
+    def test_credential_key(self):
+        """Testing function _credential_key."""
+        # Hostnames and group names don't matter
+        other_params = dict(
+            self.snmp_params, snmp_hostname='bogus', group_name='bogus')
+        self.assertEqual(
+            testimport._credential_key(self.snmp_params),
+            testimport._credential_key(other_params))
+
+        # Credentials do
+        other_params = dict(self.snmp_params, snmp_community='private')
+        self.assertNotEqual(
+            testimport._credential_key(self.snmp_params),
+            testimport._credential_key(other_params))
+
+        # So do contexts
+        other_params = dict(self.snmp_params, snmp_context='10')
+        self.assertNotEqual(
+            testimport._credential_key(self.snmp_params),
+            testimport._credential_key(other_params))
+
+    def test_community(self):
+        """Testing function _community."""
+        self.assertEqual(testimport._community(self.snmp_params), 'public')
+        other_params = dict(self.snmp_params, snmp_context='10')
+        self.assertEqual(testimport._community(other_params), 'public@10')
+
+    def test_authentication_error(self):
+        """Testing function authentication_error."""
+        errind = testimport.errind
+        self.assertTrue(testimport.authentication_error(
+            errind.UnknownUserName()))
+        self.assertTrue(testimport.authentication_error(
+            errind.WrongDigest()))
+        self.assertFalse(testimport.authentication_error(
+            errind.RequestTimedOut()))
+        self.assertFalse(
+            testimport.authentication_error(testimport.UNAVAILABLE))
+
+    @unittest.skipIf(
+        testimport.hlapi is None, 'pysnmp does not support asyncio')
+    def test_engine_object(self):
+        """Testing method _engine_object."""
+        # Initialize key variables
+        engine = testimport.Engine()
+        group_1 = dict(
+            self.snmp_params, snmp_version=3, snmp_community=None,
+            snmp_secname='user1', snmp_authprotocol='sha',
+            snmp_authpassword='authkey111', snmp_privprotocol='aes',
+            snmp_privpassword='privkey111')
+        group_2 = dict(
+            group_1, snmp_authpassword='authkey222',
+            snmp_privpassword='privkey222')
+
+        async def engines(params_list):
+            """Get the SNMP engines in the event loop's thread."""
+            return [engine._engine_object(params) for params in params_list]
+
+        # Groups sharing a user name with different keys don't share the
+        # engine's SNMPv3 user
+        (first, second, again, context) = engine.run(engines([
+            group_1, group_2, group_1, dict(group_1, snmp_context='10')]))
+        self.assertIsNot(first, second)
+        self.assertIs(first, again)
+        self.assertIs(first, context)
+
+        # SNMPv2 requests share an engine
+        (first, second) = engine.run(engines([
+            self.snmp_params, dict(self.snmp_params, snmp_community='x')]))
+        self.assertIs(first, second)
+
+    def test_guard(self):
+        """Testing function guard."""
+        # Initialize key variables
+        loop = asyncio.new_event_loop()
+
+        async def good():
+            """Return a value."""
+            return 1
+
+        async def bad():
+            """Exit."""
+            raise SystemExit(2)
+
+        # Test
+        (result, error) = loop.run_until_complete(testimport.guard(good()))
+        self.assertEqual(result, 1)
+        self.assertIsNone(error)
+        (result, error) = loop.run_until_complete(testimport.guard(bad()))
+        self.assertIsNone(result)
+        self.assertIsInstance(error, SystemExit)
+        loop.close()
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Test the snmp_health module."""
+
+import shutil
+import tempfile
+import time
+import unittest
+
+from mock import patch
+
+from infoset.snmp import snmp_health as testimport
+
+
+class TestHost(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    hostname = 'test_host'
+
+    def setUp(self):
+        """Use a temporary health file for each test."""
+        # Initialize key variables
+        self.directory = tempfile.mkdtemp()
+        self.filename = ('%s/%s.yaml') % (self.directory, self.hostname)
+
+        # Patch the health filename and don't log
+        patcher = patch.object(
+            testimport.hidden.File, 'snmp_health',
+            return_value=self.filename)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(testimport.log, 'log2warn')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Delete the temporary health file."""
+        shutil.rmtree(self.directory)
+
+    def test_breaker(self):
+        """Testing methods available, success and failure."""
+        # Initialize key variables
+        health = testimport.Host(
+            self.hostname, failure_limit=2, backoff=60)
+        self.assertTrue(health.available())
+
+        # Requests outstanding at the same time count as one failure
+        started = time.time()
+        health.failure(started)
+        health.failure(started)
+        self.assertTrue(health.available())
+
+        # The host is skipped after consecutive failures. Other processes
+        # must see this
+        health.failure(time.time())
+        self.assertFalse(health.available())
+        other = testimport.Host(self.hostname, failure_limit=2, backoff=60)
+        self.assertFalse(other.available())
+
+        # Failing again after the skip time doubles it
+        health._state['open_until'] = 0
+        self.assertTrue(health.available())
+        health.failure(time.time())
+        self.assertFalse(health.available())
+        self.assertEqual(health._state['backoff'], 120)
+
+        # A reply resets everything
+        health.success()
+        self.assertTrue(health.available())
+        self.assertEqual(health._state['failures'], 0)
+        self.assertEqual(health._state['backoff'], 0)
+
+    def test_timeout(self):
+        """Testing method timeout."""
+        # Initialize key variables
+        health = testimport.Host(self.hostname, max_timeout=5)
+
+        # Default until the round trip time is known
+        self.assertEqual(health.timeout(), testimport.INITIAL_TIMEOUT)
+
+        # Fast devices get short timeouts
+        for _ in range(10):
+            health.success(0.01)
+        self.assertEqual(health.timeout(), testimport.MIN_TIMEOUT)
+
+        # Slow devices get longer ones, up to the maximum
+        for _ in range(10):
+            health.success(1)
+        self.assertTrue(testimport.MIN_TIMEOUT < health.timeout() < 5)
+        for _ in range(10):
+            health.success(10)
+        self.assertEqual(health.timeout(), 5)
+
+        # Walks always get the longest timeout
+        for _ in range(10):
+            health.success(0.01)
+        self.assertEqual(health.timeout(walk=True), 5)
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Required
+    maxDiff = None
+
+    def test_rtt(self):
+        """Testing function _rtt."""
+        # First measurement
+        self.assertEqual(testimport._rtt(None, None, 2), (2, 1))
+
+        # Later measurements
+        self.assertEqual(testimport._rtt(2, 1, 2), (2, 0.75))
+
+    def test_timeout(self):
+        """Testing function _timeout."""
+        # Values are rounded up to steps and limited
+        self.assertEqual(testimport._timeout(None, None, 5), 1)
+        self.assertEqual(testimport._timeout(0.1, 0.1, 5), 1)
+        self.assertEqual(testimport._timeout(1, 0.2, 5), 2)
+        self.assertEqual(testimport._timeout(1, 0.3, 5), 2.25)
+        self.assertEqual(testimport._timeout(4, 1, 5), 5)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
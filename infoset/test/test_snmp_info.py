@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test the snmp_info module."""
+
+import unittest
+
+from mock import Mock, patch
+
+from infoset.snmp import snmp_info as testimport
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Required
+    maxDiff = None
+
+    previous = {
+        'indicators': {
+            'uptime': {'.1.3.6.1.2.1.1.3.0': 1000},
+            'interfaces': {'.1.3.6.1.2.1.2.2.1.9.1': 10},
+            'lldp': {'.1.0.8802.1.1.2.1.2.1.0': 20}},
+        'results': {}}
+
+    def test_changes(self):
+        """Testing function _changes."""
+        # Initialize key variables
+        indicators = {
+            'uptime': {'.1.3.6.1.2.1.1.3.0': 2000},
+            'interfaces': {'.1.3.6.1.2.1.2.2.1.9.1': 10},
+            'lldp': {'.1.0.8802.1.1.2.1.2.1.0': 30},
+            'entity': {}}
+
+        # Everything has changed without a previous poll
+        self.assertIsNone(testimport._changes(None, indicators))
+
+        # Changed and unreadable indicators
+        self.assertEqual(
+            testimport._changes(self.previous, indicators),
+            set(['lldp', 'entity']))
+
+        # Everything has changed after a restart
+        indicators['uptime'] = {'.1.3.6.1.2.1.1.3.0': 500}
+        self.assertIsNone(testimport._changes(self.previous, indicators))
+        indicators['uptime'] = {}
+        self.assertIsNone(testimport._changes(self.previous, indicators))
+
+    def test_unchanged(self):
+        """Testing function _unchanged."""
+        # Initialize key variables
+        class Query(object):
+            """MIB query class."""
+
+            indicators = ['interfaces']
+
+        # Test
+        self.assertTrue(testimport._unchanged(Query, set(['lldp'])))
+        self.assertFalse(testimport._unchanged(Query, set(['interfaces'])))
+        self.assertFalse(testimport._unchanged(Query, None))
+
+        # Data without indicators is always walked
+        Query.indicators = None
+        self.assertFalse(testimport._unchanged(Query, set()))
+
+        # Data with no indicators only changes on restarts
+        Query.indicators = []
+        self.assertTrue(testimport._unchanged(Query, set(['interfaces'])))
+
+    @patch.object(testimport, 'get_queries')
+    def test_layers(self, mock_queries):
+        """Testing method _layers reading change indicators."""
+        # Initialize key variables
+        class Query(object):
+            """MIB query class."""
+
+            indicators = ['interfaces']
+            static = {'layer1': ['ifDescr']}
+            alias = 'uplink'
+            descr = 'eth0'
+
+            def layer1(self, skip=None):
+                """Return layer 1 data."""
+                data = {1: {'ifAlias': self.alias}}
+                if skip is None or 'ifDescr' not in skip:
+                    data[1]['ifDescr'] = self.descr
+                return data
+
+        mock_queries.return_value = [Query]
+        snmp_object = Mock()
+        snmp_object.swalk_columns.return_value = {
+            '.1.3.6.1.2.1.1.3': {'.1.3.6.1.2.1.1.3.0': 1000},
+            '.1.3.6.1.2.1.2.2.1.9': {'.1.3.6.1.2.1.2.2.1.9.1': 10}}
+        status = testimport.Query(snmp_object, max_workers=1)
+        status.capabilities = Mock(return_value={Query: Query()})
+        status.enterprise = Mock(return_value=None)
+        expected = {1: {'ifAlias': 'uplink', 'ifDescr': 'eth0'}}
+
+        # Indicators aren't read when nothing will be compared with them
+        results = status._layers(['layer1'])
+        self.assertEqual(results['layer1'], expected)
+        self.assertFalse(snmp_object.swalk_columns.called)
+        self.assertEqual(status.snapshot()['indicators'], {})
+
+        # They are read when the snapshot is kept for the next poll
+        status._layers(['layer1'], incremental=True)
+        self.assertEqual(snmp_object.swalk_columns.call_count, 1)
+        self.assertEqual(
+            sorted(status.snapshot()['indicators'].keys()),
+            ['interfaces', 'uptime'])
+
+        # Static fields are copied from the previous poll while the
+        # indicators are unchanged. Other fields are walked again
+        previous = status.snapshot()
+        Query.alias = 'downlink'
+        Query.descr = 'eth1'
+        results = status._layers(['layer1'], previous=previous)
+        self.assertEqual(
+            results['layer1'], {1: {'ifAlias': 'downlink', 'ifDescr': 'eth0'}})
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
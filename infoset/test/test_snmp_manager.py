@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Test the snmp_manager module."""
+
+import asyncio
+import unittest
+
+from mock import Mock, patch
+from pysnmp.proto import rfc1902
+from pysnmp.proto import rfc1905
+
+from infoset.snmp import snmp_manager as testimport
+
+
+class KnownValues(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Required
+    maxDiff = None
+
+    @patch.object(testimport.snmp_cache, 'Host')
+    @patch.object(testimport.snmp_engine, 'engine')
+    def test_credentials_async(self, mock_engine, mock_host):
+        """Testing method credentials_async of class Validate."""
+        # Initialize key variables
+        mock_host.return_value = Mock(**{'group.return_value': None})
+        group = {
+            'snmp_version': 3, 'snmp_community': None, 'snmp_port': 161,
+            'snmp_secname': 'user1', 'snmp_authprotocol': 'sha',
+            'snmp_privprotocol': 'aes', 'snmp_privpassword': 'privkey123'}
+        snmp_config = [
+            dict(group, group_name='wrong', snmp_authpassword='wrongkey1'),
+            dict(group, group_name='right', snmp_authpassword='authkey123')]
+
+        async def contactable(params_dict):
+            """Only the right keys work. The wrong group fails first."""
+            if params_dict['snmp_authpassword'] != 'authkey123':
+                return None
+            await asyncio.sleep(0.01)
+            return '.1.3.6.1.4.1.9.1.1'
+
+        # The second group is found although the first one, with the same
+        # user name, fails
+        with patch.object(testimport, '_contactable', contactable):
+            result = asyncio.run(testimport.Validate(
+                'test_host', snmp_config).credentials_async())
+        self.assertEqual(result['group_name'], 'right')
+        self.assertEqual(result['snmp_hostname'], 'test_host')
+        mock_host.return_value.update_group.assert_called_once_with(
+            'right', sysobjectid='.1.3.6.1.4.1.9.1.1')
+
+    def test_format_results(self):
+        """Testing function _format_results."""
+        # Walk results, including rows beyond the walked subtree
+        oid = '.1.3.6.1.2.1.2.2.1.10'
+        var_binds = [
+            ('1.3.6.1.2.1.2.2.1.10.1', rfc1902.Counter32(100)),
+            ('1.3.6.1.2.1.2.2.1.10.2', rfc1902.Counter32(200)),
+            ('1.3.6.1.2.1.2.2.1.10.2', rfc1905.endOfMibView),
+            ('1.3.6.1.2.1.2.2.1.11.1', rfc1902.Counter32(300))
+        ]
+        expected = {
+            '.1.3.6.1.2.1.2.2.1.10.1': 100,
+            '.1.3.6.1.2.1.2.2.1.10.2': 200
+        }
+        result = testimport._format_results(
+            var_binds=var_binds, oid_to_get=oid)
+        self.assertEqual(result, expected)
+
+        # Normalized walk results
+        result = testimport._format_results(
+            normalized=True, var_binds=var_binds, oid_to_get=oid)
+        self.assertEqual(result, {'1': 100, '2': 200})
+
+        # Get results
+        var_binds = [('1.3.6.1.2.1.1.3.0', rfc1902.TimeTicks(500))]
+        result = testimport._format_results(get=True, var_binds=var_binds)
+        self.assertEqual(result, {'.1.3.6.1.2.1.1.3.0': 500})
+
+        # Normalized get results
+        result = testimport._format_results(
+            normalized=True, get=True, var_binds=var_binds)
+        self.assertEqual(result, {'0': 500})
+
+    def test_convert(self):
+        """Testing function _convert."""
+        # Test values
+        values = [
+            (rfc1902.OctetString('test'), b'test'),
+            (rfc1902.IpAddress('10.0.0.1'), bytes([10, 0, 0, 1])),
+            (rfc1902.ObjectName('1.3.6.1'), b'1.3.6.1'),
+            (rfc1902.Counter32(100), 100),
+            (rfc1902.Counter64(2 ** 40), 2 ** 40),
+            (rfc1902.Integer32(-1), -1),
+            (rfc1905.noSuchInstance, None)
+        ]
+        for value, expected in values:
+            self.assertEqual(testimport._convert(value), expected)
+
+        # Conversions are remembered by class
+        self.assertIs(
+            testimport._CONVERTERS[rfc1902.Counter32], int)
+
+    def test_oid_nodes(self):
+        """Testing functions oid_nodes and oid_string."""
+        # Test
+        self.assertEqual(testimport.oid_nodes('.1.3.6.1'), (1, 3, 6, 1))
+        self.assertEqual(testimport.oid_nodes('1.3.6.1'), (1, 3, 6, 1))
+        self.assertEqual(testimport.oid_string((1, 3, 6, 1)), '.1.3.6.1')
+
+    def test_max_repetitions(self):
+        """Testing function _max_repetitions."""
+        # Test configured value
+        result = testimport._max_repetitions({'snmp_max_repetitions': 10})
+        self.assertEqual(result, 10)
+
+        # Test defaults
+        expected = testimport.MAX_REPETITIONS
+        for value in [None, 0, -1, 'bogus']:
+            result = testimport._max_repetitions(
+                {'snmp_max_repetitions': value})
+            self.assertEqual(result, expected)
+        result = testimport._max_repetitions({})
+        self.assertEqual(result, expected)
+
+    def test_oid_valid_format(self):
+        """Testing function oid_valid_format."""
+        # Test good values
+        self.assertEqual(testimport.oid_valid_format('.1.3.6.1'), True)
+
+        # Test bad values
+        for value in ['1.3.6.1', '.1.3.6.1.', '.1.3.a.1', '', 1]:
+            self.assertEqual(testimport.oid_valid_format(value), False)
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
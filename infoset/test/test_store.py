@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Test the topology store module."""
+
+import os
+import unittest
+
+import yaml
+
+from infoset.topology import store as testimport
+from infoset.test import topology_helpers
+
+
+class TestDevice(topology_helpers.TopologyTestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    data = {
+        'misc': {'host': 'test_host'},
+        'layer1': {1: {'ifDescr': 'Gi0/1', 'ifSpeed': 1000000000}}}
+    expected = {
+        'misc': {'host': 'test_host'},
+        'layer1': {'1': {'ifDescr': 'Gi0/1', 'ifSpeed': 1000000000}}}
+
+    def test_write(self):
+        """Testing methods write and read, and function hostnames."""
+        # Nothing stored
+        device = testimport.Device(self.config, 'test_host')
+        self.assertFalse(device.exists())
+        self.assertIsNone(device.version())
+        self.assertEqual(testimport.hostnames(self.config), {})
+
+        # Keys are read back as strings
+        device.write(self.data)
+        self.assertTrue(device.exists())
+        self.assertEqual(device.read(), self.expected)
+        self.assertEqual(
+            testimport.hostnames(self.config),
+            {'test_host': ('%s/test_host.json') % (self.directory)})
+
+        # The version changes when the data is written again
+        filename = ('%s/test_host.json') % (self.directory)
+        os.utime(filename, ns=(0, 0))
+        version = device.version()
+        self.assertEqual(version, (filename, 0))
+        device.write(self.data)
+        self.assertNotEqual(device.version(), version)
+
+        # Delete the data
+        device.delete()
+        self.assertFalse(device.exists())
+        self.assertEqual(testimport.hostnames(self.config), {})
+
+    def test_yaml(self):
+        """Testing the reading of YAML files of earlier versions."""
+        # Write a YAML file
+        filename = ('%s/old_host.yaml') % (self.directory)
+        with open(filename, 'w') as file_handle:
+            yaml.dump(self.expected, file_handle, default_flow_style=False)
+
+        # Read it
+        device = testimport.Device(self.config, 'old_host')
+        self.assertTrue(device.exists())
+        self.assertEqual(device.read(), self.expected)
+        self.assertEqual(
+            testimport.hostnames(self.config), {'old_host': filename})
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Test the topology translator module."""
+
+import unittest
+
+from infoset.topology import translator as testimport
+from infoset.topology import store
+from infoset.test import topology_helpers
+
+
+class KnownValues(topology_helpers.TopologyTestCase):
+    """Checks all functions and methods."""
+
+    def test_translate(self):
+        """Testing function translate."""
+        # Translations are reused while the file doesn't change
+        device = store.Device(self.config, 'test_host')
+        device.write(topology_helpers.device_data('Gi0/1'))
+        translation = testimport.translate(self.config, 'test_host')
+        self.assertEqual(translation.ethernet_data()[1]['ifName'], 'Gi0/1')
+        self.assertIs(
+            testimport.translate(self.config, 'test_host'), translation)
+
+        # Rewritten files are translated again
+        device.write(topology_helpers.device_data('Gi0/2'))
+        topology_helpers.touch(self.config, 'test_host')
+        result = testimport.translate(self.config, 'test_host')
+        self.assertIsNot(result, translation)
+        self.assertEqual(result.ethernet_data()[1]['ifName'], 'Gi0/2')
+        self.assertIs(testimport.translate(self.config, 'test_host'), result)
+
+        # Cleared translations are translated again
+        testimport.clear()
+        self.assertIsNot(
+            testimport.translate(self.config, 'test_host'), result)
+
+        # Translations of deleted hosts are discarded
+        testimport.translate(self.config, 'test_host', ifindices=[1])
+        device.delete()
+        with self.assertRaises(SystemExit):
+            testimport.translate(self.config, 'test_host')
+        self.assertEqual(testimport._CACHE, {})
+
+    def test_arp_data(self):
+        """Testing method arp_data."""
+        # ARP tables
+        data = topology_helpers.device_data('Gi0/1')
+        data['layer3'] = {
+            'ipNetToMediaTable': {'10.0.0.1': '001a2b3c4d5e'},
+            'ipv6NetToMediaPhysAddress': None}
+        store.Device(self.config, 'test_host').write(data)
+        self.assertEqual(
+            testimport.Translator(self.config, 'test_host').arp_data(),
+            {'10.0.0.1': '001a2b3c4d5e'})
+
+        # Devices without layer 3 data
+        data['layer3'] = None
+        store.Device(self.config, 'test_host').write(data)
+        translation = testimport.Translator(self.config, 'test_host')
+        self.assertEqual(translation.arp_data(), {})
+        self.assertEqual(translation.ethernet_data()[1]['ifName'], 'Gi0/1')
+
+
+if __name__ == '__main__':
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Shared setup for the tests of the topology package."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from infoset.topology import fleet
+from infoset.topology import pages
+from infoset.topology import translator
+
+
+class Config(object):
+    """Configuration with temporary topology directories."""
+
+    def __init__(self, directory):
+        """Initialize the class."""
+        self.directory = directory
+
+    def topology_directory(self):
+        """Return the topology directory."""
+        return self.directory
+
+    def topology_device_file(self, host):
+        """Return the topology file of a host."""
+        return ('%s/%s.json') % (self.directory, host)
+
+    def topology_changes_directory(self):
+        """Return the topology changes directory."""
+        return self.directory
+
+    def topology_changes_file(self, host):
+        """Return the topology changes file of a host."""
+        return ('%s/%s.log') % (self.directory, host)
+
+
+class TopologyTestCase(unittest.TestCase):
+    """Test case with a temporary topology directory for each test."""
+
+    # Required
+    maxDiff = None
+
+    def setUp(self):
+        """Use a temporary topology directory and caches for each test."""
+        self.directory = tempfile.mkdtemp()
+        self.config = Config(self.directory)
+        translator.clear()
+        pages.clear()
+        fleet.clear()
+
+    def tearDown(self):
+        """Delete the temporary topology directory."""
+        shutil.rmtree(self.directory)
+        translator.clear()
+        pages.clear()
+        fleet.clear()
+
+
+def device_data(ifname, macs=None, neighbor=None, arp=None):
+    """Create the topology data of a device with one Ethernet port."""
+    port = {
+        'ifName': ifname, 'ifAlias': 'Uplink', 'ifType': 6,
+        'ifAdminStatus': 1, 'ifOperStatus': 1, 'ifHighSpeed': 1000,
+        'vmVlan': 10}
+    if macs is not None:
+        port['jm_macs'] = macs
+    if neighbor is not None:
+        port['lldpRemSysName'] = neighbor
+        port['lldpRemPortDesc'] = 'Gi0/48'
+    data = {
+        'layer1': {1: port},
+        'layer3': {'ipNetToMediaTable': arp or {}},
+        'system': {
+            'IF-MIB': {'ifStackStatus': {'1': [0]}},
+            'SNMPv2-MIB': {
+                'sysName': {'0': 'test_host'},
+                'sysDescr': {'0': 'Test switch'},
+                'sysObjectID': {'0': '.1.3.6.1.4.1.9.1.1'},
+                'sysUpTime': {'0': 100}}}}
+    return data
+
+
+def touch(config, host):
+    """Change the modification time of the topology file of a host."""
+    filename = config.topology_device_file(host)
+    mtime = os.stat(filename).st_mtime_ns + 10 ** 9
+    os.utime(filename, ns=(mtime, mtime))
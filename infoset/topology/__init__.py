@@ -8,3 +8,4 @@ enough to warrant their own package
 
 # Import classes
 from infoset.topology.translator import Translator
+from infoset.topology.translator import translate
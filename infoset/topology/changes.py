@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""Log of the changes to the topology data of devices.
+
+The changes between successive polls of a device, such as ports going up
+or down, VLAN changes, new MAC addresses and neighbor changes, are
+appended to a log file for the device. Only the changes are saved, so the
+history of a device takes far less space than its topology data.
+
+Each line of a log holds the changes found by a poll as compact JSON.
+Lines are in time order.
+
+"""
+
+# Standard libraries
+import json
+import os
+import time
+
+# Infoset libraries
+from infoset.utils import log
+
+# Layer 1 keys of the port status values that are logged
+STATUS_KEYS = ['ifOperStatus', 'ifAdminStatus']
+
+# Layer 1 keys of the vendor specific VLAN values that are logged
+VLAN_KEYS = [
+    'vmVlan', 'jnxExVlanTag', 'dot1qPvid', 'vlanTrunkPortNativeVlan']
+
+# Layer 1 keys of the LLDP and CDP neighbor values that are logged
+NEIGHBOR_KEYS = [
+    'lldpRemSysName', 'lldpRemPortDesc',
+    'cdpCacheDeviceId', 'cdpCacheDevicePort']
+
+
+class Log(object):
+    """Class for the change log of a device.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        record:
+        read:
+    """
+
+    def __init__(self, config, hostname):
+        """Method initializing the class.
+
+        Args:
+            config: Configuration object
+            hostname: Hostname
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.hostname = hostname
+        self.filename = config.topology_changes_file(hostname)
+
+    def record(self, previous, current):
+        """Append the changes between two polls of the device to the log.
+
+        Args:
+            previous: Topology data of the previous poll
+            current: Topology data of the current poll
+
+        Returns:
+            found: Number of changes found
+
+        """
+        # Initialize key variables
+        found = diff(previous, current)
+        timestamp = current.get('misc', {}).get('timestamp')
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        # Append a single line, so lines are never interleaved
+        if bool(found) is True:
+            line = json.dumps(
+                [timestamp, found], separators=(',', ':'), default=str)
+            with open(self.filename, 'a') as file_handle:
+                file_handle.write(('%s\n') % (line))
+
+        # Return
+        return len(found)
+
+    def read(self, start=None, stop=None):
+        """Read the changes logged in a time range.
+
+        Args:
+            start: Earliest timestamp. The start of the log if None
+            stop: Latest timestamp. The end of the log if None
+
+        Returns:
+            result: List of change dicts in time order. See changes()
+
+        """
+        # Initialize key variables
+        result = []
+
+        # Nothing logged yet
+        if os.path.isfile(self.filename) is False:
+            return result
+
+        # Read lines until the end of the time range
+        with open(self.filename, 'r') as file_handle:
+            for line in file_handle:
+                try:
+                    (timestamp, found) = json.loads(line)
+                except ValueError:
+                    log_message = (
+                        'Ignoring corrupt line in topology change log %s.'
+                        '') % (self.filename)
+                    log.log2warn(1121, log_message)
+                    continue
+                if stop is not None and timestamp > stop:
+                    break
+                if start is not None and timestamp < start:
+                    continue
+                for (ifindex, change, old, new) in found:
+                    result.append({
+                        'timestamp': timestamp,
+                        'hostname': self.hostname,
+                        'ifindex': ifindex,
+                        'change': change,
+                        'old': old,
+                        'new': new})
+
+        # Return
+        return result
+
+
+def changes(config, start=None, stop=None, hostname=None):
+    """Read the changes to devices logged in a time range.
+
+    Args:
+        config: Configuration object
+        start: Earliest timestamp. The start of the logs if None
+        stop: Latest timestamp. The end of the logs if None
+        hostname: Hostname. The changes to all devices are read if None
+
+    Returns:
+        result: List of change dicts in time order. Each has the
+            timestamp of the poll, the hostname, the ifIndex of the port,
+            the kind of change, and the old and new values. The kinds are
+            "port" (added or removed), "status", "vlan", "mac" (new MAC
+            addresses) and "neighbor"
+
+    """
+    # Initialize key variables
+    result = []
+    directory = config.topology_changes_directory()
+
+    # Get the hosts with logs
+    if hostname is None:
+        hostnames = []
+        if os.path.isdir(directory) is True:
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith('.log') is True:
+                    hostnames.append(filename[:-len('.log')])
+    else:
+        hostnames = [hostname]
+
+    # Read the logs
+    for host in hostnames:
+        result.extend(Log(config, host).read(start=start, stop=stop))
+
+    # Return
+    result.sort(key=lambda item: item['timestamp'])
+    return result
+
+
+def diff(previous, current):
+    """Find the changes to the ports of a device between two polls.
+
+    Args:
+        previous: Topology data of the previous poll
+        current: Topology data of the current poll
+
+    Returns:
+        found: List of [ifIndex, kind, old value, new value] lists. See
+            changes()
+
+    """
+    # Initialize key variables
+    found = []
+    before = _ports(previous)
+    after = _ports(current)
+
+    # Process ports
+    for ifindex in sorted(set(before.keys()) | set(after.keys())):
+        old = before.get(ifindex)
+        new = after.get(ifindex)
+
+        # Added and removed ports
+        if old is None or new is None:
+            found.append([
+                ifindex, 'port', _name(old, ifindex), _name(new, ifindex)])
+            continue
+
+        # Changes to values
+        for change, keys in [('status', STATUS_KEYS), ('vlan', VLAN_KEYS),
+                             ('neighbor', NEIGHBOR_KEYS)]:
+            old_values = _values(old, keys)
+            new_values = _values(new, keys)
+            if old_values != new_values:
+                found.append([ifindex, change, old_values, new_values])
+
+        # New MAC addresses. Addresses that age out aren't changes
+        known = set(old.get('jm_macs', []))
+        added = [
+            macaddress for macaddress in new.get('jm_macs', [])
+            if macaddress not in known]
+        if bool(added) is True:
+            found.append([ifindex, 'mac', None, sorted(added)])
+
+    # Return
+    return found
+
+
+def _ports(data):
+    """Get the layer 1 data of a device keyed by integer ifIndex.
+
+    Args:
+        data: Topology data
+
+    Returns:
+        ports: Dict of port data keyed by ifIndex
+
+    """
+    # Return. Data read from files has string keys
+    layer1 = data.get('layer1') or {}
+    ports = dict((int(key), value) for key, value in layer1.items())
+    return ports
+
+
+def _values(port, keys):
+    """Get the values of some keys of a port's data.
+
+    Args:
+        port: Port data
+        keys: List of keys
+
+    Returns:
+        values: Dict of values of the keys that are present
+
+    """
+    # Return. Lists are compared regardless of whether they were read
+    # from files
+    values = {}
+    for key in keys:
+        if key in port:
+            value = port[key]
+            if isinstance(value, tuple) is True:
+                value = list(value)
+            values[key] = value
+    return values
+
+
+def _name(port, ifindex):
+    """Get the name of a port.
+
+    Args:
+        port: Port data. None if the port doesn't exist
+        ifindex: ifIndex of the port
+
+    Returns:
+        name: ifName, or ifDescr, or ifIndex of the port. None if the port
+            doesn't exist
+
+    """
+    # Initialize key variables
+    name = None
+
+    # Return
+    if port is not None:
+        name = port.get('ifName', port.get('ifDescr', ifindex))
+    return name
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""Fleet-wide index of the topology data of devices.
+
+The index answers questions such as "which port is MAC X on" and "which
+MAC address has IP Y" without reading the topology file of every device.
+
+It is kept in memory and updated incrementally. Before each lookup, the
+devices whose topology files were added, changed or removed since the
+previous lookup are reindexed. The files of other devices aren't read.
+
+"""
+
+# Standard libraries
+import re
+import threading
+
+# Infoset imports
+from infoset.utils import log
+from infoset.topology import store
+from infoset.topology.translator import Translator
+
+# Characters that aren't part of a MAC address
+_NOT_HEX = re.compile('[^0-9a-f]')
+
+
+class _Index(object):
+    """Class for the data of the fleet-wide index.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        update:
+        remove:
+
+    """
+
+    def __init__(self):
+        """Method initializing the class.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.lock = threading.Lock()
+
+        # Versions and entries of the indexed devices keyed by hostname
+        self.versions = {}
+        self.records = {}
+
+        # Lookup tables. Entries are keyed by address, then by hostname
+        self.macs = {}
+        self.ips = {}
+
+        # Neighbors keyed by hostname
+        self.neighbors = {}
+
+    def update(self, host, version, records):
+        """Replace the entries of a device.
+
+        Args:
+            host: Hostname
+            version: Version of the device's topology data
+            records: Dict of the device's entries from _records()
+
+        Returns:
+            None
+
+        """
+        # Remove the previous entries
+        self.remove(host)
+
+        # Add the new ones
+        for table, key in [(self.macs, 'macs'), (self.ips, 'ips')]:
+            for address, value in records[key].items():
+                if address not in table:
+                    table[address] = {}
+                table[address][host] = value
+        self.neighbors[host] = records['neighbors']
+        self.versions[host] = version
+        self.records[host] = records
+
+    def remove(self, host):
+        """Remove the entries of a device.
+
+        Args:
+            host: Hostname
+
+        Returns:
+            None
+
+        """
+        # Nothing to do if the device isn't indexed
+        if host not in self.versions:
+            return
+
+        # Remove entries
+        records = self.records.pop(host)
+        for table, key in [(self.macs, 'macs'), (self.ips, 'ips')]:
+            for address in records[key].keys():
+                entries = table[address]
+                del entries[host]
+                if bool(entries) is False:
+                    del table[address]
+        del self.neighbors[host]
+        del self.versions[host]
+
+
+# The index of this process
+_INDEX = _Index()
+
+
+def mac(config, macaddress):
+    """Find the ports on which a MAC address was learned.
+
+    Ports that aren't trunks and have no neighbors are listed first. They
+    are most likely the ports the MAC address is connected to.
+
+    Args:
+        config: Configuration object
+        macaddress: MAC address in any common notation
+
+    Returns:
+        locations: List of dicts with the hostname, ifIndex, ifName,
+            VLAN and trunk status of each port, and whether it has
+            neighbors
+
+    """
+    # Initialize key variables
+    locations = []
+    address = normalize_mac(macaddress)
+
+    # Find the ports
+    if address is not None:
+        with _INDEX.lock:
+            _refresh(config)
+            locations = _locations(address)
+
+    # Return
+    return locations
+
+
+def ip(config, ipaddress):
+    """Find the MAC addresses of an IP address and where they were learned.
+
+    Args:
+        config: Configuration object
+        ipaddress: IPv4 or IPv6 address
+
+    Returns:
+        result: Dict keyed by MAC address. Values are dicts with the
+            hostnames of the devices whose ARP tables have the entry, and
+            the locations of the MAC address as returned by mac()
+
+    """
+    # Initialize key variables
+    result = {}
+    address = ipaddress.strip().lower()
+
+    # Find the MAC addresses and where they were learned
+    with _INDEX.lock:
+        _refresh(config)
+        for host, macaddress in sorted(_INDEX.ips.get(address, {}).items()):
+            if macaddress not in result:
+                result[macaddress] = {
+                    'hosts': [], 'locations': _locations(macaddress)}
+            result[macaddress]['hosts'].append(host)
+
+    # Return
+    return result
+
+
+def neighbors(config, host=None):
+    """Get the neighbor graph of the devices.
+
+    Args:
+        config: Configuration object
+        host: Hostname. The neighbors of all devices are returned if None
+
+    Returns:
+        graph: Dict of lists of neighbors keyed by hostname. Neighbors are
+            dicts with the ifIndex and ifName of the local port, the
+            protocol, and the name and port of the neighbor
+
+    """
+    # Initialize key variables
+    graph = {}
+
+    # Get neighbors
+    with _INDEX.lock:
+        _refresh(config)
+        for hostname, value in _INDEX.neighbors.items():
+            if host is None or host == hostname:
+                graph[hostname] = list(value)
+
+    # Return
+    return graph
+
+
+def clear():
+    """Empty the index. Devices are indexed again by the next lookup.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Remove all devices
+    with _INDEX.lock:
+        for host in list(_INDEX.versions.keys()):
+            _INDEX.remove(host)
+
+
+def normalize_mac(macaddress):
+    """Convert a MAC address to the notation of the topology files.
+
+    Args:
+        macaddress: MAC address such as 00:1A:2B:3C:4D:5E or 001a.2b3c.4d5e
+
+    Returns:
+        address: Lower case hex string. None if not a MAC address
+
+    """
+    # Initialize key variables
+    address = _NOT_HEX.sub('', macaddress.lower())
+
+    # Return
+    if len(address) != 12:
+        address = None
+    return address
+
+
+def _refresh(config):
+    """Reindex devices whose topology data changed. _INDEX.lock must be held.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    hosts = store.hostnames(config)
+
+    # Remove devices that are no longer in the store
+    for host in list(_INDEX.versions.keys()):
+        if host not in hosts:
+            _INDEX.remove(host)
+
+    # Reindex devices with new data
+    for host in sorted(hosts.keys()):
+        version = store.Device(config, host).version()
+        if version is None:
+            _INDEX.remove(host)
+            continue
+        if _INDEX.versions.get(host) == version:
+            continue
+
+        # Read the data. Incomplete data is indexed without entries so
+        # that it isn't read again until it changes
+        try:
+            records = _records(Translator(config, host), host)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            log_message = (
+                'Topology file for host %s is incomplete. '
+                'It won\'t be indexed.') % (host)
+            log.log2warn(1119, log_message)
+            records = {'macs': {}, 'ips': {}, 'neighbors': []}
+        _INDEX.update(host, version, records)
+
+
+def _locations(address):
+    """Get the ports on which a MAC address was learned.
+
+    _INDEX.lock must be held.
+
+    Args:
+        address: MAC address in the notation of the topology files
+
+    Returns:
+        locations: List of locations sorted as described in mac()
+
+    """
+    # Initialize key variables
+    locations = []
+
+    # Find the ports
+    for ports in _INDEX.macs.get(address, {}).values():
+        locations.extend(ports)
+
+    # Return
+    locations.sort(key=lambda item: (
+        item['trunk'] is True or item['neighbor'] is True,
+        item['host'], item['ifindex']))
+    return locations
+
+
+def _records(translation, host):
+    """Get the index entries of a device.
+
+    Args:
+        translation: Translator object of the device
+        host: Hostname
+
+    Returns:
+        records: Dict of MAC address locations keyed by MAC address, MAC
+            addresses keyed by IP address and a list of neighbors
+
+    """
+    # Initialize key variables
+    records = {'macs': {}, 'ips': {}, 'neighbors': []}
+
+    # Process ports
+    for ifindex, metadata in sorted(translation.ethernet_data().items()):
+        ifname = metadata.get('ifName')
+
+        # Get neighbors
+        found = False
+        if 'lldpRemSysName' in metadata:
+            found = True
+            records['neighbors'].append({
+                'ifindex': ifindex,
+                'ifName': ifname,
+                'protocol': 'lldp',
+                'neighbor': metadata['lldpRemSysName'],
+                'port': metadata.get('lldpRemPortDesc')})
+        if 'cdpCacheDeviceId' in metadata:
+            found = True
+            records['neighbors'].append({
+                'ifindex': ifindex,
+                'ifName': ifname,
+                'protocol': 'cdp',
+                'neighbor': metadata['cdpCacheDeviceId'],
+                'port': metadata.get('cdpCacheDevicePort')})
+
+        # Get MAC addresses. There is a location for each VLAN the MAC
+        # address was learned on
+        macvlans = metadata.get('jm_macvlans', {})
+        for macaddress in metadata.get('jm_macs', []):
+            if macaddress not in records['macs']:
+                records['macs'][macaddress] = []
+            vlans = macvlans.get(macaddress)
+            if bool(vlans) is False:
+                vlans = [_vlan(metadata)]
+            for vlan in vlans:
+                records['macs'][macaddress].append({
+                    'host': host,
+                    'ifindex': ifindex,
+                    'ifName': ifname,
+                    'vlan': vlan,
+                    'trunk': metadata.get('jm_trunk') is True,
+                    'neighbor': found})
+
+    # Process ARP entries
+    for ipaddress, macaddress in translation.arp_data().items():
+        records['ips'][str(ipaddress).lower()] = macaddress
+
+    # Return
+    return records
+
+
+def _vlan(metadata):
+    """Get the VLAN of MAC addresses learned on a port when it isn't known.
+
+    Args:
+        metadata: Translated data of the port
+
+    Returns:
+        vlan: The port's VLAN if it has only one, else its native VLAN
+
+    """
+    # Initialize key variables
+    vlans = metadata.get('jm_vlan')
+
+    # Return
+    if isinstance(vlans, list) is True and len(vlans) == 1:
+        vlan = vlans[0]
+    else:
+        vlan = metadata.get('jm_nativevlan')
+    return vlan
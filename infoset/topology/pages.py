@@ -1,14 +1,18 @@
 #!usr/bin/env python3
 """Class for creating device web pages."""
 
-import tempfile
 import textwrap
-import os
+import threading
 
 # Import infoset libraries
 from infoset.utils import log
-from infoset.utils import jm_general
-from infoset.topology import Translator
+from infoset.topology import translate
+from infoset.topology import store
+
+# Pages keyed by hostname. Values are (version of the host's topology
+# data, HTML) tuples
+_HTML = {}
+_HTML_LOCK = threading.Lock()
 
 
 class HTMLTable(object):
@@ -31,8 +35,8 @@ class HTMLTable(object):
             None
 
         """
-        # Process YAML file for host
-        translation = Translator(config, host)
+        # Process topology file for host
+        translation = translate(config, host)
         self.ports = translation.ethernet_data()
         self.summary = translation.system_summary()
 
@@ -74,51 +78,59 @@ class HTMLTable(object):
 def create(config, host):
     """Create topology page for host.
 
+    Pages are reused until the host's topology file changes.
+
     Args:
         config: Configuration object
         host: Hostname to create pages for
 
     Returns:
-        None
+        html: HTML string. None if there is no topology file for the host
 
     """
-    # Initialize key variables
-    device_file_found = False
-
-    # Create directory if needed
-    temp_dir = tempfile.mkdtemp()
-
-    # Delete all files in temporary directory
-    jm_general.delete_files(temp_dir)
-
-    # Skip if device file not found
-    if os.path.isfile(config.topology_device_file(host)) is False:
+    # Skip if device file not found. Pages of deleted hosts are discarded
+    version = store.Device(config, host).version()
+    if version is None:
+        with _HTML_LOCK:
+            _HTML.pop(host, None)
         log_message = (
-            'No YAML device file for host %s found in %s. '
+            'No topology file for host %s found in %s. '
             'topoloy agent has not discovered it yet.'
             '') % (host, config.topology_directory())
         log.log2quiet(1018, log_message)
-    else:
-        device_file_found = True
-
-    ####################################################################
-    #
-    # Define variables that will be required for the database update
-    # We have to initialize the dict during every loop to prevent
-    # data corruption
-    #
-    ####################################################################
-    table = HTMLTable(config, host)
+        return None
+
+    # Use the cached page if the file hasn't changed
+    with _HTML_LOCK:
+        cached = _HTML.get(host)
+    if cached is not None and cached[0] == version:
+        return cached[1]
 
     # Create HTML output
+    table = HTMLTable(config, host)
     html = ('%s%s\n%s\n\n%s\n') % (
         _html_header(host), host, table.device(),
         table.ethernet())
 
-    # Do the rest if device_file_found
-    if device_file_found is True:
-        # Wait on the queue until everything has been processed
-        return html
+    # Update the cache and return
+    with _HTML_LOCK:
+        _HTML[host] = (version, html)
+    return html
+
+
+def clear():
+    """Discard all cached pages.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Clear
+    with _HTML_LOCK:
+        _HTML.clear()
 
 
 def _port_enabled(port_data):
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Store of the topology data of devices.
+
+The data of each device is saved as a JSON file in the topology
+directory. JSON is parsed many times faster than YAML, which matters for
+the large files of big chassis. Files are replaced atomically as the web
+server may read them while the topology agent writes them.
+
+An index of the devices in the store is kept in the same directory so
+that devices can be listed without reading their files.
+
+YAML files written by earlier versions are still read if there is no
+JSON file for a device.
+
+"""
+
+# Standard libraries
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+
+# pip libraries
+import yaml
+
+# Infoset libraries
+from infoset.utils import log
+
+# Use the fast LibYAML parser when it is available
+try:
+    _YAML_LOADER = yaml.CSafeLoader
+except AttributeError:
+    _YAML_LOADER = yaml.SafeLoader
+
+# Name of the index file, and of the file locked while it is updated
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+
+# Serializes updates of the index by threads of the same process. The lock
+# file serializes updates by different processes
+_INDEX_LOCK = threading.Lock()
+
+
+class Device(object):
+    """Class for the topology data of a device.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        exists:
+        filename:
+        version:
+        read:
+        write:
+        delete:
+    """
+
+    def __init__(self, config, hostname):
+        """Method initializing the class.
+
+        Args:
+            config: Configuration object
+            hostname: Hostname
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.hostname = hostname
+        self.directory = config.topology_directory()
+        self.json_file = config.topology_device_file(hostname)
+        self.yaml_file = ('%s/%s.yaml') % (self.directory, hostname)
+
+    def exists(self):
+        """Determine whether there is data for the device.
+
+        Args:
+            None
+
+        Returns:
+            found: True if found
+
+        """
+        # Return
+        found = self.filename() is not None
+        return found
+
+    def filename(self):
+        """Get the name of the file with the device's data.
+
+        Args:
+            None
+
+        Returns:
+            value: Filename. None if there is no file
+
+        """
+        # Initialize key variables
+        value = None
+
+        # Prefer JSON files
+        for filename in [self.json_file, self.yaml_file]:
+            if os.path.isfile(filename) is True:
+                value = filename
+                break
+
+        # Return
+        return value
+
+    def version(self):
+        """Get the version of the device's data.
+
+        The version changes whenever the data is written. It is used to
+        know when data derived from the device's data must be refreshed.
+
+        Args:
+            None
+
+        Returns:
+            value: (filename, modification time) tuple. None if there is
+                no data
+
+        """
+        # Initialize key variables
+        value = None
+
+        # Get the version
+        filename = self.filename()
+        if filename is not None:
+            try:
+                value = (filename, os.stat(filename).st_mtime_ns)
+            except OSError:
+                pass
+
+        # Return
+        return value
+
+    def read(self):
+        """Read the device's data.
+
+        Args:
+            None
+
+        Returns:
+            data: Dict of data
+
+        """
+        # Fail if there is no data
+        filename = self.filename()
+        if filename is None:
+            log_message = (
+                'Topology file for host %s doesn\'t exist in %s! '
+                'Try polling devices first.') % (
+                    self.hostname, self.directory)
+            log.log2die(1017, log_message)
+
+        # Read file
+        with open(filename, 'r') as file_handle:
+            if filename == self.json_file:
+                data = json.load(file_handle)
+            else:
+                data = yaml.load(file_handle, Loader=_YAML_LOADER)
+
+        # Return
+        return data
+
+    def write(self, data):
+        """Save the device's data and add the device to the index.
+
+        Args:
+            data: Dict of data. Keys are saved as strings
+
+        Returns:
+            None
+
+        """
+        # Write
+        _write(self.directory, self.json_file, data)
+
+        # Update the index
+        _update_index(self.directory, self.hostname, {
+            'filename': os.path.basename(self.json_file),
+            'timestamp': int(time.time())})
+
+    def delete(self):
+        """Delete the device's data and remove the device from the index.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Delete files
+        for filename in [self.json_file, self.yaml_file]:
+            if os.path.isfile(filename) is True:
+                os.remove(filename)
+
+        # Update the index
+        _update_index(self.directory, self.hostname, None)
+
+
+def hostnames(config):
+    """Get the hostnames of the devices in the store.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        hosts: Dict of device filenames keyed by hostname
+
+    """
+    # Initialize key variables
+    hosts = {}
+    directory = config.topology_directory()
+
+    # Read the index
+    with _INDEX_LOCK:
+        index = _index(directory)
+    for hostname, entry in index.items():
+        hosts[hostname] = ('%s/%s') % (directory, entry['filename'])
+
+    # Return
+    return hosts
+
+
+def _index(directory):
+    """Read the index of a topology directory. _INDEX_LOCK must be held.
+
+    The index is built from the files in the directory if it doesn't
+    exist.
+
+    Args:
+        directory: Topology directory
+
+    Returns:
+        index: Dict of index entries keyed by hostname
+
+    """
+    # Initialize key variables
+    index = {}
+    filename = _index_file(directory)
+
+    # Read the index
+    if os.path.isfile(filename) is True:
+        with open(filename, 'r') as file_handle:
+            try:
+                index = json.load(file_handle)
+            except ValueError:
+                index = None
+        if isinstance(index, dict) is True:
+            return index
+        index = {}
+
+    # Build it from the device files. JSON files take precedence
+    if os.path.isdir(directory) is True:
+        for extension in ['.yaml', '.json']:
+            for device_file in sorted(os.listdir(directory)):
+                if device_file == INDEX_FILE:
+                    continue
+                if device_file.endswith(extension) is False:
+                    continue
+                index[device_file[:-len(extension)]] = {
+                    'filename': device_file,
+                    'timestamp': int(os.path.getmtime(
+                        os.path.join(directory, device_file)))}
+
+    # Return
+    return index
+
+
+def _update_index(directory, hostname, entry):
+    """Update the index entry of a device.
+
+    Args:
+        directory: Topology directory
+        hostname: Hostname
+        entry: Index entry. The device is removed from the index if None
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    lock_file = ('%s/%s') % (directory, LOCK_FILE)
+
+    # Update
+    with _INDEX_LOCK, open(lock_file, 'a') as lock_handle:
+        fcntl.flock(lock_handle, fcntl.LOCK_EX)
+        index = _index(directory)
+        if entry is None:
+            index.pop(hostname, None)
+        else:
+            index[hostname] = entry
+        _write(directory, _index_file(directory), index)
+
+
+def _index_file(directory):
+    """Get the name of the index file of a topology directory.
+
+    Args:
+        directory: Topology directory
+
+    Returns:
+        value: Filename
+
+    """
+    # Return
+    value = ('%s/%s') % (directory, INDEX_FILE)
+    return value
+
+
+def _write(directory, filename, data):
+    """Write data to a JSON file atomically.
+
+    Args:
+        directory: Directory of the file
+        filename: Filename
+        data: Data
+
+    Returns:
+        None
+
+    """
+    # Write to a temporary file first
+    (file_descriptor, temp_file) = tempfile.mkstemp(dir=directory)
+    with os.fdopen(file_descriptor, 'w') as file_handle:
+        json.dump(data, file_handle, separators=(',', ':'))
+    os.chmod(temp_file, 0o644)
+    os.replace(temp_file, filename)
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
-"""Class for normalizing the data read from YAML files."""
-
-import os
-import yaml
+"""Class for normalizing the data read from topology files."""
 
+# Standard libraries
+import threading
 
 # Infoset imports
-from infoset.utils import log
+from infoset.topology import store
+
+# Translations of device data keyed by (hostname, ifindices). Values are
+# (version of the device's data, Translator) tuples
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
 
 
 class Translator(object):
@@ -104,19 +108,9 @@ class Translator(object):
         """
         # Initialize key variables
         self.ports = {}
-        yaml_file = config.topology_device_file(host)
 
-        # Fail if yaml file doesn't exist
-        if os.path.isfile(yaml_file) is False:
-            log_message = (
-                'YAML file %s for host %s doesn\'t exist! '
-                'Try polling devices first.') % (yaml_file, host)
-            log.log2die(1017, log_message)
-
-        # Read file
-        with open(yaml_file, 'r') as file_handle:
-            yaml_from_file = file_handle.read()
-        yaml_data = yaml.load(yaml_from_file)
+        # Read the device's data. Fails if the device hasn't been polled
+        yaml_data = store.Device(config, host).read()
 
         # Create dict for layer1 Ethernet data
         for ifindex, metadata in yaml_data['layer1'].items():
@@ -194,6 +188,14 @@ class Translator(object):
         # Get system
         self.system = yaml_data['system']
 
+        # Get the ARP tables. Layer 3 data is None if no MIB provided it
+        self.arp = {}
+        layer3 = yaml_data.get('layer3') or {}
+        for key in ['ipNetToMediaTable', 'ipNetToPhysicalPhysAddress',
+                    'ipv6NetToMediaPhysAddress']:
+            if bool(layer3.get(key)) is True:
+                self.arp.update(layer3[key])
+
     def system_summary(self):
         """Return system summary data.
 
@@ -227,6 +229,73 @@ class Translator(object):
         """
         return self.ports
 
+    def arp_data(self):
+        """Return the ARP tables of the device.
+
+        Args:
+            None
+
+        Returns:
+            self.arp: Dict of MAC addresses keyed by IPv4 and IPv6 address
+
+        """
+        return self.arp
+
+
+def translate(config, host, ifindices=None):
+    """Get the translation of a host's topology data.
+
+    Translations are reused until the host's topology file changes. They
+    must not be modified.
+
+    Args:
+        config: Configuration file object
+        host: Hostname to process
+        ifindices: List of ifindices to process
+
+    Returns:
+        translation: Translator object
+
+    """
+    # Initialize key variables
+    key = (host, None if ifindices is None else tuple(sorted(ifindices)))
+
+    # The version is read first. A file written while it is translated is
+    # translated again next time
+    version = store.Device(config, host).version()
+    with _CACHE_LOCK:
+        # Discard the translations of hosts whose data was deleted
+        if version is None:
+            for item in [item for item in _CACHE if item[0] == host]:
+                del _CACHE[item]
+        cached = _CACHE.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # Translate
+    translation = Translator(config, host, ifindices=ifindices)
+    if version is not None:
+        with _CACHE_LOCK:
+            _CACHE[key] = (version, translation)
+
+    # Return
+    return translation
+
+
+def clear():
+    """Discard all cached translations.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Clear
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
 
 def _is_ethernet(metadata):
     """Return whether ifIndex metadata belongs to an Ethernet port.
@@ -52,6 +52,20 @@ class Directory:
         value = ('%s/snmp_cache') % self.root
         return value
 
+    def snmp_health(self):
+        """Method for defining the hidden snmp_health directory.
+
+        Args:
+            None
+
+        Returns:
+            value: snmp_health directory
+
+        """
+        # Return
+        value = ('%s/snmp_health') % self.root
+        return value
+
     def pid(self):
         """Method for defining the hidden pid directory.
 
@@ -127,6 +141,21 @@ class File:
         value = ('%s/%s.yaml') % (self.directory.snmp_cache(), prefix)
         return value
 
+    def snmp_health(self, prefix):
+        """Method for defining the hidden snmp_health file.
+
+        Args:
+            prefix: Prefix of file
+
+        Returns:
+            value: snmp_health file
+
+        """
+        # Return
+        _mkdir(self.directory.snmp_health())
+        value = ('%s/%s.yaml') % (self.directory.snmp_health(), prefix)
+        return value
+
     def pid(self, prefix):
         """Method for defining the hidden pid directory.
 
@@ -170,7 +170,44 @@ class Config(object):
 
         """
         # Get parameter
-        value = ('%s/%s.yaml') % (self.topology_directory(), host)
+        value = ('%s/%s.json') % (self.topology_directory(), host)
+
+        # Return
+        return value
+
+    def topology_changes_directory(self):
+        """Determine the topology_changes_directory.
+
+        Args:
+            None
+
+        Returns:
+            value: configured topology_changes_directory
+
+        """
+        # Get parameter
+        value = ('%s/topology_changes') % (self.data_directory())
+
+        # Create directory if neccessary
+        if (os.path.isdir(self.data_directory()) is True) and (
+                os.path.isdir(value) is False):
+            os.mkdir(value)
+
+        # Return
+        return value
+
+    def topology_changes_file(self, host):
+        """Determine the topology_changes_file.
+
+        Args:
+            host: Hostname
+
+        Returns:
+            value: configured topology_changes_file
+
+        """
+        # Get parameter
+        value = ('%s/%s.log') % (self.topology_changes_directory(), host)
 
         # Return
         return value
@@ -342,6 +379,146 @@ class Config(object):
             result = 20
         return result
 
+    def snmp_max_requests(self):
+        """Get snmp_max_requests.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'snmp_max_requests'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 10000
+        if result is None:
+            result = 10000
+        return int(result)
+
+    def snmp_max_host_requests(self):
+        """Get snmp_max_host_requests.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'snmp_max_host_requests'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 4
+        if result is None:
+            result = 4
+        return int(result)
+
+    def snmp_cache_ttl(self):
+        """Get snmp_cache_ttl.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'snmp_cache_ttl'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 86400
+        if result is None:
+            result = 86400
+        return int(result)
+
+    def snmp_timeout(self):
+        """Get snmp_timeout.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'snmp_timeout'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 5
+        if result is None:
+            result = 5
+        return float(result)
+
+    def snmp_retries(self):
+        """Get snmp_retries.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'snmp_retries'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 2
+        if result is None:
+            result = 2
+        return int(result)
+
+    def snmp_breaker_failures(self):
+        """Get snmp_breaker_failures.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'snmp_breaker_failures'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 3
+        if result is None:
+            result = 3
+        return int(result)
+
+    def snmp_breaker_backoff(self):
+        """Get snmp_breaker_backoff.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'server'
+        sub_key = 'snmp_breaker_backoff'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 300
+        if result is None:
+            result = 300
+        return int(result)
+
     def log_file(self):
         """Get log_file.
 
@@ -672,6 +849,272 @@ class ConfigAgent(object):
         # Return
         return result
 
+    def web_debug(self):
+        """Get web_debug.
+
+        Args:
+            None
+
+        Returns:
+            result: True if the development web server should be used
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result
+        if 'web_debug' in agent_config:
+            result = bool(agent_config['web_debug'])
+        else:
+            result = False
+
+        # Return
+        return result
+
+    def web_workers(self):
+        """Get web_workers.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of web server worker processes
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result. Default to (2 x CPUs) + 1
+        if 'web_workers' in agent_config:
+            result = int(agent_config['web_workers'])
+        else:
+            result = (os.cpu_count() or 1) * 2 + 1
+
+        # Return
+        return result
+
+    def web_threads(self):
+        """Get web_threads.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of threads per web server worker process
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result
+        if 'web_threads' in agent_config:
+            result = int(agent_config['web_threads'])
+        else:
+            result = 4
+
+        # Return
+        return result
+
+    def web_keepalive(self):
+        """Get web_keepalive.
+
+        Args:
+            None
+
+        Returns:
+            result: Seconds to wait for requests on a keep-alive connection
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result
+        if 'web_keepalive' in agent_config:
+            result = int(agent_config['web_keepalive'])
+        else:
+            result = 5
+
+        # Return
+        return result
+
+    def web_timeout(self):
+        """Get web_timeout.
+
+        Args:
+            None
+
+        Returns:
+            result: Seconds before a silent worker is killed and restarted
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result
+        if 'web_timeout' in agent_config:
+            result = int(agent_config['web_timeout'])
+        else:
+            result = 30
+
+        # Return
+        return result
+
+    def agent_interval(self):
+        """Get agent_interval.
+
+        Args:
+            None
+
+        Returns:
+            result: Seconds between polls of each host
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result. Default to 300
+        if 'agent_interval' in agent_config:
+            result = int(agent_config['agent_interval'])
+        else:
+            result = 300
+
+        # Return
+        return result
+
+    def agent_host_intervals(self):
+        """Get agent_host_intervals.
+
+        Args:
+            None
+
+        Returns:
+            result: Dict of seconds between polls keyed by hostname
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result
+        result = {}
+        if bool(agent_config.get('agent_host_intervals')) is True:
+            for key, value in agent_config['agent_host_intervals'].items():
+                result[key] = int(value)
+
+        # Return
+        return result
+
+    def agent_label_intervals(self):
+        """Get agent_label_intervals.
+
+        Args:
+            None
+
+        Returns:
+            result: Dict of seconds between polls keyed by agent label
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result
+        result = {}
+        if bool(agent_config.get('agent_label_intervals')) is True:
+            for key, value in agent_config['agent_label_intervals'].items():
+                result[key] = int(value)
+
+        # Return
+        return result
+
+    def agent_spread(self):
+        """Get agent_spread.
+
+        Args:
+            None
+
+        Returns:
+            result: Fraction of each interval over which polls are spread
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result. Default to 0.5
+        if 'agent_spread' in agent_config:
+            result = float(agent_config['agent_spread'])
+        else:
+            result = 0.5
+
+        # Return
+        return result
+
+    def agent_incremental(self):
+        """Get agent_incremental.
+
+        Args:
+            None
+
+        Returns:
+            result: True if only data that may have changed is polled
+                between full polls
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result
+        if 'agent_incremental' in agent_config:
+            result = bool(agent_config['agent_incremental'])
+        else:
+            result = False
+
+        # Return
+        return result
+
+    def agent_full_interval(self):
+        """Get agent_full_interval.
+
+        Args:
+            None
+
+        Returns:
+            result: Seconds between full polls of each host
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result. Default to 3600
+        if 'agent_full_interval' in agent_config:
+            result = int(agent_config['agent_full_interval'])
+        else:
+            result = 3600
+
+        # Return
+        return result
+
+    def agent_processes(self):
+        """Get agent_processes.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of worker processes the agent's hosts are
+                shared between
+
+        """
+        # Get config
+        agent_config = _agent_config(self.agent_name(), self.config_dict)
+
+        # Get result. Default to 1
+        if 'agent_processes' in agent_config:
+            result = max(1, int(agent_config['agent_processes']))
+        else:
+            result = 1
+
+        # Return
+        return result
+
     def agent_metadata(self):
         """Get agent_metadata.
 
@@ -754,6 +1197,7 @@ class ConfigSNMP(object):
         seed_dict['snmp_privprotocol'] = None
         seed_dict['snmp_privpassword'] = None
         seed_dict['snmp_port'] = 161
+        seed_dict['snmp_max_repetitions'] = 25
         seed_dict['group_name'] = None
 
         # Read configuration's SNMP information. Return 'None' if none found
@@ -782,6 +1226,11 @@ class ConfigSNMP(object):
             # Convert relevant strings to integers
             new_dict['snmp_version'] = int(new_dict['snmp_version'])
             new_dict['snmp_port'] = int(new_dict['snmp_port'])
+            if new_dict['snmp_max_repetitions'] is None:
+                new_dict['snmp_max_repetitions'] = seed_dict[
+                    'snmp_max_repetitions']
+            new_dict['snmp_max_repetitions'] = int(
+                new_dict['snmp_max_repetitions'])
 
             # Append data to list
             snmp_data.append(new_dict)
@@ -7,13 +7,20 @@ Contains all routes that infoset's Flask webserver uses
 from datetime import datetime
 import time
 import json
+import gzip
+import zlib
 import operator
-from os import path
-from os import walk
 
 # Pip imports
-import yaml
-from flask import render_template, jsonify, request
+from flask import render_template, jsonify, request, stream_with_context
+from flask import abort
+from werkzeug.http import is_resource_modified, quote_etag
+
+# Brotli is optional. Fall back to gzip when it is not installed.
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Infoset imports
 from infoset.db.db_agent import GetUID
@@ -30,16 +37,69 @@ from infoset.metadata import language
 from infoset.db import db_datapoint
 from infoset.db import db_agent
 from infoset.db import db_host
+from infoset.topology import changes
+from infoset.topology import fleet
 from infoset.topology import pages
+from infoset.topology import store
 from www import infoset
 
 
+# Responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 500
+
+# Datapoints read from the database per query when streaming listings
+DATAPOINT_BATCH_SIZE = 1000
+
+# Largest page of datapoints a client may request
+DATAPOINT_PAGE_LIMIT = 10000
+
+
 @infoset.template_filter('strftime')
 def _jinja2_filter_datetime(timestamp):
     timestamp = time.strftime('%H:%M (%d-%m-%Y) ', time.localtime(timestamp))
     return timestamp
 
 
+@infoset.after_request
+def _compress(response):
+    """Compress /fetch/* responses if the client supports it.
+
+    Args:
+        response: Flask response object
+
+    Returns:
+        response: Flask response object, compressed where possible
+
+    """
+    # Only compress successful /fetch/* responses that aren't encoded yet
+    if request.path.startswith('/fetch/') is False:
+        return response
+    if response.status_code != 200 or response.direct_passthrough is True:
+        return response
+    if response.is_streamed is True:
+        return response
+    if 'Content-Encoding' in response.headers:
+        return response
+
+    # Compression is pointless for small payloads
+    data = response.get_data()
+    response.vary.add('Accept-Encoding')
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    # Prefer brotli, then gzip
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        response.set_data(brotli.compress(data))
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+
+    # Return
+    return response
+
+
 @infoset.route('/')
 def index():
     """Function for handling home route.
@@ -137,28 +197,14 @@ def search():
     # Initialize key variables
     data = []
 
-    # Get list of all host indices
-    host_idx_list = db_hostagent.all_host_indices()
-
-    for idx_host in host_idx_list:
-        # Get names for host
-        hostname = db_host.GetIDX(idx_host).hostname()
-
-        # Create list of enabled agents
-        all_agent_indices = db_hostagent.agent_indices(idx_host)
-        enabled_agent_idx_list = []
-        for idx_agent in all_agent_indices:
-            enabled = db_agent.GetIDX(idx_agent).enabled()
-            if enabled is True:
-                enabled_agent_idx_list.append(idx_agent)
-
-        # Append agent data to list
-        for idx_agent in enabled_agent_idx_list:
-            agent_name = db_agent.GetIDX(idx_agent).name()
-            # Append to data
-            data.append(
-                (hostname, idx_host, agent_name, idx_agent)
-            )
+    # Get all hosts and their enabled agents in one query
+    listing = db_hostagent.enabled_host_agents()
+    for item in listing:
+        # Append to data
+        data.append(
+            (item['hostname'], item['idx_host'],
+             item['agent_name'], item['idx_agent'])
+        )
 
     # Render data on screen
     return render_template('search.html', agent_list=data)
@@ -186,11 +232,15 @@ def search_host(idx_host, idx_agent):
     agent_name = db_agent.GetIDX(idx_agent).name()
     uid = db_agent.GetIDX(idx_agent).uid()
 
-    # Get a description of the datapoint
-    lang = language.Agent(agent_name)
-
     # Get datapoints charting host metrics
     metadata = db_datapoint.datapoint_host_agent(idx_host, idx_agent)
+
+    # Get descriptions of all the datapoints at once
+    config = infoset.config['GLOBAL_CONFIG']
+    lang = language.Agent(agent_name, lang=config.language())
+    descriptions = lang.label_descriptions(
+        [data_dict['agent_label'] for data_dict in metadata])
+
     for data_dict in metadata:
         # Create datapoint object
         idx_datapoint = data_dict['idx']
@@ -201,7 +251,7 @@ def search_host(idx_host, idx_agent):
         final_description = ''
 
         # Get a description of the datapoint
-        label_description = lang.label_description(agent_label)
+        label_description = descriptions[agent_label]
         if bool(label_description) is True:
             final_description = label_description
         else:
@@ -238,7 +288,7 @@ def tables(idx_host, idx_agent):
 
     """
     hostname = _infoset_hostname()
-    hosts = _get_yaml_hosts()
+    hosts = _get_topology_hosts()
     return render_template('network-topo.html',
                            hostname=hostname,
                            hosts=hosts)
@@ -255,15 +305,8 @@ def host(host):
         JSON response of different layers of specified host
 
     """
-    filename = host + ".yaml"
-    filepath = path.join("./www/static/yaml/", filename)
-    yaml_dump = {}
-    with open(filepath, 'r') as stream:
-        try:
-            yaml_dump = yaml.load(stream)
-        except Exception as error:
-            raise error
-    return jsonify(yaml_dump)
+    topology = _topology(host)
+    return jsonify(topology)
 
 
 @infoset.route('/hosts/<host>/layer1')
@@ -277,17 +320,7 @@ def layerOne(host):
         JSON response of layer1 of the OSI model of the specified host
 
     """
-    filename = host + ".yaml"
-    filepath = path.join("./www/static/yaml/", filename)
-    yaml_dump = {}
-
-    with open(filepath, 'r') as stream:
-        try:
-            yaml_dump = yaml.load(stream)
-        except Exception as error:
-            raise error
-
-    layer1 = yaml_dump['layer1']
+    layer1 = _topology(host)['layer1']
     return jsonify(layer1)
 
 
@@ -302,18 +335,8 @@ def layerTwo(host):
         JSON response of layer2 of the OSI model of the specified host
 
     """
-    filename = host + ".yaml"
-    filepath = path.join("./www/static/yaml/", filename)
-    yaml_dump = {}
-
-    with open(filepath, 'r') as stream:
-        try:
-            yaml_dump = yaml.load(stream)
-        except Exception as error:
-            raise error
-
-    # Gets layer2 from loaded yaml
-    layer2 = yaml_dump['layer2']
+    # Gets layer2 from the topology data
+    layer2 = _topology(host)['layer2']
 
     return jsonify(layer2)
 
@@ -335,7 +358,8 @@ def graphs(idx_agent, idx_datapoint):
     uid = db_agent.GetIDX(idx_agent).uid()
 
     # Get a description of the datapoint
-    lang = language.Agent(agent_name)
+    config = infoset.config['GLOBAL_CONFIG']
+    lang = language.Agent(agent_name, lang=config.language())
 
     single_datapoint = db_datapoint.GetIDX(idx_datapoint)
     agent_label = single_datapoint.agent_label()
@@ -394,16 +418,44 @@ def fetch_agent_dp(uid):
         uid: Unique Identifier of an Infoset Agent
 
     Returns:
-        JSON response of all datapoints
+        JSON response of all datapoints. If the "limit" query parameter is
+        set, only that many datapoints with an idx greater than the "cursor"
+        query parameter are returned and the X-Next-Cursor header holds the
+        cursor for the next page
 
     """
     # Fetches agent from mysql by uid
     agent = GetUID(uid)
     idx = agent.idx()
 
-    # Gets all datapoints associated with agent
-    datapoints = GetDataPoint(idx)
-    return jsonify(datapoints.everything())
+    # Nothing new has been received from the agent since the last request
+    last_timestamp = agent.last_timestamp()
+    not_modified = _not_modified(last_timestamp)
+    if not_modified is not None:
+        return not_modified
+
+    # Get pagination parameters. The cursor is the idx of the last
+    # datapoint received by the client
+    cursor = request.args.get('cursor', default=0, type=int)
+    limit = request.args.get('limit', default=None, type=int)
+
+    # Gets datapoints associated with agent
+    next_cursor = None
+    if limit is None:
+        rows = _agent_datapoints(idx, cursor=cursor)
+    else:
+        # Get one more row than required to see if another page exists
+        limit = min(max(limit, 1), DATAPOINT_PAGE_LIMIT)
+        rows = db_agent.datapoint_summary(idx, cursor=cursor, limit=limit + 1)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1][0]
+
+    # Stream the response
+    response = _stream_json(_datapoints_json(rows))
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return _cacheable(response, last_timestamp)
 
 
 @infoset.route('/fetch/agent/<uid>/<datapoint>', methods=["GET", "POST"])
@@ -417,12 +469,19 @@ def fetch_dp(uid, datapoint):
         JSON response of all data under specific datapoint
 
     """
+    # Nothing new has been received for the datapoint since the last request
+    last_timestamp = db_datapoint.GetIDX(datapoint).last_timestamp()
+    not_modified = _not_modified(last_timestamp, windowed=True)
+    if not_modified is not None:
+        return not_modified
+
     # TODO implement start and stop times
     data = GetIDX(datapoint)
     data_values = data.everything()
 
     # Return
-    return jsonify(data_values)
+    response = jsonify(data_values)
+    return _cacheable(response, last_timestamp, windowed=True)
 
 
 @infoset.route('/fetch/agent/graph/<uid>/<datapoint>', methods=["GET", "POST"])
@@ -441,12 +500,19 @@ def fetch_graph(uid, datapoint):
     start = request.args.get('start')
     stop = request.args.get('stop')
 
+    # Nothing new has been received for the datapoint since the last request
+    last_timestamp = db_datapoint.GetIDX(datapoint).last_timestamp()
+    not_modified = _not_modified(last_timestamp, windowed=True)
+    if not_modified is not None:
+        return not_modified
+
     # Get data as dict
     datapointer = GetIDX(datapoint, start=start, stop=stop)
     data = datapointer.chart_everything()
 
     # Return
-    return jsonify(data)
+    response = jsonify(data)
+    return _cacheable(response, last_timestamp, windowed=True)
 
 
 @infoset.route(
@@ -502,7 +568,14 @@ def fetch_graph_stacked(uid, stack_type):
     ]
 
     # Get Agent data
-    idx_agent = db_agent.GetUID(uid).idx()
+    agent = db_agent.GetUID(uid)
+    idx_agent = agent.idx()
+
+    # Nothing new has been received from the agent since the last request
+    last_timestamp = agent.last_timestamp()
+    not_modified = _not_modified(last_timestamp, windowed=True)
+    if not_modified is not None:
+        return not_modified
 
     # Determine what kind of stacked chart to make
     # Memory, Load, Bytes In/Out, CPU
@@ -532,7 +605,8 @@ def fetch_graph_stacked(uid, stack_type):
         data = get_idx.chart_everything()
         values.extend(data)
 
-    return jsonify(values)
+    response = jsonify(values)
+    return _cacheable(response, last_timestamp, windowed=True)
 
 
 @infoset.route('/fetch/agent/<ip_address>/table', methods=["GET"])
@@ -550,10 +624,292 @@ def fetch_table(ip_address):
     config = infoset.config['GLOBAL_CONFIG']
 
     html = pages.create(config, ip_address)
+    if html is None:
+        abort(404)
 
     return html
 
 
+@infoset.route('/topology/mac/<macaddress>')
+def topology_mac(macaddress):
+    """Find the ports on which a MAC address was learned.
+
+    Args:
+        macaddress: MAC address
+
+    Returns:
+        JSON response of the locations of the MAC address
+
+    """
+    # Return
+    config = infoset.config['GLOBAL_CONFIG']
+    if fleet.normalize_mac(macaddress) is None:
+        abort(400)
+    locations = fleet.mac(config, macaddress)
+    return jsonify(locations)
+
+
+@infoset.route('/topology/ip/<ipaddress>')
+def topology_ip(ipaddress):
+    """Find the MAC addresses of an IP address and where they were learned.
+
+    Args:
+        ipaddress: IPv4 or IPv6 address
+
+    Returns:
+        JSON response of MAC addresses and their locations
+
+    """
+    # Return
+    config = infoset.config['GLOBAL_CONFIG']
+    result = fleet.ip(config, ipaddress)
+    return jsonify(result)
+
+
+@infoset.route('/topology/neighbors')
+@infoset.route('/topology/neighbors/<host>')
+def topology_neighbors(host=None):
+    """Get the neighbor graph of the devices.
+
+    Args:
+        host: Hostname. The neighbors of all devices are returned if None
+
+    Returns:
+        JSON response of neighbors keyed by hostname
+
+    """
+    # Return
+    config = infoset.config['GLOBAL_CONFIG']
+    graph = fleet.neighbors(config, host=host)
+    if host is not None and bool(graph) is False:
+        abort(404)
+    return jsonify(graph)
+
+
+@infoset.route('/topology/changes')
+@infoset.route('/topology/changes/<host>')
+def topology_changes(host=None):
+    """Get the changes to the topology of devices in a time range.
+
+    Args:
+        host: Hostname. The changes to all devices are returned if None
+
+    Returns:
+        JSON response of changes in time order
+
+    """
+    # Getting start and stop parameters from url
+    start = request.args.get('start', default=None, type=int)
+    stop = request.args.get('stop', default=None, type=int)
+
+    # Return
+    config = infoset.config['GLOBAL_CONFIG']
+    result = changes.changes(config, start=start, stop=stop, hostname=host)
+    return jsonify(result)
+
+
+def _agent_datapoints(idx_agent, cursor=0):
+    """Get all datapoint summaries for an agent in batches.
+
+    Args:
+        idx_agent: Agent index
+        cursor: Only return datapoints with an idx greater than this
+
+    Returns:
+        None. Yields (idx, agent_label, uncharted_value) tuples
+
+    """
+    # Read batches until there are no more
+    while True:
+        rows = db_agent.datapoint_summary(
+            idx_agent, cursor=cursor, limit=DATAPOINT_BATCH_SIZE)
+        for row in rows:
+            yield row
+
+        # Prepare for next batch
+        if len(rows) < DATAPOINT_BATCH_SIZE:
+            break
+        cursor = rows[-1][0]
+
+
+def _datapoints_json(rows):
+    """Convert datapoint summaries to JSON fragments.
+
+    The result is a JSON object of [idx, uncharted_value] lists keyed by
+    agent_label, the same format as GetDataPoint.everything().
+
+    Args:
+        rows: Iterable of (idx, agent_label, uncharted_value) tuples
+
+    Returns:
+        None. Yields JSON strings
+
+    """
+    # Initialize key variables
+    separator = ''
+
+    # Create JSON
+    yield '{'
+    for (idx_datapoint, agent_label, uncharted_value) in rows:
+        yield ('%s%s: %s') % (
+            separator, json.dumps(agent_label),
+            json.dumps([idx_datapoint, uncharted_value]))
+        separator = ', '
+    yield '}'
+
+
+def _stream_json(chunks):
+    """Create a streamed JSON response, gzipped if the client supports it.
+
+    Args:
+        chunks: Iterable of JSON strings
+
+    Returns:
+        response: Flask response object
+
+    """
+    # Compress on the fly. (The _compress hook skips streamed responses)
+    gzipped = bool(request.accept_encodings['gzip'])
+    if gzipped is True:
+        chunks = _gzip_chunks(chunks)
+
+    # Create response
+    response = infoset.response_class(
+        stream_with_context(chunks), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if gzipped is True:
+        response.headers['Content-Encoding'] = 'gzip'
+
+    # Return
+    return response
+
+
+def _gzip_chunks(chunks):
+    """Gzip an iterable of strings incrementally.
+
+    Args:
+        chunks: Iterable of strings
+
+    Returns:
+        None. Yields compressed bytes
+
+    """
+    # Initialize key variables. (wbits of 31 creates a gzip header)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    # Compress
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if bool(data) is True:
+            yield data
+    yield compressor.flush()
+
+
+def _etag(last_timestamp, windowed=False):
+    """Create an ETag for the current request.
+
+    Args:
+        last_timestamp: Timestamp of the most recent data used in the response
+        windowed: True if the response covers a time window ending "now".
+            The ETag must then change every 300 seconds even without new data
+
+    Returns:
+        etag: ETag string
+
+    """
+    # Initialize key variables
+    window = 0
+    if windowed is True:
+        window = jm_general.normalized_timestamp()
+
+    # The URL and its query string identify the representation
+    prehash = ('%s?%s:%s:%s') % (
+        request.path, request.query_string.decode('utf-8'),
+        last_timestamp, window)
+    etag = jm_general.hashstring(prehash, sha=1)
+
+    # Return
+    return etag
+
+
+def _last_modified(last_timestamp, windowed=False):
+    """Convert a last_timestamp into a value for Last-Modified headers.
+
+    Args:
+        last_timestamp: Epoch timestamp
+        windowed: True if the response covers a time window ending "now".
+            The data changes as the window moves, so only the ETag can
+            tell whether it is current
+
+    Returns:
+        value: datetime object, None if the timestamp was never set or
+            the response is windowed
+
+    """
+    # Initialize key variables
+    value = None
+
+    # A zero last_timestamp means no data has ever been received
+    if bool(last_timestamp) is True and windowed is False:
+        value = datetime.utcfromtimestamp(int(last_timestamp))
+
+    # Return
+    return value
+
+
+def _not_modified(last_timestamp, windowed=False):
+    """Return a 304 response if the client's cached copy is still current.
+
+    Args:
+        last_timestamp: Timestamp of the most recent data used in the response
+        windowed: True if the response covers a time window ending "now"
+
+    Returns:
+        response: 304 response object, None if the data must be sent
+
+    """
+    # Only GET requests are conditional
+    if request.method != 'GET':
+        return None
+
+    # Compare against If-None-Match / If-Modified-Since headers
+    etag = quote_etag(_etag(last_timestamp, windowed=windowed), weak=True)
+    last_modified = _last_modified(last_timestamp, windowed=windowed)
+    modified = is_resource_modified(
+        request.environ, etag=etag, last_modified=last_modified)
+    if modified is True:
+        return None
+
+    # Return a 304 response
+    response = infoset.response_class(status=304)
+    return _cacheable(response, last_timestamp, windowed=windowed)
+
+
+def _cacheable(response, last_timestamp, windowed=False):
+    """Add conditional request headers to a response.
+
+    Args:
+        response: Flask response object
+        last_timestamp: Timestamp of the most recent data used in the response
+        windowed: True if the response covers a time window ending "now"
+
+    Returns:
+        response: Flask response object
+
+    """
+    # Representations vary by Content-Encoding, so the ETag is weak
+    response.set_etag(_etag(last_timestamp, windowed=windowed), weak=True)
+    last_modified = _last_modified(last_timestamp, windowed=windowed)
+    if last_modified is not None:
+        response.last_modified = last_modified
+
+    # Browsers may cache, but must revalidate every time
+    response.cache_control.no_cache = True
+
+    # Return
+    return response
+
+
 def _datapoint_labels(idx_host, idx_agent, labels):
     """Get datapoint IDXes for a host / agent with specific labels.
 
@@ -596,19 +952,38 @@ def _infoset_hostname():
     host = host_object.hostname()
     return host
 
-def _get_yaml_hosts():
-    """Get hosts listed in toplogy YAML files.
+def _get_topology_hosts():
+    """Get hosts in the topology store.
 
     Args:
         None
 
     Returns:
-        hosts: Dict of hostnames
+        hosts: Dict of topology filenames keyed by hostname
 
     """
-    hosts = {}
-    for root, _, files in walk('./www/static/yaml'):
-        for filename in files:
-            filepath = path.join(root, filename)
-            hosts[filename[:-5]] = filepath  # Add it to the list.
+    # Return
+    config = infoset.config['GLOBAL_CONFIG']
+    hosts = store.hostnames(config)
     return hosts
+
+
+def _topology(host):
+    """Get the topology data of a host.
+
+    Args:
+        host: Hostname
+
+    Returns:
+        data: Dict of topology data
+
+    """
+    # Initialize key variables
+    config = infoset.config['GLOBAL_CONFIG']
+    device = store.Device(config, host)
+
+    # Return
+    if device.exists() is False:
+        abort(404)
+    data = device.read()
+    return data
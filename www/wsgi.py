@@ -0,0 +1,133 @@
+"""Production WSGI server for the infoset web application.
+
+The Flask development server handles requests serially per thread and
+falls over when hundreds of agents post to /receive/<uid> on the same
+5 minute boundary. This module runs the application under gunicorn
+instead, using pre-forked worker processes that each run a pool of
+threads.
+
+The application can also be served by an external WSGI server using the
+"application" object. For example:
+
+    gunicorn --workers 9 --threads 4 --worker-class gthread \
+        www.wsgi:application
+
+Sending a HUP signal to the master process gracefully reloads the workers.
+
+"""
+
+# Pip imports
+from gunicorn.app.base import BaseApplication
+
+# Infoset imports
+from infoset.db import POOL
+from www import infoset
+
+# WSGI application object used by external servers
+application = infoset
+
+
+class WSGIServer(BaseApplication):
+    """Gunicorn application that serves infoset.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Functions:
+        __init__:
+        load_config:
+        load:
+    """
+
+    def __init__(self, options):
+        """Method initializing the class.
+
+        Args:
+            options: Dict of gunicorn settings
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.options = options
+        self.application = application
+        super().__init__()
+
+    def load_config(self):
+        """Apply settings to the gunicorn configuration.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Only apply settings gunicorn knows about
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        """Return the WSGI application.
+
+        Args:
+            None
+
+        Returns:
+            application: WSGI application
+
+        """
+        # Return
+        return self.application
+
+
+def run(config, port):
+    """Serve infoset with gunicorn.
+
+    Args:
+        config: ConfigAgent configuration object for the serverd agent
+        port: TCP port to listen on
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    options = {
+        'bind': ('0.0.0.0:%s') % (port),
+        'workers': config.web_workers(),
+        'threads': config.web_threads(),
+        'worker_class': 'gthread',
+        'keepalive': config.web_keepalive(),
+        'timeout': config.web_timeout(),
+        'graceful_timeout': config.web_timeout(),
+        'post_fork': _post_fork,
+    }
+
+    # Run the server. This blocks until the master process is stopped
+    WSGIServer(options).run()
+
+
+def _post_fork(server, worker):
+    """Discard database connections inherited from the master process.
+
+    Args:
+        server: gunicorn Arbiter object
+        worker: gunicorn Worker object
+
+    Returns:
+        None
+
+    """
+    # Connections must never be shared between processes. The worker gets
+    # a new, empty pool. The inherited connections are left open, as
+    # closing them would close the master's sockets too. This is what
+    # dispose(close=False) does in newer versions of SQLAlchemy
+    if POOL is not None:
+        engine = POOL.kw['bind']
+        engine.pool = engine.pool.recreate()